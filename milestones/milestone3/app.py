@@ -1,7 +1,7 @@
 """FastAPI application for document indexing and search."""
 
 from fastapi import FastAPI
-from routers.index import router as index_router
+from routers.index import router as index_router, job_manager
 from routers.search import router as search_router
 from utils.logging_config import setup_logging
 import logging
@@ -25,7 +25,9 @@ app = FastAPI(
     * **Embeddings**: HuggingFace sentence-transformers/all-MiniLM-L6-v2
     
     ## Endpoints
-    * `POST /api/v1/index` - Index documents from a directory
+    * `POST /api/v1/index` - Submit a background job indexing documents from a directory
+    * `GET /api/v1/index/jobs/{job_id}` - Indexing job status and progress
+    * `POST /api/v1/index/jobs/{job_id}/cancel` - Cancel an indexing job
     * `POST /api/v1/search` - Search for relevant documents
     
     ## Tech Stack
@@ -56,6 +58,7 @@ async def startup_event():
 async def shutdown_event():
     """Run on application shutdown."""
     logger.info("Application shutting down")
+    job_manager.shutdown()
 
 
 @app.get("/", tags=["Root"])
@@ -67,6 +70,8 @@ async def root():
         "docs": "/docs",
         "endpoints": {
             "index": "POST /api/v1/index",
+            "index_job": "GET /api/v1/index/jobs/{job_id}",
+            "cancel_index_job": "POST /api/v1/index/jobs/{job_id}/cancel",
             "search": "POST /api/v1/search",
             "health": "GET /health"
         }
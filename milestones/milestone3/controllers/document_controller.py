@@ -3,6 +3,9 @@
 from models.document_loader import DocumentLoader
 from models.text_processor import TextProcessor
 from models.vector_store import VectorStoreManager
+from models.embedding_engine import TimedEmbeddings
+from models.index_manifest import IndexManifest
+from models.index_job import IndexProgress
 from views.base_view import BaseView, SilentView
 from typing import List, Tuple, Dict, Any, Optional
 from langchain_core.documents import Document
@@ -11,7 +14,12 @@ from langchain_core.documents import Document
 class DocumentController:
     """Controller for managing document indexing and search operations."""
     
-    def __init__(self, persist_directory: str = "./chroma_db", view: Optional[BaseView] = None):
+    def __init__(
+        self,
+        persist_directory: str = "./chroma_db",
+        view: Optional[BaseView] = None,
+        upsert_batch_size: int = 1024
+    ):
         """
         Initialize the document controller.
         
@@ -19,8 +27,10 @@ class DocumentController:
             persist_directory: Directory for ChromaDB persistence
             view: Optional view instance for displaying output. 
                   If None, a SilentView is used (for API context).
+            upsert_batch_size: Number of chunks collected across files before they are embedded and upserted
         """
         self.vector_store_manager = VectorStoreManager(persist_directory)
+        self.upsert_batch_size = upsert_batch_size
         # Use the provided view, or fall back to SilentView
         self.view = view if view else SilentView()
     
@@ -29,16 +39,27 @@ class DocumentController:
         documents_path: str,
         collection_name: str = "documents",
         chunk_size: int = 500,
-        chunk_overlap: int = 50
+        chunk_overlap: int = 50,
+        force_reindex: bool = False,
+        progress: Optional[IndexProgress] = None
     ) -> Dict[str, Any]:
         """
-        Index documents from a directory.
+        Incrementally index documents from a directory.
+        
+        A manifest of file content hashes and chunk IDs is kept per collection:
+        - unchanged files are skipped without loading or embedding them
+        - new or changed files are re-chunked, and only chunks whose text changed are embedded
+          (unchanged chunks that moved within the file only get their metadata updated)
+        - chunks of deleted files are removed from the collection
         
         Args:
             documents_path: Path to documents directory
             collection_name: Name for the ChromaDB collection
             chunk_size: Size of text chunks
             chunk_overlap: Overlap between chunks
+            force_reindex: Drop the collection and rebuild it from scratch
+            progress: Optional progress tracker; it is updated per file and batch, and
+                      cancelling it stops the run after the current file (status "cancelled")
             
         Returns:
             Dictionary with indexing statistics
@@ -46,37 +67,170 @@ class DocumentController:
         try:
             self.view.show_info("Starting document indexing...")
             
-            # Load documents
-            self.view.show_message("Loading documents...")
             loader = DocumentLoader(documents_path)
-            documents = loader.load_documents()
-            self.view.show_success(f"Loaded {len(documents)} documents")
-            
-            # Process documents
-            self.view.show_message("Splitting documents into chunks...")
             processor = TextProcessor(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-            chunks = processor.process_documents(documents)
-            self.view.show_success(f"Created {len(chunks)} chunks")
+            manifest = IndexManifest(self.vector_store_manager.persist_directory, collection_name)
+            # Times this run's embed calls only; the shared engine may be serving other runs at once
+            timed_embeddings = TimedEmbeddings(self.vector_store_manager.embeddings)
+            params = {
+                "chunk_size": chunk_size,
+                "chunk_overlap": chunk_overlap,
+                "embedding_model": self.vector_store_manager.embedding_model
+            }
+            
+            # Collections without a manifest (or built with other parameters) hold chunks
+            # we cannot diff against, so rebuild them once from scratch
+            if force_reindex or not manifest.exists or manifest.params != params:
+                self.view.show_message("Rebuilding collection from scratch...")
+                vector_store = self.vector_store_manager.reset(collection_name, timed_embeddings)
+                manifest.reset(params)
+            else:
+                vector_store = self.vector_store_manager.load(collection_name, timed_embeddings)
             
-            # Create vector store
-            self.view.show_message("Generating embeddings and creating vector store...")
-            vector_store = self.vector_store_manager.create(chunks, collection_name)
-            self.view.show_success(f"Vector store created with collection '{collection_name}'")
+            # Compare file hashes with the manifest
+            self.view.show_message("Scanning documents for changes...")
+            files = loader.list_files()
+            if not files:
+                raise ValueError(f"No documents found in {loader.documents_path}")
+            hashes = {path: IndexManifest.hash_file(path) for path in files}
+            added = [path for path in files if path not in manifest.files]
+            updated = [path for path in files if path in manifest.files and manifest.files[path]["hash"] != hashes[path]]
+            removed = [path for path in manifest.files if path not in hashes]
+            unchanged = len(files) - len(added) - len(updated)
+            self.view.show_success(
+                f"{len(added)} new, {len(updated)} changed, {len(removed)} deleted, {unchanged} unchanged files"
+            )
+            
+            # Remove chunks of deleted files
+            chunks_deleted = 0
+            for path in removed:
+                stale_ids = manifest.chunk_ids(path)
+                self.vector_store_manager.delete(vector_store, stale_ids)
+                chunks_deleted += len(stale_ids)
+                del manifest.files[path]
+            
+            # Load and chunk new or changed files. New chunks are collected across files and
+            # upserted in large batches, so the embedding engine can length-sort and batch them
+            # (and spread them over its process pool, if enabled)
+            documents_loaded = chunks_created = chunks_embedded = 0
+            cancelled = False
+            pending: List[Tuple[str, Document]] = []
+            embeddings = self.vector_store_manager.embeddings
+            if progress is not None:
+                progress.start(len(added) + len(updated))
+            with embeddings:
+                for path in added + updated:
+                    if progress is not None and progress.cancelled:
+                        # Files not reached keep their old manifest entries and are picked up next run
+                        cancelled = True
+                        self.view.show_message("Indexing cancelled")
+                        break
+                    
+                    documents = loader.load_file(path)
+                    chunks = processor.process_documents(documents)
+                    chunk_ids = self._assign_chunk_ids(path, chunks)
+                    
+                    # The manifest lists a file's chunk IDs in chunk order
+                    old_positions = {chunk_id: i for i, chunk_id in enumerate(manifest.chunk_ids(path))}
+                    new_chunks = [(chunk_id, chunk) for chunk_id, chunk in zip(chunk_ids, chunks) if chunk_id not in old_positions]
+                    moved_chunks = [
+                        (chunk_id, chunk) for i, (chunk_id, chunk) in enumerate(zip(chunk_ids, chunks))
+                        if old_positions.get(chunk_id, i) != i
+                    ]
+                    stale_ids = list(set(old_positions) - set(chunk_ids))
+                    
+                    self.vector_store_manager.delete(vector_store, stale_ids)
+                    # Unchanged chunks keep their embedding, but edits above them shift their chunk_index
+                    self.vector_store_manager.update_metadata(
+                        collection_name,
+                        [chunk_id for chunk_id, _ in moved_chunks],
+                        [chunk.metadata for _, chunk in moved_chunks]
+                    )
+                    pending.extend(new_chunks)
+                    if len(pending) >= self.upsert_batch_size:
+                        self._upsert_pending(vector_store, pending, progress)
+                        pending = []
+                    manifest.files[path] = {"hash": hashes[path], "chunk_ids": chunk_ids}
+                    
+                    documents_loaded += len(documents)
+                    chunks_created += len(chunks)
+                    chunks_embedded += len(new_chunks)
+                    chunks_deleted += len(stale_ids)
+                    if progress is not None:
+                        progress.file_done(len(chunks))
+                
+                self._upsert_pending(vector_store, pending, progress)
+            
+            manifest.save()
+            embedding_seconds = timed_embeddings.embedding_seconds
+            chunks_per_second = chunks_embedded / embedding_seconds if embedding_seconds > 0 else 0.0
+            self.view.show_success(
+                f"Embedded {chunks_embedded} chunks ({chunks_per_second:.1f} chunks/s), "
+                f"deleted {chunks_deleted} chunks in collection '{collection_name}'"
+            )
             
             # Display statistics
-            self.view.display_indexing_stats(len(documents), len(chunks), collection_name)
+            self.view.display_indexing_stats(documents_loaded, chunks_created, collection_name)
             
             return {
-                "status": "success",
-                "documents_indexed": len(documents),
-                "chunks_created": len(chunks),
-                "collection_name": collection_name
+                "status": "cancelled" if cancelled else "success",
+                "documents_indexed": documents_loaded,
+                "chunks_created": chunks_created,
+                "collection_name": collection_name,
+                "files_scanned": len(files),
+                "files_added": len(added),
+                "files_updated": len(updated),
+                "files_removed": len(removed),
+                "files_unchanged": unchanged,
+                "chunks_embedded": chunks_embedded,
+                "chunks_deleted": chunks_deleted,
+                "embedding_seconds": round(embedding_seconds, 3),
+                "chunks_per_second": round(chunks_per_second, 1)
             }
             
         except Exception as e:
             self.view.show_error(f"Indexing failed: {str(e)}")
             raise
     
+    def _upsert_pending(
+        self,
+        vector_store,
+        pending: List[Tuple[str, Document]],
+        progress: Optional[IndexProgress] = None
+    ) -> None:
+        """Embed and upsert a batch of (chunk_id, chunk) pairs collected across files."""
+        self.vector_store_manager.upsert(
+            vector_store,
+            [chunk for _, chunk in pending],
+            [chunk_id for chunk_id, _ in pending]
+        )
+        if progress is not None:
+            progress.chunks_upserted(len(pending))
+    
+    @staticmethod
+    def _assign_chunk_ids(path: str, chunks: List[Document]) -> List[str]:
+        """
+        Give every chunk of a file a deterministic, content-based ID.
+        
+        Args:
+            path: Source file path
+            chunks: Chunks of that file, in order
+            
+        Returns:
+            Chunk IDs in the same order (also stored in chunk metadata)
+        """
+        seen: Dict[str, int] = {}
+        chunk_ids = []
+        for i, chunk in enumerate(chunks):
+            occurrence = seen.get(chunk.page_content, 0)
+            seen[chunk.page_content] = occurrence + 1
+            chunk_id = IndexManifest.chunk_id(path, chunk.page_content, occurrence)
+            # Per-file index so IDs and metadata don't depend on which files were re-indexed
+            chunk.metadata['chunk_index'] = i
+            chunk.metadata['chunk_id'] = chunk_id
+            chunk_ids.append(chunk_id)
+        return chunk_ids
+    
     def search_documents(
         self,
         query: str,
@@ -0,0 +1,165 @@
+"""Background worker pool for indexing jobs."""
+
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from threading import Lock
+from typing import Deque, Dict, List, Optional, Set
+from controllers.document_controller import DocumentController
+from models.index_job import IndexJob, JobStatus
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Number of indexing jobs that can run at the same time (override via environment)
+INDEX_WORKERS = int(os.getenv("INDEX_WORKERS", "2"))
+# Finished jobs are forgotten after this many seconds, or oldest first beyond this many
+INDEX_JOB_RETENTION_SECONDS = float(os.getenv("INDEX_JOB_RETENTION_SECONDS", "3600"))
+INDEX_MAX_FINISHED_JOBS = int(os.getenv("INDEX_MAX_FINISHED_JOBS", "100"))
+
+
+class IndexJobManager:
+    """
+    Runs indexing jobs on a thread pool, one job at a time per collection.
+
+    Jobs for a collection that is already being indexed wait in a per-collection
+    FIFO queue without occupying a worker, so jobs (and searches) on other
+    collections are not held up by them. Finished jobs stay visible for
+    job_retention_seconds, and only the newest max_finished_jobs of them are kept.
+    """
+
+    def __init__(
+        self,
+        controller: DocumentController,
+        max_workers: int = INDEX_WORKERS,
+        job_retention_seconds: float = INDEX_JOB_RETENTION_SECONDS,
+        max_finished_jobs: int = INDEX_MAX_FINISHED_JOBS
+    ):
+        """
+        Initialize the job manager.
+
+        Args:
+            controller: DocumentController used to run the indexing
+            max_workers: Maximum number of jobs running concurrently
+            job_retention_seconds: How long a finished job can still be looked up
+            max_finished_jobs: Maximum number of finished jobs kept
+        """
+        self.controller = controller
+        self.job_retention_seconds = job_retention_seconds
+        self.max_finished_jobs = max_finished_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="index-job")
+        self._lock = Lock()
+        self._jobs: Dict[str, IndexJob] = {}
+        self._active_collections: Set[str] = set()
+        self._waiting: Dict[str, Deque[IndexJob]] = defaultdict(deque)
+
+    def submit(self, job: IndexJob) -> IndexJob:
+        """Queue a job; it starts as soon as its collection is free and a worker is available."""
+        with self._lock:
+            self._evict_finished()
+            self._jobs[job.job_id] = job
+            if job.collection_name in self._active_collections:
+                self._waiting[job.collection_name].append(job)
+                logger.info(f"Job {job.job_id} waiting for collection '{job.collection_name}'")
+            else:
+                self._active_collections.add(job.collection_name)
+                self._executor.submit(self._run, job)
+        return job
+
+    def get(self, job_id: str) -> Optional[IndexJob]:
+        """Look up a job by ID."""
+        with self._lock:
+            self._evict_finished()
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> List[IndexJob]:
+        """All known jobs, newest first."""
+        with self._lock:
+            self._evict_finished()
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def cancel(self, job_id: str) -> Optional[IndexJob]:
+        """
+        Cancel a job.
+
+        A queued job (waiting for its collection or for a worker) is cancelled
+        immediately; a running job stops after the file it is currently processing.
+        Finished jobs are left unchanged.
+
+        Returns:
+            The job, or None if the ID is unknown
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job.finished:
+                return job
+            job.progress.cancel()
+            if job.status == JobStatus.QUEUED:
+                waiting = self._waiting.get(job.collection_name)
+                if waiting and job in waiting:
+                    waiting.remove(job)
+                # A job already handed to the executor is skipped by _run when a worker picks it up
+                job.status = JobStatus.CANCELLED
+                job.finished_at = datetime.now(timezone.utc)
+        logger.info(f"Cancellation requested for job {job_id}")
+        return job
+
+    def shutdown(self) -> None:
+        """Cancel all unfinished jobs and wait for running ones to stop."""
+        for job in self.list_jobs():
+            self.cancel(job.job_id)
+        self._executor.shutdown(wait=True)
+
+    def _run(self, job: IndexJob) -> None:
+        try:
+            # Under the lock, so cancel() sees the job either queued or running
+            with self._lock:
+                if job.progress.cancelled:
+                    job.status = JobStatus.CANCELLED
+                    return
+                job.status = JobStatus.RUNNING
+                job.started_at = datetime.now(timezone.utc)
+            logger.info(f"Job {job.job_id} started: path={job.documents_path}, collection={job.collection_name}")
+            job.result = self.controller.index_documents(
+                documents_path=job.documents_path,
+                collection_name=job.collection_name,
+                chunk_size=job.chunk_size,
+                chunk_overlap=job.chunk_overlap,
+                force_reindex=job.force_reindex,
+                progress=job.progress
+            )
+            job.status = JobStatus.CANCELLED if job.result["status"] == "cancelled" else JobStatus.COMPLETED
+            logger.info(f"Job {job.job_id} {job.status.value}")
+        except Exception as e:
+            logger.error(f"Job {job.job_id} failed: {str(e)}", exc_info=True)
+            job.error = str(e)
+            job.status = JobStatus.FAILED
+        finally:
+            job.progress.finish()
+            if job.finished_at is None:
+                job.finished_at = datetime.now(timezone.utc)
+            self._start_next(job.collection_name)
+
+    def _start_next(self, collection_name: str) -> None:
+        """Hand the collection to its next waiting job, or release it."""
+        with self._lock:
+            waiting = self._waiting.get(collection_name)
+            if waiting:
+                self._executor.submit(self._run, waiting.popleft())
+            else:
+                self._active_collections.discard(collection_name)
+                self._waiting.pop(collection_name, None)
+            self._evict_finished()
+
+    def _evict_finished(self) -> None:
+        """Forget finished jobs past the retention window and the oldest beyond the cap (lock held)."""
+        finished = sorted(
+            (job for job in self._jobs.values() if job.finished and job.finished_at is not None),
+            key=lambda job: job.finished_at
+        )
+        excess = len(finished) - self.max_finished_jobs
+        now = datetime.now(timezone.utc)
+        for position, job in enumerate(finished):
+            if position < excess or (now - job.finished_at).total_seconds() > self.job_retention_seconds:
+                del self._jobs[job.job_id]
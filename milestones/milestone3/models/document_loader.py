@@ -24,6 +24,34 @@ class DocumentLoader:
             raise ValueError(f"Directory not found: '{documents_path}' (absolute path: {self.documents_path})")
         logger.info(f"DocumentLoader initialized with path: {self.documents_path}")
     
+    def list_files(self) -> List[str]:
+        """
+        List all text and PDF files under the documents directory.
+        
+        Returns:
+            Sorted list of absolute file paths
+        """
+        files = []
+        for root, _, names in os.walk(self.documents_path):
+            for name in names:
+                if name.lower().endswith((".txt", ".pdf")):
+                    files.append(os.path.join(root, name))
+        return sorted(files)
+    
+    def load_file(self, path: str) -> List[Document]:
+        """
+        Load a single text or PDF file.
+        
+        Args:
+            path: Path of the file to load
+            
+        Returns:
+            List of LangChain Document objects (one per PDF page, one for a text file)
+        """
+        if path.lower().endswith(".pdf"):
+            return PyPDFLoader(path).load()
+        return TextLoader(path).load()
+    
     def load_documents(self) -> List[Document]:
         """
         Load all text and PDF documents from the specified directory.
@@ -0,0 +1,154 @@
+"""High-throughput embedding engine for document ingestion."""
+
+from langchain_core.embeddings import Embeddings
+from sentence_transformers import SentenceTransformer
+from threading import Lock
+from typing import List, Optional
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingEngine(Embeddings):
+    """
+    Sentence-transformers embeddings with length-sorted batching and an optional multi-process pool.
+
+    Texts are sorted by length before batching so each batch holds similarly sized
+    texts (less padding), and results are returned in the original order. With
+    multi_process enabled, encoding is spread over one worker per CPU core (or per
+    target device) while the pool is running.
+    """
+
+    def __init__(
+        self,
+        model_name: str = "sentence-transformers/all-MiniLM-L6-v2",
+        batch_size: int = 64,
+        multi_process: bool = False,
+        target_devices: Optional[List[str]] = None
+    ):
+        """
+        Initialize the embedding engine.
+
+        Args:
+            model_name: HuggingFace sentence-transformers model name
+            batch_size: Number of texts encoded per forward pass
+            multi_process: Use a multi-process pool for embed_documents while it is started
+            target_devices: Devices for the pool workers (default: all CPU cores / GPUs)
+        """
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.multi_process = multi_process
+        self.target_devices = target_devices
+        self.model = SentenceTransformer(model_name)
+        self._pool = None
+        self._pool_users = 0
+        self._pool_lock = Lock()
+
+        # Cumulative throughput counters (shared by every indexing run using this engine)
+        self.texts_embedded = 0
+        self.embedding_seconds = 0.0
+        self._stats_lock = Lock()
+        logger.info(f"EmbeddingEngine initialized: {model_name} (batch_size={batch_size}, multi_process={multi_process})")
+
+    def start_pool(self) -> None:
+        """
+        Start the multi-process pool (no-op if multi_process is disabled).
+        
+        Calls are reference-counted so concurrent indexing runs can share the pool;
+        it is stopped when the last user calls stop_pool().
+        """
+        if not self.multi_process:
+            return
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = self.model.start_multi_process_pool(target_devices=self.target_devices)
+                logger.info(f"Started embedding pool with {len(self._pool['processes'])} workers")
+            self._pool_users += 1
+
+    def stop_pool(self) -> None:
+        """Release the multi-process pool, stopping it once no run is using it."""
+        with self._pool_lock:
+            if self._pool is None:
+                return
+            self._pool_users -= 1
+            if self._pool_users <= 0:
+                self.model.stop_multi_process_pool(self._pool)
+                self._pool = None
+                self._pool_users = 0
+                logger.info("Stopped embedding pool")
+
+    def __enter__(self) -> "EmbeddingEngine":
+        self.start_pool()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.stop_pool()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed documents in length-sorted batches.
+
+        Args:
+            texts: Texts to embed
+
+        Returns:
+            One embedding per text, in the input order
+        """
+        if not texts:
+            return []
+
+        start = time.perf_counter()
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        sorted_texts = [texts[i] for i in order]
+
+        if self._pool is not None:
+            vectors = self.model.encode_multi_process(sorted_texts, self._pool, batch_size=self.batch_size)
+        else:
+            vectors = self.model.encode(sorted_texts, batch_size=self.batch_size, convert_to_numpy=True)
+
+        embeddings: List[List[float]] = [[] for _ in texts]
+        for position, index in enumerate(order):
+            embeddings[index] = vectors[position].tolist()
+
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self.texts_embedded += len(texts)
+            self.embedding_seconds += elapsed
+        return embeddings
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query in the main process."""
+        return self.model.encode(text, convert_to_numpy=True).tolist()
+
+
+class TimedEmbeddings(Embeddings):
+    """
+    Wraps an Embeddings instance and times the embed_documents calls made through it.
+
+    Give each indexing run its own wrapper: the shared engine's counters mix
+    the work of runs that embed at the same time.
+    """
+
+    def __init__(self, embeddings: Embeddings):
+        """
+        Initialize the wrapper.
+
+        Args:
+            embeddings: Embeddings doing the work (e.g. the shared EmbeddingEngine)
+        """
+        self.embeddings = embeddings
+        self.texts_embedded = 0
+        self.embedding_seconds = 0.0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Embed documents with the wrapped embeddings, adding the time taken to this run's total."""
+        start = time.perf_counter()
+        vectors = self.embeddings.embed_documents(texts)
+        self.embedding_seconds += time.perf_counter() - start
+        self.texts_embedded += len(texts)
+        return vectors
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query with the wrapped embeddings."""
+        return self.embeddings.embed_query(text)
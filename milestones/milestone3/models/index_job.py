@@ -0,0 +1,109 @@
+"""Background indexing job state and progress tracking."""
+
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from enum import Enum
+from threading import Event, Lock
+from typing import Any, Dict, Optional
+import time
+import uuid
+
+
+class JobStatus(str, Enum):
+    """Lifecycle states of an indexing job."""
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+
+class IndexProgress:
+    """
+    Thread-safe progress counters and cancellation flag for one indexing run.
+
+    The indexing thread updates it; API requests read snapshots of it.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self._cancel = Event()
+        self.files_total = 0
+        self.files_done = 0
+        self.chunks_created = 0
+        self.chunks_embedded = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+    def start(self, files_total: int) -> None:
+        """Record how many files need (re-)indexing and start the clock."""
+        with self._lock:
+            self.files_total = files_total
+            self.started_at = time.monotonic()
+
+    def file_done(self, chunks_created: int) -> None:
+        """Record that a file was loaded and chunked."""
+        with self._lock:
+            self.files_done += 1
+            self.chunks_created += chunks_created
+
+    def chunks_upserted(self, count: int) -> None:
+        """Record that a batch of chunks was embedded and written."""
+        with self._lock:
+            self.chunks_embedded += count
+
+    def finish(self) -> None:
+        """Stop the clock (elapsed time and throughput are frozen from now on)."""
+        with self._lock:
+            if self.started_at is not None and self.finished_at is None:
+                self.finished_at = time.monotonic()
+
+    def cancel(self) -> None:
+        """Ask the indexing run to stop after the current file."""
+        self._cancel.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Current counters plus throughput and estimated time remaining."""
+        with self._lock:
+            end = self.finished_at if self.finished_at is not None else time.monotonic()
+            elapsed = end - self.started_at if self.started_at is not None else 0.0
+            files_per_second = self.files_done / elapsed if elapsed > 0 else 0.0
+            remaining = self.files_total - self.files_done
+            eta = remaining / files_per_second if files_per_second > 0 and self.finished_at is None else None
+            return {
+                "files_total": self.files_total,
+                "files_done": self.files_done,
+                "chunks_created": self.chunks_created,
+                "chunks_embedded": self.chunks_embedded,
+                "elapsed_seconds": round(elapsed, 2),
+                "files_per_second": round(files_per_second, 2),
+                "chunks_per_second": round(self.chunks_embedded / elapsed, 1) if elapsed > 0 else 0.0,
+                "eta_seconds": round(eta, 1) if eta is not None and remaining > 0 else None
+            }
+
+
+@dataclass
+class IndexJob:
+    """An indexing request queued for (or running on) the background worker pool."""
+
+    documents_path: str
+    collection_name: str
+    chunk_size: int = 500
+    chunk_overlap: int = 50
+    force_reindex: bool = False
+    job_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = JobStatus.QUEUED
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    progress: IndexProgress = field(default_factory=IndexProgress)
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in (JobStatus.COMPLETED, JobStatus.FAILED, JobStatus.CANCELLED)
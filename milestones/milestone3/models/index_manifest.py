@@ -0,0 +1,85 @@
+"""Index manifest for incremental, hash-based re-indexing."""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IndexManifest:
+    """
+    Tracks, per collection, the content hash of every indexed file and the IDs of its chunks.
+
+    The manifest is stored as JSON next to the Chroma data:
+    {persist_directory}/manifests/{collection_name}.json
+    """
+
+    VERSION = 1
+
+    def __init__(self, persist_directory: str, collection_name: str):
+        """
+        Initialize the manifest and load it from disk if present.
+
+        Args:
+            persist_directory: Directory for ChromaDB persistence
+            collection_name: Name of the ChromaDB collection
+        """
+        self.path = os.path.join(persist_directory, "manifests", f"{collection_name}.json")
+        self.params: Dict[str, Any] = {}
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.exists = os.path.exists(self.path)
+        if self.exists:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION:
+                self.params = data.get("params", {})
+                self.files = data.get("files", {})
+            else:
+                logger.warning(f"Ignoring manifest with unsupported version: {self.path}")
+                self.exists = False
+
+    def reset(self, params: Dict[str, Any]) -> None:
+        """Forget every tracked file and record new indexing parameters."""
+        self.params = dict(params)
+        self.files = {}
+
+    def save(self) -> None:
+        """Write the manifest atomically (temp file + rename)."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "params": self.params, "files": self.files}, f)
+        os.replace(tmp_path, self.path)
+        self.exists = True
+
+    def chunk_ids(self, path: str) -> List[str]:
+        """Chunk IDs currently indexed for a file (empty if the file is not tracked)."""
+        return self.files.get(path, {}).get("chunk_ids", [])
+
+    @staticmethod
+    def hash_file(path: str, block_size: int = 1 << 20) -> str:
+        """SHA-256 of a file's content, read in blocks."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
+
+    @staticmethod
+    def chunk_id(source: str, text: str, occurrence: int) -> str:
+        """
+        Deterministic chunk ID from its source file and content.
+
+        Args:
+            source: Path of the file the chunk came from
+            text: Chunk text
+            occurrence: How many identical chunks preceded this one in the same file
+
+        Returns:
+            Hex ID that stays the same as long as the chunk text is unchanged
+        """
+        key = f"{source}\x00{occurrence}\x00{text}".encode("utf-8")
+        return hashlib.sha256(key).hexdigest()[:32]
@@ -2,28 +2,47 @@
 
 from models.document_loader import DocumentLoader
 from models.text_processor import TextProcessor
+from models.embedding_engine import EmbeddingEngine
 from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
+import chromadb
 from langchain_core.documents import Document
-from typing import List, Tuple
+from langchain_core.embeddings import Embeddings
+from typing import Any, Dict, List, Optional, Tuple
 import os
 
+# Ingestion embedding settings (override via environment)
+EMBEDDING_BATCH_SIZE = int(os.getenv("EMBEDDING_BATCH_SIZE", "64"))
+EMBEDDING_MULTI_PROCESS = os.getenv("EMBEDDING_MULTI_PROCESS", "false").lower() in ("1", "true", "yes")
+
 
 class VectorStoreManager:
     """Simplified ChromaDB vector store manager with auto-persistence."""
     
-    def __init__(self, persist_directory: str = "./chroma_db"):
+    def __init__(
+        self,
+        persist_directory: str = "./chroma_db",
+        batch_size: Optional[int] = None,
+        multi_process: Optional[bool] = None
+    ):
         """
         Initialize ChromaDB with persistent storage.
         
         Args:
             persist_directory: Directory for ChromaDB persistence
+            batch_size: Embedding batch size (default: EMBEDDING_BATCH_SIZE)
+            multi_process: Embed with a multi-process pool during indexing (default: EMBEDDING_MULTI_PROCESS)
         """
         self.persist_directory = persist_directory
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name="sentence-transformers/all-MiniLM-L6-v2"
+        self.embedding_model = "sentence-transformers/all-MiniLM-L6-v2"
+        self.embeddings = EmbeddingEngine(
+            model_name=self.embedding_model,
+            batch_size=batch_size if batch_size is not None else EMBEDDING_BATCH_SIZE,
+            multi_process=multi_process if multi_process is not None else EMBEDDING_MULTI_PROCESS
         )
         os.makedirs(persist_directory, exist_ok=True)
+        # One persistent client shared by all loads; creating clients concurrently
+        # from several threads (e.g. background index jobs) races inside chromadb
+        self.client = chromadb.PersistentClient(path=persist_directory)
     
     def create(self, documents: List[Document], collection_name: str = "documents") -> Chroma:
         """Create and populate vector store."""
@@ -31,17 +50,37 @@ class VectorStoreManager:
             documents=documents,
             embedding=self.embeddings,
             collection_name=collection_name,
-            persist_directory=self.persist_directory
+            client=self.client
         )
     
-    def load(self, collection_name: str = "documents") -> Chroma:
-        """Load existing vector store."""
+    def load(self, collection_name: str = "documents", embeddings: Optional[Embeddings] = None) -> Chroma:
+        """Load existing vector store (embedding with the given embeddings, default: the shared engine)."""
         return Chroma(
             collection_name=collection_name,
-            embedding_function=self.embeddings,
-            persist_directory=self.persist_directory
+            embedding_function=embeddings if embeddings is not None else self.embeddings,
+            client=self.client
         )
     
+    def upsert(self, vector_store: Chroma, documents: List[Document], ids: List[str]) -> None:
+        """Embed and insert (or overwrite) documents under the given IDs."""
+        if documents:
+            vector_store.add_documents(documents, ids=ids)
+    
+    def update_metadata(self, collection_name: str, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Replace the metadata of stored documents without re-embedding them."""
+        if ids:
+            self.client.get_collection(collection_name).update(ids=ids, metadatas=metadatas)
+    
+    def delete(self, vector_store: Chroma, ids: List[str]) -> None:
+        """Delete documents by ID."""
+        if ids:
+            vector_store.delete(ids=ids)
+    
+    def reset(self, collection_name: str = "documents", embeddings: Optional[Embeddings] = None) -> Chroma:
+        """Drop a collection and return a fresh, empty one."""
+        self.load(collection_name).delete_collection()
+        return self.load(collection_name, embeddings)
+    
     def search(self, vector_store: Chroma, query: str, k: int = 3) -> List[Tuple[Document, float]]:
         """Search vector store and return documents with scores."""
         return vector_store.similarity_search_with_score(query, k=k)
@@ -1,78 +1,123 @@
-"""Index router for document indexing endpoint."""
+"""Index router for background document indexing jobs."""
 
 from fastapi import APIRouter, HTTPException
-from schemas.api_schemas import IndexRequest, IndexResponse
+from typing import List
+from schemas.api_schemas import IndexRequest, IndexResponse, IndexJobProgress, IndexJobResponse
 from controllers.document_controller import DocumentController
+from controllers.index_job_manager import IndexJobManager
+from models.index_job import IndexJob
 import os
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 controller = DocumentController()
+job_manager = IndexJobManager(controller)
 
 
-@router.post("/index", response_model=IndexResponse, tags=["Indexing"])
+def _to_response(job: IndexJob) -> IndexJobResponse:
+    """Convert an IndexJob into its API representation."""
+    result = None
+    if job.result is not None:
+        message = "Indexing cancelled" if job.result["status"] == "cancelled" else "Documents indexed successfully"
+        result = IndexResponse(message=message, **job.result)
+    return IndexJobResponse(
+        job_id=job.job_id,
+        status=job.status.value,
+        documents_path=job.documents_path,
+        collection_name=job.collection_name,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        progress=IndexJobProgress(**job.progress.snapshot()),
+        result=result,
+        error=job.error
+    )
+
+
+def _get_job_or_404(job_id: str) -> IndexJob:
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Indexing job not found: {job_id}")
+    return job
+
+
+@router.post("/index", response_model=IndexJobResponse, status_code=202, tags=["Indexing"])
 async def index_documents(request: IndexRequest):
     """
-    Index documents from a directory.
-    
-    This endpoint:
-    1. Loads all text and PDF files from the specified directory
-    2. Splits them into manageable chunks
-    3. Generates embeddings using HuggingFace model
-    4. Stores them in ChromaDB vector store
-    
+    Submit a background job that indexes documents from a directory.
+
+    Returns immediately with a job ID. The job indexes incrementally:
+    1. Hashes all text and PDF files and compares them with the collection's manifest
+    2. Loads and splits only new or changed files into chunks
+    3. Generates embeddings (HuggingFace model, length-sorted batches) only for new or changed chunks
+    4. Upserts them into ChromaDB and removes chunks of deleted files
+
+    Jobs on the same collection run one after another; jobs on different
+    collections run in parallel (up to INDEX_WORKERS at a time).
+
     Args:
-        request: IndexRequest containing documents_path, collection_name, chunk_size, and chunk_overlap
-        
+        request: IndexRequest containing documents_path, collection_name, chunk_size, chunk_overlap and force_reindex
+
     Returns:
-        IndexResponse with indexing statistics
-        
+        IndexJobResponse for the queued job (poll GET /index/jobs/{job_id})
+
     Raises:
-        HTTPException: If indexing fails or path doesn't exist
+        HTTPException: If the path doesn't exist
     """
-    try:
-        logger.info(f"Indexing request received: path={request.documents_path}, collection={request.collection_name}")
-        
-        # Resolve path (convert relative to absolute based on app.py location)
-        documents_path = request.documents_path
-        if not os.path.isabs(documents_path):
-            # Get the directory where app.py is located
-            app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-            documents_path = os.path.join(app_dir, documents_path)
-            logger.info(f"Resolved relative path to: {documents_path}")
-        
-        # Validate path exists
-        if not os.path.exists(documents_path):
-            logger.error(f"Path not found: {documents_path}")
-            raise HTTPException(
-                status_code=404,
-                detail=f"Documents path not found: {documents_path}"
-            )
-        
-        # Index documents
-        result = controller.index_documents(
-            documents_path=documents_path,  # Use resolved path
-            collection_name=request.collection_name,
-            chunk_size=request.chunk_size,
-            chunk_overlap=request.chunk_overlap
-        )
-        
-        logger.info(f"Indexing completed: {result['documents_indexed']} docs, {result['chunks_created']} chunks")
-        
-        return IndexResponse(
-            status="success",
-            message="Documents indexed successfully",
-            documents_indexed=result["documents_indexed"],
-            chunks_created=result["chunks_created"],
-            collection_name=result["collection_name"]
-        )
-        
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Indexing failed: {str(e)}", exc_info=True)
+    logger.info(f"Indexing request received: path={request.documents_path}, collection={request.collection_name}")
+
+    # Resolve path (convert relative to absolute based on app.py location)
+    documents_path = request.documents_path
+    if not os.path.isabs(documents_path):
+        # Get the directory where app.py is located
+        app_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+        documents_path = os.path.join(app_dir, documents_path)
+        logger.info(f"Resolved relative path to: {documents_path}")
+
+    # Validate path exists
+    if not os.path.exists(documents_path):
+        logger.error(f"Path not found: {documents_path}")
         raise HTTPException(
-            status_code=500,
-            detail=f"Indexing failed: {str(e)}"
+            status_code=404,
+            detail=f"Documents path not found: {documents_path}"
         )
+
+    job = job_manager.submit(IndexJob(
+        documents_path=documents_path,  # Use resolved path
+        collection_name=request.collection_name,
+        chunk_size=request.chunk_size,
+        chunk_overlap=request.chunk_overlap,
+        force_reindex=request.force_reindex
+    ))
+    logger.info(f"Indexing job {job.job_id} submitted")
+    return _to_response(job)
+
+
+@router.get("/index/jobs", response_model=List[IndexJobResponse], tags=["Indexing"])
+async def list_index_jobs():
+    """List all indexing jobs, newest first."""
+    return [_to_response(job) for job in job_manager.list_jobs()]
+
+
+@router.get("/index/jobs/{job_id}", response_model=IndexJobResponse, tags=["Indexing"])
+async def get_index_job(job_id: str):
+    """
+    Get the status and progress of an indexing job.
+
+    Progress includes files and chunks done, throughput and an ETA; the
+    indexing statistics are included in `result` once the job has finished.
+    """
+    return _to_response(_get_job_or_404(job_id))
+
+
+@router.post("/index/jobs/{job_id}/cancel", response_model=IndexJobResponse, tags=["Indexing"])
+async def cancel_index_job(job_id: str):
+    """
+    Cancel an indexing job.
+
+    A queued job is cancelled immediately. A running job stops after its current
+    file; the files finished so far stay indexed and are skipped next time.
+    """
+    _get_job_or_404(job_id)
+    return _to_response(job_manager.cancel(job_id))
@@ -1,6 +1,7 @@
 """Search router for document search endpoint."""
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from schemas.api_schemas import SearchRequest, SearchResponse, DocumentResult
 from controllers.document_controller import DocumentController
 import logging
@@ -33,8 +34,10 @@ async def search_documents(request: SearchRequest):
     try:
         logger.info(f"Search request received: query='{request.query}', collection={request.collection_name}, top_k={request.top_k}")
         
-        # Perform search
-        results = controller.search_documents(
+        # Perform search in a worker thread so the event loop keeps serving
+        # other requests (e.g. job status polls) while the query is embedded
+        results = await run_in_threadpool(
+            controller.search_documents,
             query=request.query,
             collection_name=request.collection_name,
             top_k=request.top_k
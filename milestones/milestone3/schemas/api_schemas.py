@@ -1,6 +1,7 @@
 """Pydantic schemas for API request/response validation."""
 
 from pydantic import BaseModel, Field
+from datetime import datetime
 from typing import List, Optional
 
 # INDEX ENDPOINT SCHEMAS
@@ -11,6 +12,7 @@ class IndexRequest(BaseModel):
     collection_name: str = Field(default="documents", description="ChromaDB collection name")
     chunk_size: int = Field(default=500, ge=100, le=2000, description="Size of text chunks")
     chunk_overlap: int = Field(default=50, ge=0, le=500, description="Overlap between chunks")
+    force_reindex: bool = Field(default=False, description="Drop the collection and rebuild it instead of indexing incrementally")
     
     class Config:
         json_schema_extra = {
@@ -18,7 +20,8 @@ class IndexRequest(BaseModel):
                 "documents_path": "data",
                 "collection_name": "documents",
                 "chunk_size": 500,
-                "chunk_overlap": 50
+                "chunk_overlap": 50,
+                "force_reindex": False
             }
         }
 
@@ -30,6 +33,15 @@ class IndexResponse(BaseModel):
     documents_indexed: int = Field(..., description="Number of documents indexed")
     chunks_created: int = Field(..., description="Number of text chunks created")
     collection_name: str = Field(..., description="ChromaDB collection name")
+    files_scanned: int = Field(0, description="Number of files found in the directory")
+    files_added: int = Field(0, description="Number of new files indexed")
+    files_updated: int = Field(0, description="Number of changed files re-indexed")
+    files_removed: int = Field(0, description="Number of deleted files removed from the collection")
+    files_unchanged: int = Field(0, description="Number of unchanged files skipped")
+    chunks_embedded: int = Field(0, description="Number of new or changed chunks embedded and upserted")
+    chunks_deleted: int = Field(0, description="Number of stale chunks deleted")
+    embedding_seconds: float = Field(0.0, description="Time spent embedding chunks, in seconds")
+    chunks_per_second: float = Field(0.0, description="Embedding throughput (chunks embedded per second)")
     
     class Config:
         json_schema_extra = {
@@ -38,7 +50,66 @@ class IndexResponse(BaseModel):
                 "message": "Documents indexed successfully",
                 "documents_indexed": 11,
                 "chunks_created": 22,
-                "collection_name": "documents"
+                "collection_name": "documents",
+                "files_scanned": 3,
+                "files_added": 3,
+                "files_updated": 0,
+                "files_removed": 0,
+                "files_unchanged": 0,
+                "chunks_embedded": 22,
+                "chunks_deleted": 0,
+                "embedding_seconds": 0.412,
+                "chunks_per_second": 53.4
+            }
+        }
+
+class IndexJobProgress(BaseModel):
+    """Progress of a background indexing job."""
+    files_total: int = Field(0, description="Number of new or changed files to index")
+    files_done: int = Field(0, description="Number of files loaded and chunked so far")
+    chunks_created: int = Field(0, description="Number of chunks created so far")
+    chunks_embedded: int = Field(0, description="Number of chunks embedded and upserted so far")
+    elapsed_seconds: float = Field(0.0, description="Time since the job started running")
+    files_per_second: float = Field(0.0, description="File throughput")
+    chunks_per_second: float = Field(0.0, description="Chunk embedding throughput")
+    eta_seconds: Optional[float] = Field(None, description="Estimated time remaining (None until measurable)")
+
+
+class IndexJobResponse(BaseModel):
+    """Status of a background indexing job."""
+    job_id: str = Field(..., description="Job identifier")
+    status: str = Field(..., description="queued, running, completed, failed or cancelled")
+    documents_path: str = Field(..., description="Resolved documents directory")
+    collection_name: str = Field(..., description="ChromaDB collection name")
+    created_at: datetime = Field(..., description="When the job was submitted")
+    started_at: Optional[datetime] = Field(None, description="When the job started running")
+    finished_at: Optional[datetime] = Field(None, description="When the job finished")
+    progress: IndexJobProgress = Field(default_factory=IndexJobProgress, description="Progress counters")
+    result: Optional[IndexResponse] = Field(None, description="Indexing statistics once the job has finished")
+    error: Optional[str] = Field(None, description="Error message if the job failed")
+    
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "job_id": "3f2c9a7e5b0d4c1e9f8a6b2d7c4e1a90",
+                "status": "running",
+                "documents_path": "/app/data",
+                "collection_name": "documents",
+                "created_at": "2025-01-01T10:00:00Z",
+                "started_at": "2025-01-01T10:00:01Z",
+                "finished_at": None,
+                "progress": {
+                    "files_total": 120,
+                    "files_done": 45,
+                    "chunks_created": 900,
+                    "chunks_embedded": 768,
+                    "elapsed_seconds": 30.2,
+                    "files_per_second": 1.49,
+                    "chunks_per_second": 25.4,
+                    "eta_seconds": 50.3
+                },
+                "result": None,
+                "error": None
             }
         }
 
@@ -0,0 +1,191 @@
+"""
+Tests for the ingestion EmbeddingEngine: length-sorted batching, order
+restoration, the shared multi-process pool and throughput reporting.
+
+The sentence-transformers model is replaced by a stub that records how it is
+called and embeds a text as [length, character sum], so no model is loaded.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import chromadb
+import numpy as np
+from controllers.document_controller import DocumentController
+from models import embedding_engine
+from models.embedding_engine import EmbeddingEngine, TimedEmbeddings
+from models.vector_store import VectorStoreManager
+from views.base_view import SilentView
+
+SECONDS_PER_TEXT = 0.002
+
+
+def _vector(text):
+    return [float(len(text)), float(sum(map(ord, text)))]
+
+
+class StubModel:
+    """SentenceTransformer stand-in recording encode calls and pool starts/stops."""
+
+    def __init__(self, model_name):
+        self.model_name = model_name
+        self.encoded = []
+        self.batch_sizes = []
+        self.multi_process_calls = 0
+        self.pools_started = 0
+        self.pools_stopped = 0
+        self._lock = threading.Lock()
+
+    def encode(self, texts, batch_size=32, convert_to_numpy=True):
+        if isinstance(texts, str):
+            return np.array(_vector(texts))
+        with self._lock:
+            self.encoded.append(list(texts))
+            self.batch_sizes.append(batch_size)
+        time.sleep(SECONDS_PER_TEXT * len(texts))
+        return np.array([_vector(text) for text in texts])
+
+    def start_multi_process_pool(self, target_devices=None):
+        self.pools_started += 1
+        return {"processes": ["worker"] * 2}
+
+    def stop_multi_process_pool(self, pool):
+        self.pools_stopped += 1
+
+    def encode_multi_process(self, texts, pool, batch_size=32):
+        self.multi_process_calls += 1
+        return self.encode(texts, batch_size=batch_size)
+
+
+def _engine(**kwargs):
+    original = embedding_engine.SentenceTransformer
+    embedding_engine.SentenceTransformer = StubModel
+    try:
+        return EmbeddingEngine(model_name="stub-model", **kwargs)
+    finally:
+        embedding_engine.SentenceTransformer = original
+
+
+TEXTS = ["mid length text", "a", "the longest text of them all", "", "short one", "xy"]
+
+
+def test_texts_are_encoded_longest_first_and_returned_in_input_order():
+    engine = _engine(batch_size=2)
+
+    embeddings = engine.embed_documents(TEXTS)
+
+    # One call with the texts sorted by length, so each batch of 2 holds similar lengths
+    assert engine.model.encoded == [sorted(TEXTS, key=len, reverse=True)]
+    assert engine.model.batch_sizes == [2]
+    # Results line up with the input again
+    assert embeddings == [_vector(text) for text in TEXTS]
+    assert engine.embed_documents([]) == []
+    assert engine.embed_query("query") == _vector("query")
+    assert engine.texts_embedded == len(TEXTS)
+
+
+def test_pool_is_shared_and_stopped_by_its_last_user():
+    engine = _engine(multi_process=True)
+
+    engine.start_pool()
+    engine.start_pool()
+    assert engine.model.pools_started == 1
+    assert engine.embed_documents(TEXTS) == [_vector(text) for text in TEXTS]
+    assert engine.model.multi_process_calls == 1
+
+    engine.stop_pool()
+    assert engine.model.pools_stopped == 0
+    engine.stop_pool()
+    assert engine.model.pools_stopped == 1
+    # Without the pool, texts are encoded in this process
+    engine.embed_documents(TEXTS)
+    assert engine.model.multi_process_calls == 1
+    engine.stop_pool()
+    assert engine.model.pools_stopped == 1
+
+
+def test_concurrent_runs_share_one_pool():
+    engine = _engine(multi_process=True)
+    inside = threading.Barrier(4)
+
+    def run():
+        with engine:
+            inside.wait()
+            engine.embed_documents(TEXTS)
+
+    threads = [threading.Thread(target=run) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert (engine.model.pools_started, engine.model.pools_stopped) == (1, 1)
+    assert engine.model.multi_process_calls == 4
+    assert engine.texts_embedded == 4 * len(TEXTS)
+
+
+def test_single_process_engine_never_starts_a_pool():
+    engine = _engine(multi_process=False)
+    with engine:
+        engine.embed_documents(TEXTS)
+    assert (engine.model.pools_started, engine.model.multi_process_calls) == (0, 0)
+
+
+def test_timed_embeddings_report_this_runs_throughput():
+    engine = _engine()
+    timed = TimedEmbeddings(engine)
+    # Another run's work on the shared engine is not counted
+    engine.embed_documents(TEXTS)
+
+    assert timed.embed_documents(TEXTS) == [_vector(text) for text in TEXTS]
+    assert timed.texts_embedded == len(TEXTS)
+    assert timed.embedding_seconds >= SECONDS_PER_TEXT * len(TEXTS)
+    assert engine.texts_embedded == 2 * len(TEXTS)
+
+
+def test_index_documents_reports_chunks_per_second():
+    with tempfile.TemporaryDirectory() as directory:
+        docs_dir = os.path.join(directory, "docs")
+        os.makedirs(docs_dir)
+        for i in range(3):
+            with open(os.path.join(docs_dir, f"doc_{i}.txt"), "w", encoding="utf-8") as f:
+                f.write("\n\n".join(f"EBLA document {i} paragraph {p}. " * 8 for p in range(5)))
+
+        # Skip loading the embedding model
+        manager = VectorStoreManager.__new__(VectorStoreManager)
+        manager.persist_directory = os.path.join(directory, "chroma")
+        manager.embedding_model = "stub-model"
+        manager.embeddings = _engine(batch_size=8)
+        manager.client = chromadb.PersistentClient(path=manager.persist_directory)
+        controller = DocumentController.__new__(DocumentController)
+        controller.vector_store_manager = manager
+        controller.upsert_batch_size = 1024
+        controller.view = SilentView()
+
+        result = controller.index_documents(docs_dir, collection_name="throughput", chunk_size=300, chunk_overlap=0)
+
+    assert result["chunks_embedded"] == result["chunks_created"] == manager.embeddings.texts_embedded > 0
+    # All chunks were collected across files into one length-sorted call
+    assert len(manager.embeddings.model.encoded) == 1
+    assert result["embedding_seconds"] >= SECONDS_PER_TEXT * result["chunks_embedded"] - 0.0005
+    print(f"{result['chunks_embedded']} chunks in {result['embedding_seconds']}s: {result['chunks_per_second']} chunks/s")
+    assert 0 < result["chunks_per_second"] <= 1 / SECONDS_PER_TEXT
+    # embedding_seconds is reported rounded to the millisecond
+    assert result["chunks_embedded"] / (result["embedding_seconds"] + 0.0005) <= result["chunks_per_second"] + 0.05
+    assert result["chunks_per_second"] <= result["chunks_embedded"] / (result["embedding_seconds"] - 0.0005) + 0.05
+
+
+if __name__ == "__main__":
+    test_texts_are_encoded_longest_first_and_returned_in_input_order()
+    test_pool_is_shared_and_stopped_by_its_last_user()
+    test_concurrent_runs_share_one_pool()
+    test_single_process_engine_never_starts_a_pool()
+    test_timed_embeddings_report_this_runs_throughput()
+    test_index_documents_reports_chunks_per_second()
+    print("Embedding engine tests passed")
@@ -0,0 +1,151 @@
+"""
+Tests for incremental re-indexing in DocumentController.index_documents.
+
+Indexes a temporary directory into a real (temporary) Chroma collection with
+a stub embedder that counts the texts it embeds, so no embedding model is needed.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import chromadb
+from langchain_core.embeddings import Embeddings
+from controllers.document_controller import DocumentController
+from models.vector_store import VectorStoreManager
+from views.base_view import SilentView
+
+COLLECTION = "incremental-test"
+PARAGRAPHS = {
+    "overview.txt": [f"EBLA overview paragraph {i}. " * 8 for i in range(6)],
+    "services.txt": [f"EBLA services paragraph {i}. " * 8 for i in range(6)],
+    "partners.txt": [f"EBLA partners paragraph {i}. " * 8 for i in range(6)],
+}
+
+
+class CountingEmbeddings(Embeddings):
+    """Embedding stub that counts the texts it embeds."""
+
+    def __init__(self):
+        self.texts_embedded = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def embed_documents(self, texts):
+        self.texts_embedded += len(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+def _controller(persist_directory):
+    # Skip loading the embedding model
+    manager = VectorStoreManager.__new__(VectorStoreManager)
+    manager.persist_directory = persist_directory
+    manager.embedding_model = "counting-stub"
+    manager.embeddings = CountingEmbeddings()
+    manager.client = chromadb.PersistentClient(path=persist_directory)
+
+    controller = DocumentController.__new__(DocumentController)
+    controller.vector_store_manager = manager
+    controller.upsert_batch_size = 1024
+    controller.view = SilentView()
+    return controller
+
+
+def _write(docs_dir, name, paragraphs):
+    with open(os.path.join(docs_dir, name), "w", encoding="utf-8") as f:
+        f.write("\n\n".join(paragraphs))
+
+
+def _stored(controller, name):
+    """Stored chunks of one file as {chunk_id: metadata}."""
+    collection = controller.vector_store_manager.client.get_collection(COLLECTION)
+    stored = collection.get(include=["metadatas"])
+    return {
+        chunk_id: metadata
+        for chunk_id, metadata in zip(stored["ids"], stored["metadatas"])
+        if os.path.basename(metadata["source"]) == name
+    }
+
+
+def _index(controller, docs_dir):
+    return controller.index_documents(docs_dir, collection_name=COLLECTION, chunk_size=300, chunk_overlap=0)
+
+
+def _setup(directory):
+    docs_dir = os.path.join(directory, "docs")
+    os.makedirs(docs_dir)
+    for name, paragraphs in PARAGRAPHS.items():
+        _write(docs_dir, name, paragraphs)
+    controller = _controller(os.path.join(directory, "chroma"))
+    first = _index(controller, docs_dir)
+    assert first["chunks_embedded"] == first["chunks_created"] > 0
+    return controller, docs_dir
+
+
+def test_unchanged_rerun_embeds_nothing():
+    with tempfile.TemporaryDirectory() as directory:
+        controller, docs_dir = _setup(directory)
+        embeddings = controller.vector_store_manager.embeddings
+        embedded_before = embeddings.texts_embedded
+
+        second = _index(controller, docs_dir)
+
+        assert embeddings.texts_embedded == embedded_before
+        assert second["files_unchanged"] == len(PARAGRAPHS)
+        assert (second["chunks_embedded"], second["chunks_deleted"]) == (0, 0)
+
+
+def test_changed_file_replaces_only_its_chunks():
+    with tempfile.TemporaryDirectory() as directory:
+        controller, docs_dir = _setup(directory)
+        embeddings = controller.vector_store_manager.embeddings
+        untouched_before = _stored(controller, "overview.txt")
+        kept_ids = set(_stored(controller, "services.txt"))
+        embedded_before = embeddings.texts_embedded
+
+        # A new paragraph at the top shifts every unchanged chunk of the file down by one
+        _write(docs_dir, "services.txt", ["EBLA services introduction. " * 8] + PARAGRAPHS["services.txt"])
+        result = _index(controller, docs_dir)
+        services = _stored(controller, "services.txt")
+
+        assert result["files_updated"] == 1
+        assert result["chunks_embedded"] == embeddings.texts_embedded - embedded_before == 1
+        assert result["chunks_deleted"] == 0
+        assert kept_ids < set(services)
+        # Only the changed file was written; the others kept their chunks and metadata
+        assert _stored(controller, "overview.txt") == untouched_before
+        # Unchanged chunks that moved carry their new position, not the one from the first run
+        assert sorted(metadata["chunk_index"] for metadata in services.values()) == list(range(len(services)))
+        assert all(services[chunk_id]["chunk_index"] > 0 for chunk_id in kept_ids)
+
+
+def test_deleted_file_chunks_are_removed():
+    with tempfile.TemporaryDirectory() as directory:
+        controller, docs_dir = _setup(directory)
+        removed_ids = set(_stored(controller, "partners.txt"))
+
+        os.remove(os.path.join(docs_dir, "partners.txt"))
+        result = _index(controller, docs_dir)
+
+        assert result["files_removed"] == 1
+        assert result["chunks_deleted"] == len(removed_ids) > 0
+        assert result["chunks_embedded"] == 0
+        assert _stored(controller, "partners.txt") == {}
+        assert _stored(controller, "services.txt")
+
+
+if __name__ == "__main__":
+    test_unchanged_rerun_embeds_nothing()
+    test_changed_file_replaces_only_its_chunks()
+    test_deleted_file_chunks_are_removed()
+    print("Incremental indexing tests passed")
@@ -0,0 +1,252 @@
+"""
+Tests for background indexing jobs (IndexJobManager) and the /index job endpoints.
+
+The DocumentController is replaced by a stub whose index_documents reports
+progress file by file and needs a permit per file, so tests decide how far
+each job gets. No embedding model or Chroma collection is used.
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from controllers.index_job_manager import IndexJobManager
+from models.index_job import IndexJob, JobStatus
+
+FILES_PER_JOB = 4
+
+
+class GatedController:
+    """index_documents stub: one permit per file (by documents_path), honouring cancellation between files."""
+
+    def __init__(self):
+        self.permits = defaultdict(lambda: threading.Semaphore(0))
+        self.started = []
+        self._lock = threading.Lock()
+
+    def allow(self, documents_path, files=FILES_PER_JOB):
+        """Let the job(s) on documents_path process this many more files."""
+        for _ in range(files):
+            self.permits[documents_path].release()
+
+    def index_documents(self, documents_path, collection_name, chunk_size, chunk_overlap, force_reindex, progress):
+        with self._lock:
+            self.started.append(documents_path)
+        progress.start(FILES_PER_JOB)
+        cancelled = False
+        for _ in range(FILES_PER_JOB):
+            if progress.cancelled:
+                cancelled = True
+                break
+            assert self.permits[documents_path].acquire(timeout=10)
+            progress.file_done(chunks_created=3)
+            progress.chunks_upserted(3)
+        return {
+            "status": "cancelled" if cancelled else "success",
+            "documents_indexed": progress.files_done,
+            "chunks_created": progress.chunks_created,
+            "collection_name": collection_name
+        }
+
+
+def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def _manager(max_workers=2, **kwargs):
+    controller = GatedController()
+    return IndexJobManager(controller, max_workers=max_workers, **kwargs), controller
+
+
+def test_jobs_on_one_collection_run_in_fifo_order():
+    manager, controller = _manager(max_workers=3)
+    try:
+        first = manager.submit(IndexJob("a-1", "a"))
+        second = manager.submit(IndexJob("a-2", "a"))
+        other = manager.submit(IndexJob("b-1", "b"))
+
+        # The other collection runs alongside; the second job on "a" waits without a worker
+        _wait_for(lambda: first.status == other.status == JobStatus.RUNNING)
+        time.sleep(0.05)
+        assert second.status == JobStatus.QUEUED
+        assert controller.started == ["a-1", "b-1"] or controller.started == ["b-1", "a-1"]
+
+        controller.allow("a-1")
+        _wait_for(lambda: second.status == JobStatus.RUNNING)
+        assert first.status == JobStatus.COMPLETED
+
+        controller.allow("a-2")
+        controller.allow("b-1")
+        _wait_for(lambda: second.finished and other.finished)
+        assert controller.started.index("a-1") < controller.started.index("a-2")
+        assert [job.job_id for job in manager.list_jobs()] == [other.job_id, second.job_id, first.job_id]
+        assert first.result["documents_indexed"] == FILES_PER_JOB
+    finally:
+        manager.shutdown()
+
+
+def test_progress_reports_throughput_and_eta():
+    manager, controller = _manager()
+    try:
+        job = manager.submit(IndexJob("slow", "a"))
+        _wait_for(lambda: job.status == JobStatus.RUNNING)
+        time.sleep(0.05)
+        controller.allow("slow", files=1)
+        _wait_for(lambda: job.progress.files_done == 1)
+        time.sleep(0.05)
+
+        snapshot = job.progress.snapshot()
+        assert snapshot["files_total"] == FILES_PER_JOB
+        assert snapshot["files_done"] == 1
+        assert snapshot["files_per_second"] > 0 and snapshot["eta_seconds"] > 0
+
+        controller.allow("slow", files=FILES_PER_JOB - 1)
+        _wait_for(lambda: job.finished)
+        snapshot = job.progress.snapshot()
+        assert job.status == JobStatus.COMPLETED
+        assert snapshot["files_done"] == FILES_PER_JOB
+        assert snapshot["chunks_embedded"] == 3 * FILES_PER_JOB
+        assert snapshot["eta_seconds"] is None
+    finally:
+        manager.shutdown()
+
+
+def test_cancel_queued_and_running_jobs():
+    manager, controller = _manager(max_workers=1)
+    try:
+        running = manager.submit(IndexJob("running", "a"))
+        # Waits for collection "a"
+        waiting = manager.submit(IndexJob("waiting", "a"))
+        # Handed to the executor, waiting for the only worker
+        pending = manager.submit(IndexJob("pending", "b"))
+        _wait_for(lambda: running.status == JobStatus.RUNNING)
+
+        # Queued jobs are cancelled at once, wherever they wait
+        for job in (waiting, pending):
+            assert manager.cancel(job.job_id).status == JobStatus.CANCELLED
+            assert job.finished_at is not None
+
+        # A running job stops after its current file
+        manager.cancel(running.job_id)
+        controller.allow("running")
+        _wait_for(lambda: running.finished)
+        assert running.status == JobStatus.CANCELLED
+        assert running.result["status"] == "cancelled"
+        assert running.progress.files_done == 1
+
+        # The cancelled jobs never ran, and the worker and the collections are free again
+        time.sleep(0.05)
+        assert controller.started == ["running"]
+        after = manager.submit(IndexJob("after", "b"))
+        controller.allow("after")
+        _wait_for(lambda: after.finished)
+        assert after.status == JobStatus.COMPLETED
+        assert pending.status == JobStatus.CANCELLED
+        assert manager.cancel("unknown") is None
+    finally:
+        manager.shutdown()
+
+
+def test_finished_jobs_are_evicted():
+    manager, controller = _manager(max_finished_jobs=2, job_retention_seconds=0.3)
+    try:
+        jobs = []
+        for i in range(4):
+            controller.allow(f"job-{i}")
+            jobs.append(manager.submit(IndexJob(f"job-{i}", "a")))
+            _wait_for(lambda: jobs[-1].finished)
+
+        # Only the newest finished jobs are kept
+        assert [job.job_id for job in manager.list_jobs()] == [jobs[3].job_id, jobs[2].job_id]
+        assert manager.get(jobs[0].job_id) is None
+
+        # ... and only for the retention window, while unfinished jobs are always kept
+        running = manager.submit(IndexJob("running", "b"))
+        time.sleep(0.4)
+        assert [job.job_id for job in manager.list_jobs()] == [running.job_id]
+        controller.allow("running")
+    finally:
+        manager.shutdown()
+
+
+def _index_router():
+    """Import routers.index without loading the embedding model, its default store in a temp dir."""
+    from models import embedding_engine
+
+    class StubModel:
+        def __init__(self, model_name):
+            self.model_name = model_name
+
+    original_model, cwd = embedding_engine.SentenceTransformer, os.getcwd()
+    embedding_engine.SentenceTransformer = StubModel
+    with tempfile.TemporaryDirectory() as directory:
+        os.chdir(directory)
+        try:
+            from routers import index
+        finally:
+            os.chdir(cwd)
+            embedding_engine.SentenceTransformer = original_model
+    return index
+
+
+def test_index_endpoints_run_jobs_in_the_background():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+
+    index = _index_router()
+    original_manager = index.job_manager
+    index.job_manager, controller = _manager()
+    app = FastAPI()
+    app.include_router(index.router, prefix="/api/v1")
+    try:
+        with tempfile.TemporaryDirectory() as docs_dir, TestClient(app) as client:
+            response = client.post("/api/v1/index", json={"documents_path": docs_dir, "collection_name": "api"})
+            assert response.status_code == 202
+            job = response.json()
+            assert job["status"] in ("queued", "running")
+            assert job["documents_path"] == docs_dir and job["result"] is None
+
+            _wait_for(lambda: client.get(f"/api/v1/index/jobs/{job['job_id']}").json()["status"] == "running")
+            controller.allow(docs_dir)
+            _wait_for(lambda: client.get(f"/api/v1/index/jobs/{job['job_id']}").json()["status"] == "completed")
+
+            done = client.get(f"/api/v1/index/jobs/{job['job_id']}").json()
+            assert done["progress"]["files_done"] == FILES_PER_JOB
+            assert done["result"]["message"] == "Documents indexed successfully"
+            assert done["result"]["documents_indexed"] == FILES_PER_JOB
+            assert [listed["job_id"] for listed in client.get("/api/v1/index/jobs").json()] == [job["job_id"]]
+
+            # A job waiting behind a running one on the same collection is cancelled at once
+            running = client.post("/api/v1/index", json={"documents_path": docs_dir, "collection_name": "api"}).json()
+            queued = client.post("/api/v1/index", json={"documents_path": docs_dir, "collection_name": "api"}).json()
+            cancelled = client.post(f"/api/v1/index/jobs/{queued['job_id']}/cancel")
+            assert cancelled.status_code == 200
+            assert cancelled.json()["status"] == "cancelled"
+            controller.allow(docs_dir)
+            _wait_for(lambda: client.get(f"/api/v1/index/jobs/{running['job_id']}").json()["status"] == "completed")
+
+            assert client.get("/api/v1/index/jobs/unknown").status_code == 404
+            assert client.post("/api/v1/index/jobs/unknown/cancel").status_code == 404
+            missing = client.post("/api/v1/index", json={"documents_path": os.path.join(docs_dir, "missing")})
+            assert missing.status_code == 404
+    finally:
+        index.job_manager.shutdown()
+        index.job_manager = original_manager
+
+
+if __name__ == "__main__":
+    test_jobs_on_one_collection_run_in_fifo_order()
+    test_progress_reports_throughput_and_eta()
+    test_cancel_queued_and_running_jobs()
+    test_finished_jobs_are_evicted()
+    test_index_endpoints_run_jobs_in_the_background()
+    print("Indexing job tests passed")
@@ -1,6 +1,7 @@
 """Chat router for RAG endpoint."""
 
 from fastapi import APIRouter, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from models.api_schemas import ChatRequest, ChatResponse
 from services.rag_service import RAGService
 import logging
@@ -24,7 +25,8 @@ async def chat_endpoint(request: ChatRequest):
     """
     try:
         logger.info(f"Chat request: query='{request.query}'")
-        response = rag_service.process_query(request)
+        # process_query blocks on embedding, Chroma and Ollama; keep it off the event loop
+        response = await run_in_threadpool(rag_service.process_query, request)
         return response
         
     except Exception as e:
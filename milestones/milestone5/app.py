@@ -1,9 +1,11 @@
 """Main application entry point"""
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import chat_router, history_router
 from repositories.database.db_connection import init_db
+from services.container import ServiceContainer
 import logging
 
 
@@ -14,20 +16,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the database and build shared components once per process."""
+    logger.info("Initializing database...")
+    init_db()
+    logger.info("Database initialized successfully")
+
+    # Embedding model, Chroma client and Ollama client live for the whole app
+    app.state.container = ServiceContainer()
+    yield
+    app.state.container.close()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="EBLA RAG Chat API - Milestone 5",
     description="Context-aware RAG system with chat history and prompt engineering",
-    version="5.0.0"
+    version="5.0.0",
+    lifespan=lifespan
 )
 
-# Initialize database on startup
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Initializing database...")
-    init_db()
-    logger.info("Database initialized successfully")
-
 
 # Include routers
 app.include_router(chat_router.router)
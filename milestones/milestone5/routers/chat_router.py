@@ -1,10 +1,9 @@
 """ Chat Router for RAG-based context-aware chat endpoint."""
 
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
 from services.rag_service import RAGService
+from services.container import get_rag_service
 from schemas.chat_schema import ChatRequest, ChatResponse
-from repositories.database.db_connection import get_db
 
 router = APIRouter(
     prefix="/api/v1/chat",
@@ -12,7 +11,7 @@ router = APIRouter(
 )
 
 @router.post("", response_model=ChatResponse)
-async def chat(request: ChatRequest, db: Session = Depends(get_db)):
+async def chat(request: ChatRequest, rag_service: RAGService = Depends(get_rag_service)):
     """
     Context-aware RAG chat endpoint with history.
     
@@ -22,8 +21,6 @@ async def chat(request: ChatRequest, db: Session = Depends(get_db)):
     - Generates AI response using LLM
     - Saves conversation to database
     """
-    rag_service = RAGService(db)
-    
     try:
         response = rag_service.process_chat(request)
     except ValueError as e:
@@ -0,0 +1,74 @@
+"""Process-wide component container for shared, expensive-to-build services."""
+
+from fastapi import Depends, Request
+from sqlalchemy.orm import Session
+from repositories.database.db_connection import get_db
+from services.vector_store import VectorStoreManager
+from services.llm_service import LLMModel
+from services.rag_service import RAGService
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    Holds the components that must be built once per process and shared by every request.
+
+    Attributes:
+        vector_store: VectorStoreManager owning the embedding model and the Chroma client
+        llm_model: LLMModel owning the Ollama client
+    """
+
+    def __init__(
+        self,
+        vector_store: Optional[VectorStoreManager] = None,
+        llm_model: Optional[LLMModel] = None
+    ) -> None:
+        """
+        Build the shared components (or accept pre-built ones, e.g. for tests).
+
+        Args:
+            vector_store: Optional pre-built VectorStoreManager
+            llm_model: Optional pre-built LLMModel
+        """
+        logger.info("Building service container...")
+        self.vector_store: VectorStoreManager = vector_store if vector_store is not None else VectorStoreManager()
+        self.llm_model: LLMModel = llm_model if llm_model is not None else LLMModel()
+        logger.info("Service container ready")
+
+    def close(self) -> None:
+        """Release shared resources on application shutdown."""
+        logger.info("Service container closed")
+
+
+def get_container(request: Request) -> ServiceContainer:
+    """
+    Dependency function returning the container built in the app lifespan.
+
+    Args:
+        request: Incoming FastAPI request
+
+    Returns:
+        The process-wide ServiceContainer
+    """
+    return request.app.state.container
+
+
+def get_rag_service(
+    db: Session = Depends(get_db),
+    container: ServiceContainer = Depends(get_container)
+) -> RAGService:
+    """
+    Dependency function providing a RAGService for the current request.
+    Only the SQLAlchemy session is per-request; everything else comes from the container.
+
+    Returns:
+        RAGService bound to the request's database session
+    """
+    return RAGService(
+        db,
+        vector_store=container.vector_store,
+        llm_model=container.llm_model
+    )
@@ -1,6 +1,6 @@
 """Service layer for RAG workflow with Chat History integration."""
 
-from typing import List
+from typing import List, Optional
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
 from config import settings
@@ -28,19 +28,28 @@ class RAGService:
     - Response validation 
     """
     
-    def __init__(self, db: Session) -> None:
+    def __init__(
+        self,
+        db: Session,
+        vector_store: Optional[VectorStoreManager] = None,
+        llm_model: Optional[LLMModel] = None
+    ) -> None:
         """
         Initialize RAG service with database connection and required dependencies.
         
         Args:
             db: SQLAlchemy database session
+            vector_store: Shared VectorStoreManager (built here if not provided)
+            llm_model: Shared LLMModel (built here if not provided)
         """
         self.db: Session = db
         self.session_repo: SessionRepository = SessionRepository(db)
         self.message_repo: MessageRepository = MessageRepository(db)
         self.summary_repo: SummaryRepository = SummaryRepository(db)
-        self.vector_store: VectorStoreManager = VectorStoreManager()
-        self.llm_model: LLMModel = LLMModel()
+        # Loading the embedding model and LLM client is expensive, so the API
+        # injects process-wide instances; standalone scripts fall back to new ones.
+        self.vector_store: VectorStoreManager = vector_store if vector_store is not None else VectorStoreManager()
+        self.llm_model: LLMModel = llm_model if llm_model is not None else LLMModel()
 
     def summarize_session(self, session_id: str) -> str:
         """
@@ -2,6 +2,7 @@
 
 import os
 import sys
+import chromadb
 from langchain_community.vectorstores import Chroma
 from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.documents import Document
@@ -25,10 +26,13 @@ class VectorStoreManager:
             embedding_model = settings.embedding_model_name
             
         self.persist_directory = persist_directory
+        self.embedding_model = embedding_model
         self.embeddings = HuggingFaceEmbeddings(
             model_name=embedding_model
         )
         os.makedirs(persist_directory, exist_ok=True)
+        # One persistent client per manager instead of one per load()/create()
+        self.client = chromadb.PersistentClient(path=persist_directory)
     
     def create(self, documents: List[Document], collection_name: str = "documents") -> Chroma:
         """Create and populate vector store."""
@@ -36,7 +40,7 @@ class VectorStoreManager:
             documents=documents,
             embedding=self.embeddings,
             collection_name=collection_name,
-            persist_directory=self.persist_directory
+            client=self.client
         )
     
     def load(self, collection_name: str = "documents") -> Chroma:
@@ -44,7 +48,7 @@ class VectorStoreManager:
         return Chroma(
             collection_name=collection_name,
             embedding_function=self.embeddings,
-            persist_directory=self.persist_directory
+            client=self.client
         )
     
     def search(self, query: str, collection_name: str = "documents", k: int = 3) -> List[Dict]:
@@ -1,9 +1,14 @@
 """Main application entry point"""
 
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from routers import chat_router, history_router
 from repositories.database.db_connection import init_db
+from services.container import ServiceContainer
+from utils.metrics import REGISTRY
+from utils.prompt_builder import prompt_tokenizer_status
 import logging
 
 
@@ -14,20 +19,28 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Initialize the database and build shared components once per process."""
+    logger.info("Initializing database...")
+    init_db()
+    logger.info("Database initialized successfully")
+
+    # Embedding model, Chroma client and Ollama client live for the whole app
+    app.state.container = ServiceContainer()
+    yield
+    await app.state.container.aclose()
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title="EBLA RAG Chat API - Milestone 5",
     description="Context-aware RAG system with chat history and prompt engineering",
-    version="5.0.0"
+    version="5.0.0",
+    lifespan=lifespan
 )
 
-# Initialize database on startup
-@app.on_event("startup")
-async def startup_event():
-    logger.info("Initializing database...")
-    init_db()
-    logger.info("Database initialized successfully")
-
 
 # Include routers
 app.include_router(chat_router.router)
@@ -39,11 +52,18 @@ async def root():
         "message": "EBLA RAG Chat API - Milestone 5",
         "endpoints": {
             "chat": "/api/v1/chat",
+            "chat_stream": "/api/v1/chat/stream",
             "history": "/api/v1/history/{session_id}",
+            "metrics": "/metrics",
             "docs": "/docs"
         }
     }
 
 @app.get("/health")
 async def health_check():
-    return {"status": "healthy"}
+    return {"status": "healthy", "prompt_tokenizer": prompt_tokenizer_status()}
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics (chat stage latencies, cache hits, tokens, LLM queue depth, wait times, rejections)."""
+    return PlainTextResponse(REGISTRY.render(), media_type="text/plain; version=0.0.4")
@@ -0,0 +1,349 @@
+"""
+Load test: throughput, tail latency and error rate of the chat API under concurrent traffic.
+
+Boots the FastAPI app in-process (httpx ASGI transport) against a temporary SQLite
+database, with a stub retriever and a stub LLM that only sleep for configurable times.
+The numbers therefore measure the app itself (routing, session/history queries,
+prompt building, admission control, persistence) rather than Ollama or Chroma.
+
+Each concurrent worker plays one user: it starts a session, asks a few questions in
+it (so history is used) and reads the session history in between, then starts over.
+Results per endpoint (p50/p95/p99/mean/max latency, throughput, error rate, status
+codes) and the mean time per chat stage are printed and written to a JSON file, so
+runs can be compared across commits.
+
+With --llm fake-ollama the real LLMModel (Ollama client, pooled HTTP connections) is
+used against the bundled fake Ollama server (benchmarks/fake_ollama.py) with the same
+latency settings, so the HTTP path to the model is measured too.
+
+Pass --url to drive an already running server instead (stubs and SQLite are then
+not used; the stage breakdown is read from its /metrics endpoint).
+
+Usage:
+    python benchmarks/bench_chat_load.py --concurrency 16 --duration 20 --output load.json
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from contextlib import ExitStack
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import httpx
+
+STAGES = ("session", "history", "search", "prompt", "llm", "persist", "validation", "coalesced")
+EMBEDDING_DIM = 32
+
+
+class StubVectorStore:
+    """Deterministic per-question embeddings and fixed sources, with a simulated search latency."""
+
+    def __init__(self, search_ms: float):
+        self.search_ms = search_ms
+
+    async def aembed_query(self, query: str) -> List[float]:
+        # Unrelated questions get near-orthogonal vectors, so the answer cache only matches repeats
+        rng = random.Random(hashlib.sha256(" ".join(query.lower().split()).encode()).digest())
+        vector = [rng.gauss(0.0, 1.0) for _ in range(EMBEDDING_DIM)]
+        norm = math.sqrt(sum(x * x for x in vector))
+        return [x / norm for x in vector]
+
+    async def asearch_by_vector(self, embedding, collection_name="documents", k=3):
+        await asyncio.sleep(self.search_ms / 1000)
+        return [
+            {
+                "document": f"EBLA provides cloud, licensing and cybersecurity services (chunk {i}).",
+                "metadata": {"source": "stub"},
+                "distance": 0.1 * (i + 1)
+            }
+            for i in range(k)
+        ]
+
+    async def acollection_version(self, collection_name: str) -> int:
+        return 0
+
+
+class StubLLM:
+    """Answers after a fixed time to first token plus a per-token generation time."""
+
+    def __init__(self, ttft_ms: float, tokens: int, tokens_per_second: float):
+        self.ttft_ms = ttft_ms
+        self.tokens = tokens
+        self.tokens_per_second = tokens_per_second
+
+    def _duration(self) -> float:
+        return self.ttft_ms / 1000 + self.tokens / self.tokens_per_second
+
+    def generate(self, prompt: str, system: Optional[str] = None) -> str:
+        time.sleep(self._duration())
+        return "word " * self.tokens
+
+    async def agenerate(self, prompt: str, system: Optional[str] = None) -> str:
+        await asyncio.sleep(self._duration())
+        return "word " * self.tokens
+
+    async def astream(self, prompt: str, system: Optional[str] = None):
+        await asyncio.sleep(self.ttft_ms / 1000)
+        for _ in range(self.tokens):
+            yield "word "
+            await asyncio.sleep(1 / self.tokens_per_second)
+
+    async def aclose(self) -> None:
+        pass
+
+
+def _boot_in_process_app(args: argparse.Namespace, workdir: str, ollama_url: Optional[str] = None):
+    """Import the app against a fresh SQLite database and install the stub components."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(workdir, 'main.db')}"
+
+    from sqlalchemy import event
+    from repositories.database import db_connection
+
+    dbo_path = os.path.join(workdir, "dbo.db")
+
+    # The models live in the "dbo" schema (SQL Server); in SQLite that is an attached database
+    @event.listens_for(db_connection.engine, "connect")
+    def _attach_dbo(dbapi_connection, _):
+        dbapi_connection.execute(f"ATTACH DATABASE '{dbo_path}' AS dbo")
+        dbapi_connection.execute("PRAGMA dbo.journal_mode=WAL")
+
+    from app import app
+    from services.container import ServiceContainer
+    from services.llm_service import LLMModel
+
+    # The app logs every request at INFO, which would dominate the run
+    logging.getLogger().setLevel(args.log_level)
+
+    db_connection.init_db()
+    if ollama_url:
+        llm_model = LLMModel(base_url=ollama_url)
+    else:
+        llm_model = StubLLM(args.llm_ttft_ms, args.llm_tokens, args.llm_tokens_per_second)
+    app.state.container = ServiceContainer(vector_store=StubVectorStore(args.search_ms), llm_model=llm_model)
+    return app
+
+
+def _percentile(sorted_values: List[float], percentile: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(percentile / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _summarize(samples: List[Dict[str, Any]], elapsed: float) -> Dict[str, Any]:
+    latencies = sorted(sample["ms"] for sample in samples)
+    errors = sum(1 for sample in samples if sample["error"])
+    status_codes: Dict[str, int] = defaultdict(int)
+    for sample in samples:
+        status_codes[str(sample["status"])] += 1
+    return {
+        "requests": len(samples),
+        "errors": errors,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "throughput_rps": len(samples) / elapsed if elapsed else 0.0,
+        "p50_ms": _percentile(latencies, 50),
+        "p95_ms": _percentile(latencies, 95),
+        "p99_ms": _percentile(latencies, 99),
+        "mean_ms": sum(latencies) / len(latencies) if latencies else 0.0,
+        "max_ms": latencies[-1] if latencies else 0.0,
+        "status_codes": dict(sorted(status_codes.items()))
+    }
+
+
+async def _timed(samples: List[Dict[str, Any]], request) -> Optional[httpx.Response]:
+    start = time.perf_counter()
+    try:
+        response = await request
+        status, error = response.status_code, response.status_code >= 400
+    except Exception:
+        response, status, error = None, "exception", True
+    samples.append({"ms": (time.perf_counter() - start) * 1000, "status": status, "error": error})
+    return response
+
+
+async def _user(
+    client: httpx.AsyncClient,
+    samples: Dict[str, List[Dict[str, Any]]],
+    args: argparse.Namespace,
+    deadline: float,
+    rng: random.Random
+) -> None:
+    """One simulated user: sessions of a few chat turns with history reads in between."""
+    session_id: Optional[str] = None
+    turns = 0
+    while time.perf_counter() < deadline:
+        if session_id and rng.random() < args.history_ratio:
+            await _timed(samples["history"], client.get(f"/api/v1/history/{session_id}"))
+            continue
+
+        body = {
+            "query": f"What does EBLA offer for question {rng.randrange(args.distinct_queries)}?",
+            "session_id": session_id,
+            "collection_name": args.collection
+        }
+        response = await _timed(samples["chat"], client.post("/api/v1/chat", json=body))
+        if response is not None and response.status_code == 200:
+            session_id = response.json()["session_id"]
+            turns += 1
+        if turns >= args.turns_per_session:
+            session_id, turns = None, 0
+
+
+async def _phase(client: httpx.AsyncClient, args: argparse.Namespace, seconds: float, seed: int):
+    samples: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*(
+        _user(client, samples, args, deadline, random.Random(seed + i)) for i in range(args.concurrency)
+    ))
+    return samples, time.perf_counter() - start
+
+
+def _histogram_totals(metrics_text: str, metric: str, label: str) -> Dict[str, Dict[str, float]]:
+    """Sum (seconds) and count of a histogram in a /metrics page, per value of its label."""
+    totals: Dict[str, Dict[str, float]] = defaultdict(lambda: {"sum": 0.0, "count": 0.0})
+    for line in metrics_text.splitlines():
+        for field in ("sum", "count"):
+            prefix = f'{metric}_{field}{{{label}="'
+            if line.startswith(prefix):
+                value_label, value = line[len(prefix):].split('"} ')
+                totals[value_label][field] = float(value)
+    return totals
+
+
+def _mean_ms(before: str, after: str, metric: str, label: str) -> Dict[str, float]:
+    """Mean ms per label value between two /metrics pages (i.e. over the measured phase only)."""
+    start, end = _histogram_totals(before, metric, label), _histogram_totals(after, metric, label)
+    means = {}
+    for value_label in end:
+        count = end[value_label]["count"] - start[value_label]["count"]
+        if count > 0:
+            means[value_label] = (end[value_label]["sum"] - start[value_label]["sum"]) / count * 1000
+    return means
+
+
+def _stage_mean_ms(before: str, after: str) -> Dict[str, float]:
+    """Mean ms per chat stage over the measured phase, in flow order."""
+    means = _mean_ms(before, after, "chat_stage_duration_seconds", "stage")
+    return {stage: means[stage] for stage in STAGES if stage in means}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True, cwd=os.path.dirname(__file__)
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    with tempfile.TemporaryDirectory() as workdir, ExitStack() as stack:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+        else:
+            ollama_url = None
+            if args.llm == "fake-ollama":
+                from benchmarks.fake_ollama import FakeOllamaConfig, FakeOllamaServer
+
+                server = stack.enter_context(FakeOllamaServer(FakeOllamaConfig(
+                    ttft_ms=args.llm_ttft_ms,
+                    tokens_per_second=args.llm_tokens_per_second,
+                    answer_tokens=args.llm_tokens,
+                    max_parallel=args.ollama_parallel
+                )))
+                ollama_url = server.url
+            app = _boot_in_process_app(args, workdir, ollama_url)
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=args.timeout
+            )
+
+        async with client:
+            if args.warmup > 0:
+                await _phase(client, args, args.warmup, seed=10_000)
+            before = (await client.get("/metrics")).text
+            samples, elapsed = await _phase(client, args, args.duration, seed=0)
+            after = (await client.get("/metrics")).text
+            if not args.url:
+                await app.state.container.aclose()
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "git_commit": _git_commit(),
+        "config": vars(args),
+        "elapsed_s": elapsed,
+        "endpoints": {endpoint: _summarize(samples[endpoint], elapsed) for endpoint in sorted(samples)},
+        "stage_mean_ms": _stage_mean_ms(before, after),
+        # Connection starvation shows up as a growing checkout wait
+        "db_pool_checkout_mean_ms": _mean_ms(before, after, "db_pool_checkout_wait_seconds", "engine")
+    }
+
+
+def _print_report(report: Dict[str, Any]) -> None:
+    print(f"\n{'endpoint':<9} {'requests':>8} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7}")
+    for endpoint, result in report["endpoints"].items():
+        print(
+            f"{endpoint:<9} {result['requests']:>8} {result['throughput_rps']:>8.1f} {result['p50_ms']:>8.1f} "
+            f"{result['p95_ms']:>8.1f} {result['p99_ms']:>8.1f} {result['error_rate']:>6.1%}"
+        )
+    if report["stage_mean_ms"]:
+        stages = "  ".join(f"{stage}={ms:.1f}" for stage, ms in report["stage_mean_ms"].items())
+        print(f"\nMean ms per chat stage: {stages}")
+    if report["db_pool_checkout_mean_ms"]:
+        pools = "  ".join(f"{engine}={ms:.2f}" for engine, ms in report["db_pool_checkout_mean_ms"].items())
+        print(f"Mean ms per DB pool checkout: {pools}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent simulated users")
+    parser.add_argument("--duration", type=float, default=20, help="Measured seconds of traffic")
+    parser.add_argument("--warmup", type=float, default=2, help="Seconds of unmeasured traffic first")
+    parser.add_argument("--history-ratio", type=float, default=0.3, help="Share of requests that read history")
+    parser.add_argument("--turns-per-session", type=int, default=4, help="Chat turns before a user starts over")
+    parser.add_argument("--distinct-queries", type=int, default=200, help="Question pool size (repeats hit caches)")
+    parser.add_argument("--collection", default="documents", help="collection_name sent with each chat")
+    parser.add_argument("--search-ms", type=float, default=20, help="Stub retrieval latency")
+    parser.add_argument("--llm-ttft-ms", type=float, default=200, help="Stub LLM time to first token")
+    parser.add_argument("--llm-tokens", type=int, default=50, help="Stub LLM tokens per answer")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=200, help="Stub LLM generation speed")
+    parser.add_argument(
+        "--llm", choices=("stub", "fake-ollama"), default="stub",
+        help="In-process stub, or the real Ollama client against the bundled fake server"
+    )
+    parser.add_argument("--ollama-parallel", type=int, default=2, help="Fake Ollama parallel generations")
+    parser.add_argument("--timeout", type=float, default=120, help="Per-request timeout in seconds")
+    parser.add_argument("--url", help="Load-test a running server instead of the in-process app")
+    parser.add_argument("--output", default="chat_load_results.json", help="JSON file for the results")
+    parser.add_argument("--log-level", default="WARNING", help="Log level of the in-process app")
+    args = parser.parse_args()
+
+    llm = "stub LLM" if args.llm == "stub" else "fake Ollama"
+    target = args.url or f"in-process app (SQLite, stub retriever, {llm})"
+    print(f"Load test: {args.concurrency} users for {args.duration:.0f}s against {target}")
+    report = asyncio.run(run(args))
+    _print_report(report)
+
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Benchmark: per-request cost of building RAGService with and without the shared component container.
+
+"before" builds RAGService(db) per request, loading the embedding model, Chroma client
+and Ollama client every time. "after" resolves the service through the same path as the
+/api/v1/chat dependency, reusing the process-wide ServiceContainer.
+
+Usage:
+    python benchmarks/bench_component_container.py --requests 20
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from repositories.database.db_connection import SessionLocal
+from services.rag_service import RAGService
+from services.container import ServiceContainer, get_rag_service
+
+
+def _run(label: str, build, requests: int) -> dict:
+    timings = []
+    for _ in range(requests):
+        db = SessionLocal()
+        try:
+            start = time.perf_counter()
+            build(db)
+            timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            db.close()
+
+    result = {
+        "label": label,
+        "requests": requests,
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": statistics.median(timings),
+        "max_ms": max(timings)
+    }
+    print(
+        f"{label:<8} mean={result['mean_ms']:9.2f} ms  p50={result['p50_ms']:9.2f} ms  "
+        f"max={result['max_ms']:9.2f} ms"
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=20, help="Number of simulated requests per mode")
+    args = parser.parse_args()
+
+    print(f"Per-request service construction cost ({args.requests} requests)\n")
+
+    # Before: every request loads its own embedding model and LLM client
+    before = _run("before", lambda db: RAGService(db), args.requests)
+
+    # After: components built once at startup, only the DB session varies
+    startup = time.perf_counter()
+    container = ServiceContainer()
+    startup_ms = (time.perf_counter() - startup) * 1000
+    after = _run("after", lambda db: get_rag_service(db=db, container=container), args.requests)
+
+    print(f"\nOne-off container startup: {startup_ms:.2f} ms")
+    print(f"Per-request speedup: {before['mean_ms'] / max(after['mean_ms'], 1e-6):.0f}x")
+
+
+if __name__ == "__main__":
+    main()
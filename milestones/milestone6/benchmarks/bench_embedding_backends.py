@@ -0,0 +1,80 @@
+"""
+Benchmark: embedding throughput of the PyTorch, ONNX and int8 ONNX backends.
+
+Embeds the chunks of data/ with each backend and reports chunks/second, single
+query latency and the minimum cosine similarity to the PyTorch embeddings.
+
+Usage:
+    python benchmarks/bench_embedding_backends.py --threads 4 --repeat 3
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+from config import settings
+from services.document_loader import DocumentLoader
+from services.embeddings import OnnxEmbeddings, build_embeddings
+from utils.text_processor import TextProcessor
+
+QUERY = "Which infrastructure solutions are Microsoft-based?"
+
+
+def _min_similarity(vectors, reference) -> float:
+    a, b = np.asarray(vectors), np.asarray(reference)
+    similarities = (a * b).sum(axis=1) / (np.linalg.norm(a, axis=1) * np.linalg.norm(b, axis=1))
+    return float(similarities.min())
+
+
+def _run(label: str, embeddings, texts, repeat: int, reference=None) -> tuple:
+    vectors = embeddings.embed_documents(texts)  # warm-up
+    batch_seconds = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        embeddings.embed_documents(texts)
+        batch_seconds.append(time.perf_counter() - start)
+
+    query_ms = []
+    for _ in range(repeat * 10):
+        start = time.perf_counter()
+        embeddings.embed_query(QUERY)
+        query_ms.append((time.perf_counter() - start) * 1000)
+
+    result = {
+        "backend": label,
+        "chunks_per_second": len(texts) / statistics.median(batch_seconds),
+        "query_p50_ms": statistics.median(query_ms),
+        "min_cosine_vs_torch": _min_similarity(vectors, reference) if reference is not None else 1.0
+    }
+    print(
+        f"{label:<10} {result['chunks_per_second']:8.1f} chunks/s  "
+        f"query p50={result['query_p50_ms']:6.2f} ms  "
+        f"min cosine vs torch={result['min_cosine_vs_torch']:.4f}"
+    )
+    return result, vectors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=settings.onnx_intra_op_threads, help="ONNX intra-op threads (0 = auto)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed passes over the corpus per backend")
+    args = parser.parse_args()
+
+    data_dir = os.path.join(os.path.dirname(__file__), "..", "data")
+    documents = DocumentLoader(data_dir).load_documents()
+    texts = [chunk.page_content for chunk in TextProcessor(settings.chunk_size, settings.chunk_overlap).process_documents(documents)]
+    print(f"\nEmbedding {len(texts)} chunks with {settings.embedding_model_name}\n")
+
+    _, reference = _run("torch", build_embeddings(backend="torch"), texts, args.repeat)
+    _run("onnx", OnnxEmbeddings(quantize=False, intra_op_threads=args.threads), texts, args.repeat, reference)
+    _run("onnx-int8", OnnxEmbeddings(quantize=True, intra_op_threads=args.threads), texts, args.repeat, reference)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""
+Benchmark: chat-history lookup time vs table size, with and without the (session_id, created_date) indexes.
+
+For each size, a temporary SQLite database is filled with that many messages
+(--messages-per-session per session, one summary per --messages-per-summary
+messages). It then times the two lookups every chat turn makes:
+get_recent_messages and get_latest_summary for random sessions. They are timed
+once without the history indexes (the schema before migration 2) and once with them.
+
+Usage:
+    python benchmarks/bench_history_lookup.py --sizes 10000,100000,1000000 --lookups 200
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import Session
+from models.message import MessageModel
+from models.session import SessionModel
+from models.summary import SummaryModel
+from repositories.database.migrations import migrate
+from repositories.message_repository import MessageRepository
+from repositories.summary_repository import SummaryRepository
+
+HISTORY_INDEXES = [index for model in (MessageModel, SummaryModel) for index in model.__table__.indexes]
+BATCH = 10000
+
+
+def _engine(workdir: str):
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'main.db')}")
+    dbo_path = os.path.join(workdir, "dbo.db")
+
+    # The models live in the "dbo" schema (SQL Server); in SQLite that is an attached database
+    @event.listens_for(engine, "connect")
+    def _attach_dbo(dbapi_connection, _):
+        dbapi_connection.execute(f"ATTACH DATABASE '{dbo_path}' AS dbo")
+
+    return engine
+
+
+def _fill(engine, messages: int, messages_per_session: int, messages_per_summary: int) -> int:
+    """Insert the history rows in bulk; sessions are interleaved in time like concurrent users."""
+    sessions = max(1, messages // messages_per_session)
+    start = datetime(2024, 1, 1)
+    with engine.begin() as connection:
+        connection.execute(SessionModel.__table__.insert(), [
+            {"session_id": f"session-{s}", "created_date": start} for s in range(sessions)
+        ])
+        for offset in range(0, messages, BATCH):
+            rows = [
+                {
+                    "message_id": f"message-{i}",
+                    "session_id": f"session-{i % sessions}",
+                    "role": "user" if (i // sessions) % 2 == 0 else "assistant",
+                    "content": "What services does EBLA offer for cloud migration?",
+                    "created_date": start + timedelta(seconds=i)
+                }
+                for i in range(offset, min(offset + BATCH, messages))
+            ]
+            connection.execute(MessageModel.__table__.insert(), rows)
+            connection.execute(SummaryModel.__table__.insert(), [
+                {
+                    "summary_id": f"summary-{row['message_id']}",
+                    "session_id": row["session_id"],
+                    "summary_text": "The user asked about cloud migration services.",
+                    "created_date": row["created_date"]
+                }
+                for row in rows[::messages_per_summary]
+            ])
+    return sessions
+
+
+def _time_lookups(engine, sessions: int, lookups: int, seed: int) -> dict:
+    rng = random.Random(seed)
+    session_ids = [f"session-{rng.randrange(sessions)}" for _ in range(lookups)]
+    timings = {"recent_messages": [], "latest_summary": []}
+    with Session(engine) as db:
+        messages, summaries = MessageRepository(db), SummaryRepository(db)
+        for session_id in session_ids:
+            start = time.perf_counter()
+            messages.get_recent_messages(session_id, limit=5)
+            timings["recent_messages"].append((time.perf_counter() - start) * 1000)
+            start = time.perf_counter()
+            summaries.get_latest_summary(session_id)
+            timings["latest_summary"].append((time.perf_counter() - start) * 1000)
+    return {name: statistics.median(values) for name, values in timings.items()}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="10000,100000,500000", help="Comma-separated message counts")
+    parser.add_argument("--messages-per-session", type=int, default=20)
+    parser.add_argument("--messages-per-summary", type=int, default=10)
+    parser.add_argument("--lookups", type=int, default=200, help="Timed lookups per size and mode")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    print(f"History lookup p50 (ms), {args.lookups} random sessions per row\n")
+    print(f"{'messages':>10} {'indexes':>8} {'recent_messages':>16} {'latest_summary':>15}")
+    for size in (int(value) for value in args.sizes.split(",")):
+        with tempfile.TemporaryDirectory() as workdir:
+            engine = _engine(workdir)
+            migrate(engine)
+            sessions = _fill(engine, size, args.messages_per_session, args.messages_per_summary)
+
+            with engine.begin() as connection:
+                for index in HISTORY_INDEXES:
+                    index.drop(bind=connection)
+            without = _time_lookups(engine, sessions, args.lookups, args.seed)
+            with engine.begin() as connection:
+                for index in HISTORY_INDEXES:
+                    index.create(bind=connection)
+            with_indexes = _time_lookups(engine, sessions, args.lookups, args.seed)
+            engine.dispose()
+
+        for label, result in (("no", without), ("yes", with_indexes)):
+            print(f"{size:>10} {label:>8} {result['recent_messages']:>16.3f} {result['latest_summary']:>15.3f}")
+
+
+if __name__ == "__main__":
+    main()
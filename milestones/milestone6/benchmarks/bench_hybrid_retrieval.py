@@ -0,0 +1,84 @@
+"""
+Benchmark: dense-only vs BM25 vs hybrid (RRF) retrieval, latency and recall.
+
+Indexes data/ into a temporary Chroma collection (with its keyword index), then runs
+the golden question set (benchmarks/golden_retrieval.json) through each retrieval
+mode. A question counts as recalled when any of the top-k chunks contains its
+expected text.
+
+Usage:
+    python benchmarks/bench_hybrid_retrieval.py --top-k 3 --repeat 5
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from services.ingestion_pipeline import IngestionPipeline
+from services.vector_store import VectorStoreManager
+from benchmarks.eval_retrieval import load_golden_set
+
+COLLECTION = "bench-hybrid"
+
+# (question, text the retrieved context must contain), shared with benchmarks/eval_retrieval.py
+GOLDEN_QUERIES = [(item["question"], item["contains"]) for item in load_golden_set()]
+
+
+def _search(vector_store: VectorStoreManager, mode: str, query: str, k: int):
+    embedding = vector_store.embed_query(query) if mode != "keyword" else None
+    if mode == "hybrid":
+        return vector_store.hybrid_search(query, embedding, COLLECTION, k)
+    if mode == "keyword":
+        return vector_store.keyword_search(query, COLLECTION, k)
+    return vector_store.search_by_vector(embedding, COLLECTION, k)
+
+
+def _run(vector_store: VectorStoreManager, mode: str, k: int, repeat: int) -> dict:
+    timings = []
+    hits = 0
+    for query, expected in GOLDEN_QUERIES:
+        results = _search(vector_store, mode, query, k)  # warm-up (also fills the embedding cache)
+        hits += any(expected.lower() in r["document"].lower() for r in results)
+        for _ in range(repeat):
+            start = time.perf_counter()
+            _search(vector_store, mode, query, k)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    result = {
+        "mode": mode,
+        "recall": hits / len(GOLDEN_QUERIES),
+        "p50_ms": statistics.median(timings),
+        "p95_ms": statistics.quantiles(timings, n=20)[-1] if len(timings) > 1 else timings[0]
+    }
+    print(
+        f"{mode:<8} recall@{k}={result['recall']:.2f}  "
+        f"p50={result['p50_ms']:7.2f} ms  p95={result['p95_ms']:7.2f} ms"
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=3, help="Number of chunks retrieved per question")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed searches per question and mode")
+    args = parser.parse_args()
+
+    data_dir = os.path.join(os.path.dirname(__file__), "..", "data")
+
+    with tempfile.TemporaryDirectory() as persist_dir:
+        vector_store = VectorStoreManager(persist_directory=persist_dir)
+        stats = IngestionPipeline(vector_store).index_directory(data_dir, collection_name=COLLECTION)
+        print(f"\nIndexed {stats.chunks} chunks; {len(GOLDEN_QUERIES)} golden questions\n")
+
+        for mode in ("dense", "keyword", "hybrid"):
+            _run(vector_store, mode, args.top_k, args.repeat)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+"""
+Benchmark: prefill time saved by sending the system prompt as a stable leading message.
+
+Sends the same RAG-style questions to Ollama twice:
+- "stable prefix": the system prompt is an identical leading message, so Ollama can
+  reuse the KV cache of that prefix from the previous request.
+- "busted prefix": a per-request nonce is put in front of the system prompt, so
+  every request is prefilled from scratch (what a volatile prompt start costs).
+
+Reports the prompt tokens Ollama actually evaluated, prefill (prompt_eval) time and
+model load time per request, as read from Ollama's response metrics. Needs a running
+Ollama with settings.llm_model_name pulled.
+
+Usage:
+    python benchmarks/bench_llm_prefix_cache.py --requests 10
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import uuid
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from services.llm_service import LLMModel
+from utils.prompt_builder import build_rag_prompt
+
+QUESTIONS = [
+    "Which infrastructure solutions are Microsoft-based?",
+    "Does Ebla sell Enterprise Licensing Services?",
+    "What Cybersecurity Solutions are offered?",
+    "Where in the Middle East does Ebla operate?",
+]
+CONTEXT = [{"content": "EBLA provides cloud, licensing and cybersecurity services.", "metadata": {}, "score": 0.1}]
+
+
+async def _run(label: str, llm: LLMModel, requests: int, bust_prefix: bool) -> dict:
+    before = llm.prefill_stats()
+    for i in range(requests):
+        prompt = build_rag_prompt(QUESTIONS[i % len(QUESTIONS)], CONTEXT)
+        system = f"Request {uuid.uuid4()}\n{prompt.system}" if bust_prefix else prompt.system
+        await llm.agenerate(prompt.user, system=system)
+    after = llm.prefill_stats()
+
+    result = {
+        "label": label,
+        "requests": requests,
+        "prompt_eval_tokens": (after["prompt_eval_tokens"] - before["prompt_eval_tokens"]) / requests,
+        "prefill_ms": (after["prompt_eval_ms"] - before["prompt_eval_ms"]) / requests,
+        "load_ms": (after["load_ms"] - before["load_ms"]) / requests
+    }
+    print(
+        f"{label:<14} evaluated {result['prompt_eval_tokens']:6.0f} tokens/request  "
+        f"prefill={result['prefill_ms']:7.1f} ms  load={result['load_ms']:6.1f} ms"
+    )
+    return result
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=10, help="Requests per variant")
+    args = parser.parse_args()
+
+    llm = LLMModel()
+    try:
+        # Warm-up: load the model and prime the prefix cache
+        prompt = build_rag_prompt(QUESTIONS[0], CONTEXT)
+        await llm.agenerate(prompt.user, system=prompt.system)
+        print(f"\nModel: {llm.model_name} (keep_alive={llm.keep_alive})\n")
+
+        busted = await _run("busted prefix", llm, args.requests, bust_prefix=True)
+        stable = await _run("stable prefix", llm, args.requests, bust_prefix=False)
+        print(f"\nPrefill saved per request: {busted['prefill_ms'] - stable['prefill_ms']:.1f} ms")
+    finally:
+        await llm.aclose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
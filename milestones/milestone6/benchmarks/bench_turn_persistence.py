@@ -0,0 +1,134 @@
+"""
+Benchmark: database time per chat turn, per-message commits vs one transaction.
+
+"before" persists a turn the way the chat flow used to: create_session (commit +
+refresh) for a new conversation, then add_message twice (commit + refresh each).
+"after" uses MessageRepository.add_turn: session (if new) and both messages in one
+flush and one commit, with client-side IDs and no refresh.
+
+Each mode runs --sessions conversations of --turns-per-session turns. Reports
+per-turn latency, SQL statements and commits. Runs against a temporary SQLite
+database by default; pass --database-url to measure the real SQL Server, where
+every statement and commit is a network round trip (test rows are left behind).
+
+Usage:
+    python benchmarks/bench_turn_persistence.py --sessions 50 --turns-per-session 4
+    python benchmarks/bench_turn_persistence.py --database-url "mssql+pyodbc://..."
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from models.base import Base, generate_uuid
+from repositories.message_repository import MessageRepository
+from repositories.session_repository import SessionRepository
+
+QUERY = "What services does EBLA offer for cloud migration?"
+ANSWER = "EBLA offers cloud migration, infrastructure and managed services. " * 8
+
+
+def _engine(database_url: str, workdir: str):
+    if database_url:
+        return create_engine(database_url)
+    engine = create_engine(f"sqlite:///{os.path.join(workdir, 'main.db')}")
+    dbo_path = os.path.join(workdir, "dbo.db")
+
+    # The models live in the "dbo" schema (SQL Server); in SQLite that is an attached database
+    @event.listens_for(engine, "connect")
+    def _attach_dbo(dbapi_connection, _):
+        dbapi_connection.execute(f"ATTACH DATABASE '{dbo_path}' AS dbo")
+        dbapi_connection.execute("PRAGMA dbo.journal_mode=WAL")
+
+    return engine
+
+
+def _before(db, session_id, new_session):
+    if new_session:
+        session_id = SessionRepository(db).create_session()
+    repo = MessageRepository(db)
+    repo.add_message(session_id, "user", QUERY)
+    repo.add_message(session_id, "assistant", ANSWER)
+    return session_id
+
+
+def _after(db, session_id, new_session):
+    if new_session:
+        session_id = generate_uuid()
+    MessageRepository(db).add_turn(session_id, QUERY, ANSWER, new_session=new_session)
+    return session_id
+
+
+def _run(label: str, persist, SessionLocal, counters: dict, sessions: int, turns_per_session: int) -> dict:
+    timings = []
+    counters.update(statements=0, commits=0)
+    for _ in range(sessions):
+        db = SessionLocal()
+        try:
+            session_id = None
+            for turn in range(turns_per_session):
+                start = time.perf_counter()
+                session_id = persist(db, session_id, new_session=turn == 0)
+                timings.append((time.perf_counter() - start) * 1000)
+        finally:
+            db.close()
+
+    turns = len(timings)
+    ordered = sorted(timings)
+    result = {
+        "label": label,
+        "turns": turns,
+        "mean_ms": statistics.mean(timings),
+        "p50_ms": statistics.median(timings),
+        "p95_ms": ordered[min(turns - 1, int(0.95 * turns))],
+        "statements_per_turn": counters["statements"] / turns,
+        "commits_per_turn": counters["commits"] / turns
+    }
+    print(
+        f"{label:<8} mean={result['mean_ms']:7.2f} ms  p50={result['p50_ms']:7.2f} ms  "
+        f"p95={result['p95_ms']:7.2f} ms  statements/turn={result['statements_per_turn']:.2f}  "
+        f"commits/turn={result['commits_per_turn']:.2f}"
+    )
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sessions", type=int, default=50, help="Conversations per mode")
+    parser.add_argument("--turns-per-session", type=int, default=4, help="Turns per conversation (the first one creates it)")
+    parser.add_argument("--database-url", help="Database to measure (default: temporary SQLite)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        engine = _engine(args.database_url, workdir)
+        Base.metadata.create_all(engine)
+        SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+        counters = {"statements": 0, "commits": 0}
+
+        @event.listens_for(engine, "before_cursor_execute")
+        def _count_statement(*_):
+            counters["statements"] += 1
+
+        @event.listens_for(engine, "commit")
+        def _count_commit(*_):
+            counters["commits"] += 1
+
+        print(f"DB time per chat turn ({args.sessions} sessions x {args.turns_per_session} turns, {engine.dialect.name})\n")
+        before = _run("before", _before, SessionLocal, counters, args.sessions, args.turns_per_session)
+        after = _run("after", _after, SessionLocal, counters, args.sessions, args.turns_per_session)
+        engine.dispose()
+
+    print(f"\nSpeedup (mean): {before['mean_ms'] / after['mean_ms']:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Evaluation: retrieval quality vs. cost over the bundled corpus for a parameter sweep.
+
+Sweeps embedding_model_name x chunk_size x chunk_overlap x top_k. For every index
+configuration, data/ is chunked and indexed into its own Chroma directory (or an
+index from a previous run with --index-dir is reused). Then every question of the
+golden set (benchmarks/golden_retrieval.json) is searched.
+
+A retrieved chunk is relevant when it comes from the question's expected source
+file and contains its expected text. For each combination the script reports:
+- recall@k: share of questions with a relevant chunk in the top k
+- MRR: mean reciprocal rank of the first relevant chunk (0 if none)
+- index size: chunks and bytes on disk
+- index build time (chunking + embedding + insert)
+- query latency: uncached query embedding, and search p50/p95 (embedding cached)
+
+The cheapest combination meeting --min-recall / --min-mrr is recommended. Cheapest
+means the smallest top_k (fewest prompt tokens), then the lowest embed + search
+latency, then the smallest index. Results go to a JSON file.
+
+Usage:
+    python benchmarks/eval_retrieval.py --chunk-sizes 300,500,800 --chunk-overlaps 0,50 \\
+        --top-k 1,3,5 --embedding-models sentence-transformers/all-MiniLM-L6-v2 --output eval.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), "golden_retrieval.json")
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+COLLECTION = "eval"
+
+# search(question, k) -> results as returned by VectorStoreManager ({"document", "metadata", ...})
+SearchFn = Callable[[str, int], List[Dict[str, Any]]]
+
+
+def load_golden_set(path: str = GOLDEN_PATH) -> List[Dict[str, str]]:
+    """Golden questions: {"question", "source" (file name under data/), "contains" (expected text)}."""
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def is_relevant(result: Dict[str, Any], expected: Dict[str, str]) -> bool:
+    """A chunk is relevant if it comes from the expected source file and contains the expected text."""
+    source = os.path.basename(result.get("metadata", {}).get("source", ""))
+    return source == expected["source"] and expected["contains"].lower() in result["document"].lower()
+
+
+def first_relevant_rank(results: Sequence[Dict[str, Any]], expected: Dict[str, str]) -> Optional[int]:
+    """1-based rank of the first relevant result, None if there is none."""
+    for rank, result in enumerate(results, start=1):
+        if is_relevant(result, expected):
+            return rank
+    return None
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def evaluate(search: SearchFn, golden: Sequence[Dict[str, str]], k: int, repeat: int = 3) -> Dict[str, Any]:
+    """
+    Quality and search latency of one retrieval configuration.
+
+    Args:
+        search: Retrieval function under test
+        golden: Golden questions
+        k: Results retrieved per question
+        repeat: Timed searches per question (after one untimed search used for scoring)
+
+    Returns:
+        recall_at_k, mrr, search_p50_ms, search_p95_ms and the questions that were missed
+    """
+    reciprocal_ranks = []
+    timings = []
+    missed = []
+    for expected in golden:
+        rank = first_relevant_rank(search(expected["question"], k), expected)
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+        if rank is None:
+            missed.append(expected["question"])
+        for _ in range(repeat):
+            start = time.perf_counter()
+            search(expected["question"], k)
+            timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "top_k": k,
+        "recall_at_k": sum(1 for rr in reciprocal_ranks if rr) / len(golden),
+        "mrr": statistics.mean(reciprocal_ranks),
+        "search_p50_ms": statistics.median(timings) if timings else 0.0,
+        "search_p95_ms": _percentile(timings, 0.95) if timings else 0.0,
+        "missed": missed
+    }
+
+
+def recommend(rows: Sequence[Dict[str, Any]], min_recall: float, min_mrr: float) -> Optional[Dict[str, Any]]:
+    """Cheapest row meeting the quality bar: smallest top_k, then fastest query, then smallest index."""
+    qualified = [row for row in rows if row["recall_at_k"] >= min_recall and row["mrr"] >= min_mrr]
+    if not qualified:
+        return None
+    return min(
+        qualified,
+        key=lambda row: (row["top_k"], row["embed_ms"] + row["search_p50_ms"], row["index_bytes"])
+    )
+
+
+def _directory_bytes(path: str) -> int:
+    return sum(
+        os.path.getsize(os.path.join(root, name))
+        for root, _, files in os.walk(path) for name in files
+    )
+
+
+def _index_dir(root: str, model: str, chunk_size: int, chunk_overlap: int) -> str:
+    slug = model.replace("/", "__")
+    return os.path.join(root, f"{slug}-c{chunk_size}-o{chunk_overlap}")
+
+
+def _build_or_reuse(model: str, chunk_size: int, chunk_overlap: int, root: str, rebuild: bool):
+    """Open (or build) the index for one configuration; returns (manager, manifest)."""
+    from services.ingestion_pipeline import IngestionPipeline
+    from services.vector_store import VectorStoreManager
+    from utils.text_processor import TextProcessor
+
+    persist_dir = _index_dir(root, model, chunk_size, chunk_overlap)
+    manifest_path = os.path.join(persist_dir, "eval_manifest.json")
+    if rebuild and os.path.isdir(persist_dir):
+        shutil.rmtree(persist_dir)
+
+    vector_store = VectorStoreManager(persist_directory=persist_dir, embedding_model=model)
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        manifest["reused"] = True
+        return vector_store, manifest
+
+    start = time.perf_counter()
+    pipeline = IngestionPipeline(vector_store, TextProcessor(chunk_size, chunk_overlap))
+    stats = pipeline.index_directory(DATA_DIR, collection_name=COLLECTION)
+    manifest = {"chunks": stats.chunks, "build_s": time.perf_counter() - start}
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f)
+    manifest["reused"] = False
+    return vector_store, manifest
+
+
+def _searcher(vector_store, mode: str) -> SearchFn:
+    def search(question: str, k: int) -> List[Dict[str, Any]]:
+        if mode == "keyword":
+            return vector_store.keyword_search(question, COLLECTION, k)
+        embedding = vector_store.embed_query(question)
+        if mode == "hybrid":
+            return vector_store.hybrid_search(question, embedding, COLLECTION, k)
+        return vector_store.search_by_vector(embedding, COLLECTION, k)
+    return search
+
+
+def _embed_ms(vector_store, golden: Sequence[Dict[str, str]]) -> float:
+    """Mean time to embed a question without the query-embedding cache."""
+    timings = []
+    for expected in golden:
+        start = time.perf_counter()
+        vector_store.embeddings.embed_query(expected["question"])
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.mean(timings)
+
+
+def _csv(cast):
+    return lambda value: [cast(item) for item in value.split(",") if item.strip()]
+
+
+def main() -> None:
+    from config import settings
+    from services.document_loader import DocumentLoader
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--embedding-models", type=_csv(str), default=[settings.embedding_model_name])
+    parser.add_argument("--chunk-sizes", type=_csv(int), default=[settings.chunk_size])
+    parser.add_argument("--chunk-overlaps", type=_csv(int), default=[settings.chunk_overlap])
+    parser.add_argument("--top-k", type=_csv(int), default=[1, 3, 5])
+    parser.add_argument("--retrieval-mode", choices=("dense", "keyword", "hybrid"), default="dense")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed searches per question")
+    parser.add_argument("--golden", default=GOLDEN_PATH, help="Golden question set (JSON)")
+    parser.add_argument("--index-dir", help="Keep indexes here and reuse them across runs (default: temporary)")
+    parser.add_argument("--rebuild", action="store_true", help="Rebuild indexes found in --index-dir")
+    parser.add_argument("--min-recall", type=float, default=0.9, help="Quality bar for the recommendation")
+    parser.add_argument("--min-mrr", type=float, default=0.0, help="Quality bar for the recommendation")
+    parser.add_argument("--output", default="retrieval_eval.json", help="JSON file for the results")
+    args = parser.parse_args()
+
+    golden = load_golden_set(args.golden)
+    files = DocumentLoader(DATA_DIR).list_files()
+    print(f"\n{len(golden)} golden questions, {len(files)} files, mode={args.retrieval_mode}\n")
+    print(
+        f"{'model':<40} {'size':>5} {'ovl':>4} {'k':>2} {'recall':>6} {'MRR':>5} {'chunks':>6} "
+        f"{'MB':>6} {'build s':>7} {'embed ms':>8} {'p50 ms':>7} {'p95 ms':>7}"
+    )
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_root:
+        root = args.index_dir or tmp_root
+        for model in args.embedding_models:
+            for chunk_size in args.chunk_sizes:
+                for chunk_overlap in args.chunk_overlaps:
+                    if chunk_overlap >= chunk_size:
+                        continue
+                    vector_store, manifest = _build_or_reuse(
+                        model, chunk_size, chunk_overlap, root, args.rebuild
+                    )
+                    index_bytes = _directory_bytes(_index_dir(root, model, chunk_size, chunk_overlap))
+                    embed_ms = _embed_ms(vector_store, golden) if args.retrieval_mode != "keyword" else 0.0
+                    search = _searcher(vector_store, args.retrieval_mode)
+                    for k in args.top_k:
+                        row = {
+                            "embedding_model_name": model,
+                            "chunk_size": chunk_size,
+                            "chunk_overlap": chunk_overlap,
+                            "retrieval_mode": args.retrieval_mode,
+                            "index_chunks": manifest["chunks"],
+                            "index_bytes": index_bytes,
+                            "index_build_s": manifest["build_s"],
+                            "index_reused": manifest["reused"],
+                            "embed_ms": embed_ms,
+                            **evaluate(search, golden, k, args.repeat)
+                        }
+                        rows.append(row)
+                        print(
+                            f"{model[-40:]:<40} {chunk_size:>5} {chunk_overlap:>4} {k:>2} "
+                            f"{row['recall_at_k']:>6.2f} {row['mrr']:>5.2f} {row['index_chunks']:>6} "
+                            f"{index_bytes / 1e6:>6.1f} {row['index_build_s']:>7.2f} {embed_ms:>8.2f} "
+                            f"{row['search_p50_ms']:>7.2f} {row['search_p95_ms']:>7.2f}"
+                        )
+
+    best = recommend(rows, args.min_recall, args.min_mrr)
+    if best is None:
+        print(f"\nNo configuration reaches recall@k >= {args.min_recall} and MRR >= {args.min_mrr}")
+    else:
+        print(
+            f"\nCheapest configuration meeting the bar: {best['embedding_model_name']}, "
+            f"chunk_size={best['chunk_size']}, chunk_overlap={best['chunk_overlap']}, top_k={best['top_k']} "
+            f"(recall@k={best['recall_at_k']:.2f}, MRR={best['mrr']:.2f})"
+        )
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({"config": vars(args), "results": rows, "recommended": best}, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
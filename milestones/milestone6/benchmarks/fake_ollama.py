@@ -0,0 +1,384 @@
+"""
+Fake Ollama server for deterministic performance and failure testing.
+
+Implements the parts of the Ollama HTTP API this project uses, so LLMModel,
+RAGService and the Streamlit app can run (and be benchmarked) without a GPU
+or a 7B model:
+
+- POST /api/chat and POST /api/generate (streamed NDJSON or a single JSON body)
+- POST /api/embed and POST /api/embeddings (deterministic hashed vectors)
+- GET /api/tags, GET /api/version
+
+Behaviour is set with FakeOllamaConfig:
+- time to first token (prefill), tokens per second (decode), answer length
+- max parallel generations; further requests queue (up to max_queue, then 503,
+  like OLLAMA_NUM_PARALLEL / OLLAMA_MAX_QUEUE)
+- error injection: a share of requests fail up front, a share fail mid-stream
+- prefix caching: prompt_eval_count only counts the part of the prompt that
+  differs from the previous request, as with Ollama's KV-cache reuse
+
+Answers and embeddings are a function of the request (and the seed), so runs are
+reproducible. GET /fake/stats reports request, error and parallelism counters.
+
+Usage:
+    python benchmarks/fake_ollama.py --port 11435 --ttft-ms 300 --tokens-per-second 40
+    LLM_BASE_URL=http://localhost:11435 uvicorn app:app --port 8002
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import math
+import random
+import socket
+import threading
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.types import Receive, Scope, Send
+
+VOCABULARY = (
+    "EBLA", "provides", "cloud", "infrastructure", "licensing", "and", "cybersecurity",
+    "services", "for", "enterprises", "across", "the", "Middle", "East", "."
+)
+
+
+@dataclass
+class FakeOllamaConfig:
+    """Latency, capacity and failure behaviour of the fake server."""
+
+    ttft_ms: float = 200.0  # prefill time before the first token
+    tokens_per_second: float = 50.0  # decode speed once generation started
+    answer_tokens: int = 40  # tokens per generated answer
+    max_parallel: int = 1  # generations running at once (OLLAMA_NUM_PARALLEL)
+    max_queue: int = 512  # requests waiting for a generation slot before 503 (OLLAMA_MAX_QUEUE)
+    error_rate: float = 0.0  # share of requests rejected before generation
+    error_status: int = 500
+    midstream_error_rate: float = 0.0  # share of streamed requests that fail after the first token
+    embedding_dim: int = 384
+    embed_ms: float = 5.0  # latency per embed request
+    seed: int = 0
+
+
+class _SlotStreamingResponse(StreamingResponse):
+    """
+    Streamed generation that frees its slot when the response ends.
+
+    The body's own finally does not run if it is never iterated (e.g. the
+    client disconnects before streaming starts), so release here as well.
+    """
+
+    def __init__(self, content: AsyncIterator[str], release: Callable[[], None], **kwargs: Any):
+        super().__init__(content, **kwargs)
+        self._release = release
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self._release()
+
+
+class FakeOllama:
+    """Request handling and counters of the fake server (one instance per app)."""
+
+    def __init__(self, config: FakeOllamaConfig):
+        self.config = config
+        self._slots = asyncio.Semaphore(config.max_parallel)
+        self._rng = random.Random(config.seed)
+        self._previous_prompt = ""
+        self.stats: Dict[str, int] = {
+            "requests": 0,
+            "generations": 0,
+            "embeddings": 0,
+            "errors": 0,
+            "rejected_busy": 0,
+            "waiting": 0,
+            "active": 0,
+            "max_active": 0
+        }
+
+    # Request analysis
+
+    @staticmethod
+    def _count_tokens(text: str) -> int:
+        return max(1, math.ceil(len(text) / 4)) if text else 0
+
+    def _prompt_eval_count(self, prompt: str) -> int:
+        """Tokens to prefill: only what differs from the previous prompt (KV prefix reuse)."""
+        shared = 0
+        for a, b in zip(prompt, self._previous_prompt):
+            if a != b:
+                break
+            shared += 1
+        self._previous_prompt = prompt
+        return self._count_tokens(prompt[shared:]) or 1
+
+    def _answer(self, prompt: str) -> List[str]:
+        """Deterministic answer tokens for a prompt."""
+        rng = random.Random(hashlib.sha256(f"{self.config.seed}:{prompt}".encode()).digest())
+        return [
+            (" " if i else "") + rng.choice(VOCABULARY)
+            for i in range(self.config.answer_tokens)
+        ]
+
+    def embed(self, text: str) -> List[float]:
+        """Deterministic unit vector for a text."""
+        rng = random.Random(hashlib.sha256(f"{self.config.seed}:{text}".encode()).digest())
+        vector = [rng.gauss(0.0, 1.0) for _ in range(self.config.embedding_dim)]
+        norm = math.sqrt(sum(x * x for x in vector))
+        return [x / norm for x in vector]
+
+    # Capacity and failures
+
+    def _inject_error(self) -> Optional[JSONResponse]:
+        if self.config.error_rate and self._rng.random() < self.config.error_rate:
+            self.stats["errors"] += 1
+            return JSONResponse({"error": "injected failure"}, status_code=self.config.error_status)
+        return None
+
+    async def _acquire_slot(self) -> bool:
+        """Wait for a generation slot; False if the queue is full."""
+        if self._slots.locked() and self.stats["waiting"] >= self.config.max_queue:
+            self.stats["rejected_busy"] += 1
+            return False
+        self.stats["waiting"] += 1
+        try:
+            await self._slots.acquire()
+        finally:
+            self.stats["waiting"] -= 1
+        self.stats["active"] += 1
+        self.stats["max_active"] = max(self.stats["max_active"], self.stats["active"])
+        return True
+
+    def _release_slot(self) -> None:
+        self.stats["active"] -= 1
+        self._slots.release()
+
+    # Generation
+
+    async def _generate(self, model: str, prompt: str, stream: bool, chat: bool) -> Any:
+        self.stats["requests"] += 1
+        error = self._inject_error()
+        if error is not None:
+            return error
+        if not await self._acquire_slot():
+            return JSONResponse({"error": "server busy, please try again. maximum pending requests exceeded"}, status_code=503)
+
+        prompt_eval_count = self._prompt_eval_count(prompt)
+        tokens = self._answer(prompt)
+        fail_midstream = stream and self.config.midstream_error_rate and self._rng.random() < self.config.midstream_error_rate
+        started = time.perf_counter()
+        released = False
+
+        def release() -> None:
+            # Called by the stream and by its response; only the first call frees the slot
+            nonlocal released
+            if not released:
+                released = True
+                self._release_slot()
+
+        def part(content: str, done: bool) -> Dict[str, Any]:
+            body: Dict[str, Any] = {
+                "model": model,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "done": done
+            }
+            if chat:
+                body["message"] = {"role": "assistant", "content": content}
+            else:
+                body["response"] = content
+            if done:
+                total_ns = int((time.perf_counter() - started) * 1e9)
+                prefill_ns = int(self.config.ttft_ms * 1e6)
+                body.update({
+                    "done_reason": "stop",
+                    "total_duration": total_ns,
+                    "load_duration": 0,
+                    "prompt_eval_count": prompt_eval_count,
+                    "prompt_eval_duration": prefill_ns,
+                    "eval_count": len(tokens),
+                    "eval_duration": max(total_ns - prefill_ns, 0)
+                })
+            return body
+
+        async def produce() -> AsyncIterator[str]:
+            try:
+                await asyncio.sleep(self.config.ttft_ms / 1000)
+                for i, token in enumerate(tokens):
+                    if i:
+                        await asyncio.sleep(1 / self.config.tokens_per_second)
+                    if fail_midstream and i == 1:
+                        self.stats["errors"] += 1
+                        yield json.dumps({"error": "injected mid-stream failure"}) + "\n"
+                        return
+                    yield json.dumps(part(token, False)) + "\n"
+                yield json.dumps(part("", True)) + "\n"
+                self.stats["generations"] += 1
+            finally:
+                release()
+
+        if stream:
+            return _SlotStreamingResponse(produce(), release, media_type="application/x-ndjson")
+
+        try:
+            await asyncio.sleep(self.config.ttft_ms / 1000 + (len(tokens) - 1) / self.config.tokens_per_second)
+            self.stats["generations"] += 1
+            return JSONResponse(part("".join(tokens), True))
+        finally:
+            release()
+
+    async def chat(self, body: Dict[str, Any]) -> Any:
+        prompt = "\n".join(f"{m.get('role')}: {m.get('content', '')}" for m in body.get("messages", []))
+        return await self._generate(body.get("model", ""), prompt, body.get("stream", True), chat=True)
+
+    async def generate(self, body: Dict[str, Any]) -> Any:
+        prompt = f"{body.get('system') or ''}\n{body.get('prompt', '')}"
+        return await self._generate(body.get("model", ""), prompt, body.get("stream", True), chat=False)
+
+    async def embed_texts(self, texts: List[str]) -> Optional[JSONResponse]:
+        self.stats["requests"] += 1
+        error = self._inject_error()
+        if error is not None:
+            return error
+        await asyncio.sleep(self.config.embed_ms / 1000)
+        self.stats["embeddings"] += len(texts)
+        return None
+
+
+def create_app(config: Optional[FakeOllamaConfig] = None) -> FastAPI:
+    """Build the fake Ollama ASGI app."""
+    config = config or FakeOllamaConfig()
+    app = FastAPI(title="Fake Ollama")
+    fake = FakeOllama(config)
+    app.state.fake = fake
+
+    @app.post("/api/chat")
+    async def chat(request: Request):
+        return await fake.chat(await request.json())
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        return await fake.generate(await request.json())
+
+    @app.post("/api/embed")
+    async def embed(request: Request):
+        body = await request.json()
+        texts = body.get("input", [])
+        texts = [texts] if isinstance(texts, str) else texts
+        error = await fake.embed_texts(texts)
+        if error is not None:
+            return error
+        return {
+            "model": body.get("model", ""),
+            "embeddings": [fake.embed(text) for text in texts],
+            "total_duration": int(config.embed_ms * 1e6),
+            "load_duration": 0,
+            "prompt_eval_count": sum(fake._count_tokens(text) for text in texts)
+        }
+
+    @app.post("/api/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        error = await fake.embed_texts([body.get("prompt", "")])
+        if error is not None:
+            return error
+        return {"embedding": fake.embed(body.get("prompt", ""))}
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": "fake", "model": "fake", "size": 0, "details": {"family": "fake"}}]}
+
+    @app.get("/api/version")
+    async def version():
+        return {"version": "0.0.0-fake"}
+
+    @app.get("/fake/stats")
+    async def stats():
+        return {"config": asdict(config), **fake.stats}
+
+    return app
+
+
+class FakeOllamaServer:
+    """
+    Runs the fake server with uvicorn in a background thread.
+
+    Usage:
+        with FakeOllamaServer(FakeOllamaConfig(ttft_ms=50)) as server:
+            LLMModel(...) against server.url
+    """
+
+    def __init__(self, config: Optional[FakeOllamaConfig] = None, host: str = "127.0.0.1", port: int = 0):
+        self.app = create_app(config)
+        self.host = host
+        self.port = port or self._free_port(host)
+        self._server = uvicorn.Server(uvicorn.Config(self.app, host=self.host, port=self.port, log_level="warning"))
+        self._thread = threading.Thread(target=self._server.run, name="fake-ollama", daemon=True)
+
+    @staticmethod
+    def _free_port(host: str) -> int:
+        with socket.socket() as sock:
+            sock.bind((host, 0))
+            return sock.getsockname()[1]
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    @property
+    def stats(self) -> Dict[str, int]:
+        return self.app.state.fake.stats
+
+    def start(self) -> "FakeOllamaServer":
+        self._thread.start()
+        deadline = time.monotonic() + 10
+        while not self._server.started:
+            if time.monotonic() > deadline or not self._thread.is_alive():
+                raise RuntimeError("Fake Ollama server did not start")
+            time.sleep(0.01)
+        return self
+
+    def stop(self) -> None:
+        self._server.should_exit = True
+        self._thread.join(timeout=10)
+
+    def __enter__(self) -> "FakeOllamaServer":
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--ttft-ms", type=float, default=FakeOllamaConfig.ttft_ms)
+    parser.add_argument("--tokens-per-second", type=float, default=FakeOllamaConfig.tokens_per_second)
+    parser.add_argument("--answer-tokens", type=int, default=FakeOllamaConfig.answer_tokens)
+    parser.add_argument("--max-parallel", type=int, default=FakeOllamaConfig.max_parallel)
+    parser.add_argument("--max-queue", type=int, default=FakeOllamaConfig.max_queue)
+    parser.add_argument("--error-rate", type=float, default=FakeOllamaConfig.error_rate)
+    parser.add_argument("--error-status", type=int, default=FakeOllamaConfig.error_status)
+    parser.add_argument("--midstream-error-rate", type=float, default=FakeOllamaConfig.midstream_error_rate)
+    parser.add_argument("--embedding-dim", type=int, default=FakeOllamaConfig.embedding_dim)
+    parser.add_argument("--embed-ms", type=float, default=FakeOllamaConfig.embed_ms)
+    parser.add_argument("--seed", type=int, default=FakeOllamaConfig.seed)
+    args = parser.parse_args()
+
+    config = FakeOllamaConfig(**{
+        name: value for name, value in vars(args).items() if name not in ("host", "port")
+    })
+    print(f"Fake Ollama on http://{args.host}:{args.port} ({config})")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -3,7 +3,7 @@
 import os
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
-from typing import Optional
+from typing import Literal, Optional
 
 # Explicitly load .env file from the same directory as this config file
 env_path = os.path.join(os.path.dirname(__file__), ".env")
@@ -15,15 +15,67 @@ class Settings(BaseSettings):
     
     # Database Configuration
     database_url: str
+    # Optional read-only replica for history reads (replication lag may hide the latest turn)
+    database_read_url: Optional[str] = None
+    db_pool_size: int = 10  # connections kept open per engine
+    db_max_overflow: int = 10  # extra connections opened under load
+    db_pool_timeout_seconds: float = 30  # wait for a free connection before failing
+    db_pool_recycle_seconds: int = 1800  # reconnect older connections (-1 = never)
+    db_pool_pre_ping: bool = True  # test connections on checkout (survives DB restarts / idle drops)
     
     # LLM Configuration
     llm_model_name: str = "qwen2.5:7b"
     llm_base_url: str = "http://localhost:11434"
     llm_temperature: float = 0.7
+    llm_keep_alive: str = "30m"  # how long Ollama keeps the model loaded after a request ("-1m" = forever)
+    llm_max_connections: int = 10  # pooled keep-alive HTTP connections to Ollama
+    llm_keepalive_expiry_seconds: float = 300
+    llm_max_concurrency: int = 2  # generations sent to Ollama at the same time
+    llm_max_queue: int = 16  # requests waiting for a generation slot; more get 429
+    llm_max_queue_seconds: float = 30  # longest wait for a slot before 429
+    llm_processes: int = 1  # app processes sharing one Ollama (uvicorn --workers); the two limits above are split between them
     
     # Vector Store Configuration
     vector_store_persist_dir: str = "./chroma_db"
     embedding_model_name: str = "sentence-transformers/all-MiniLM-L6-v2"
+    embedding_backend: Literal["torch", "onnx"] = "torch"  # sentence-transformers or ONNX Runtime
+    onnx_model_dir: Optional[str] = None  # exported model.onnx + tokenizer.json (default: the model's Hub ONNX export)
+    onnx_quantize: bool = False  # int8 dynamic quantization of the ONNX model
+    onnx_intra_op_threads: int = 0  # 0 lets ONNX Runtime choose
+    embedding_batch_size: int = 32  # texts per ONNX inference call
+    embedding_max_length: int = 256  # tokens per text (all-MiniLM-L6-v2 max_seq_length)
+    collection_cache_size: int = 16
+    collection_version_ttl_seconds: float = 5.0  # how long a process trusts its cached collection version
+    keyword_index_enabled: bool = True  # build BM25 indexes next to Chroma collections
+    hybrid_candidates: int = 20  # results fetched from each retriever before fusion
+    rrf_k: int = 60  # reciprocal rank fusion constant
+    query_embedding_cache_size: int = 1024  # 0 disables the cache
+    query_embedding_cache_ttl_seconds: Optional[float] = 3600
+    
+    # Semantic answer cache (skips the LLM for near-duplicate questions)
+    answer_cache_size: int = 512  # 0 disables the cache
+    answer_cache_similarity_threshold: float = 0.95
+    answer_cache_ttl_seconds: Optional[float] = 3600
+    # Identical concurrent first questions share one retrieval and one generation
+    coalesce_requests: bool = True
+    
+    # Cross-encoder reranking (per request via ChatRequest.rerank, default below)
+    rerank_enabled: bool = False
+    rerank_model_name: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_candidates: int = 20  # chunks retrieved before reranking down to top_k
+    rerank_batch_size: int = 32
+    rerank_budget_ms: float = 150  # keep retrieval order if scoring takes longer
+    
+    # Thread pools for blocking work on the async chat path
+    embedding_pool_size: int = 2
+    search_pool_size: int = 4
+    rerank_pool_size: int = 1
+    
+    # Prompt token budget (counted with the LLM's tokenizer: a Hub name or a tokenizer.json path)
+    prompt_token_budget: int = 3072  # leaves room for the answer in a 4096-token context
+    prompt_history_token_budget: int = 768  # part of the budget chat history may use
+    prompt_tokenizer: Optional[str] = None  # unset: the tokenizer of llm_model_name (else ~4 chars per token)
+    prompt_tokenizer_dir: str = "./data/tokenizers"  # local <hub name>/tokenizer.json files, used before the Hub
     
     # RAG Configuration
     chat_history_limit: int = 5
@@ -33,6 +85,10 @@ class Settings(BaseSettings):
     # Text Processing Configuration
     chunk_size: int = 500
     chunk_overlap: int = 50
+    
+    # Streaming ingestion pipeline (load -> chunk -> embed -> upsert)
+    ingestion_batch_size: int = 256  # chunks per embed/upsert batch
+    ingestion_queue_size: int = 2  # batches buffered between pipeline stages
 
     # Maximum Messages to Summaries
     summary_max_messages: int = 50
@@ -1,6 +1,6 @@
 """Message model definition for chat history database."""
 
-from sqlalchemy import Column, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, String, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base, generate_uuid
@@ -17,6 +17,10 @@ class MessageModel(Base):
         created_date (datetime): Timestamp when the message was created.
     """
     __tablename__ = "messages"
+    # get_recent_messages filters by session and orders by date (migration 2 adds this to existing databases)
+    __table_args__ = (
+        Index("ix_messages_session_id_created_date", "session_id", "created_date"),
+    )
 
     message_id : str = Column(String(255), primary_key=True, default=generate_uuid)
     session_id : str = Column(String(255), ForeignKey("sessions.session_id"), nullable=False)
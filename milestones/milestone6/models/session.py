@@ -11,13 +11,14 @@ class SessionModel(Base):
 
     Attributes:
         session_id (str): Unique identifier for the session.
-        user_id (str): Identifier for the user associated with the session.
+        user_id (str | None): Identifier for the user associated with the session (None for anonymous API sessions).
         created_date (datetime): Timestamp when the session was created.
     """
     __tablename__ = "sessions"
 
     session_id: str = Column(String(255), primary_key=True, default=generate_uuid)
-    user_id: str = Column(String(255), ForeignKey("users.user_id"), nullable=False)
+    # Nullable since schema migration 3: the chat API creates sessions without a user
+    user_id: str | None = Column(String(255), ForeignKey("users.user_id"), nullable=True)
     created_date: datetime = Column(DateTime, default=datetime.utcnow)
 
     # Relationship 
@@ -1,6 +1,6 @@
 """Summary model definition for chat history database."""
 
-from sqlalchemy import Column, String, ForeignKey, DateTime, Text
+from sqlalchemy import Column, String, ForeignKey, DateTime, Text, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from .base import Base, generate_uuid
@@ -18,6 +18,10 @@ class SummaryModel(Base):
         created_date (datetime): Timestamp when the summary was created.
     """
     __tablename__ = "summaries"
+    # get_latest_summary filters by session and orders by date (also created by migration 2)
+    __table_args__ = (
+        Index("ix_summaries_session_id_created_date", "session_id", "created_date"),
+    )
 
     summary_id: str = Column(String(255), primary_key=True, default=generate_uuid)
     session_id: str = Column(String(255), ForeignKey("sessions.session_id"), nullable=False)
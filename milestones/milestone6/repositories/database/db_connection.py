@@ -1,20 +1,119 @@
 """Database connection management using SQLAlchemy."""
 
-from sqlalchemy import create_engine
+import time
+from fastapi import Depends
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.engine import Engine, make_url
 from sqlalchemy.orm import sessionmaker, Session
-from models.base import Base
+from sqlalchemy.pool import QueuePool
 from config import settings
-from typing import Generator
+from repositories.database.migrations import migrate
+from utils.metrics import REGISTRY
+from typing import Any, Dict, Generator, Optional
 
+POOL_CHECKOUT_SECONDS = REGISTRY.histogram(
+    "db_pool_checkout_wait_seconds",
+    "Time to check out a pooled connection (waiting for a free one, connecting, pre-ping)",
+    labelnames=("engine",),
+    buckets=(0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+POOL_TIMEOUTS = REGISTRY.counter(
+    "db_pool_checkout_timeouts_total",
+    "Checkouts that gave up after DB_POOL_TIMEOUT_SECONDS",
+    labelnames=("engine",)
+)
+POOL_CHECKED_OUT = REGISTRY.gauge(
+    "db_pool_checked_out",
+    "Pooled connections currently in use",
+    labelnames=("engine",)
+)
 
-# Create engine and session factory at module level
-engine = create_engine(settings.database_url)
+
+class InstrumentedQueuePool(QueuePool):
+    """QueuePool that exports checkout wait time and timeouts (labelled by its logging name)."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            POOL_TIMEOUTS.inc(engine=self.logging_name)
+            raise
+        finally:
+            POOL_CHECKOUT_SECONDS.observe(time.perf_counter() - start, engine=self.logging_name)
+        return connection
+
+
+def _track_checked_out(engine: Engine, name: str) -> None:
+    """Keep db_pool_checked_out current from the pool's checkout/checkin events."""
+
+    @event.listens_for(engine, "checkout")
+    def _checked_out(dbapi_connection, connection_record, connection_proxy):
+        POOL_CHECKED_OUT.inc(engine=name)
+
+    @event.listens_for(engine, "checkin")
+    def _checked_in(dbapi_connection, connection_record):
+        POOL_CHECKED_OUT.dec(engine=name)
+
+    @event.listens_for(engine, "detach")
+    def _detached(dbapi_connection, connection_record):
+        # A detached connection is never checked back in
+        POOL_CHECKED_OUT.dec(engine=name)
+
+
+def _pool_options(database_url: str, name: str) -> Dict[str, Any]:
+    """create_engine pool arguments from the settings."""
+    options: Dict[str, Any] = {
+        "pool_pre_ping": settings.db_pool_pre_ping,
+        "pool_recycle": settings.db_pool_recycle_seconds
+    }
+    url = make_url(database_url)
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        # In-memory SQLite keeps one connection per thread; there is no pool to size
+        return options
+    options.update(
+        poolclass=InstrumentedQueuePool,
+        pool_logging_name=name,
+        pool_size=settings.db_pool_size,
+        max_overflow=settings.db_max_overflow,
+        pool_timeout=settings.db_pool_timeout_seconds
+    )
+    return options
+
+
+def create_pooled_engine(database_url: str, name: str) -> Engine:
+    """
+    Creates an engine with the pool settings from config.
+
+    Args:
+        database_url: SQLAlchemy database URL
+        name: Pool name used as the "engine" label of the db_pool_* metrics
+
+    Returns:
+        The SQLAlchemy engine
+    """
+    engine = create_engine(database_url, **_pool_options(database_url, name))
+    if isinstance(engine.pool, InstrumentedQueuePool):
+        _track_checked_out(engine, name)
+    return engine
+
+
+# Create engines and session factories at module level
+engine = create_pooled_engine(settings.database_url, "primary")
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Read-only replica for history reads (None: reads use the primary)
+read_engine: Optional[Engine] = (
+    create_pooled_engine(settings.database_read_url, "replica") if settings.database_read_url else None
+)
+ReadSessionLocal = (
+    sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine is not None else None
+)
+
 
 def init_db() -> None:
-    """Initialize the database by creating all tables."""
-    Base.metadata.create_all(bind=engine)
+    """Initialize the database by creating all tables and applying pending schema migrations."""
+    migrate(engine)
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -30,3 +129,22 @@ def get_db() -> Generator[Session, None, None]:
         yield db
     finally:
         db.close()
+
+
+def get_read_db(db: Session = Depends(get_db)) -> Generator[Session, None, None]:
+    """
+    Dependency function for read-only queries.
+    Provides a session on the read replica, or the request's primary session
+    if no replica is configured (so a request never holds two primary connections).
+    
+    Yields:
+        Session: SQLAlchemy Session object for reads.
+    """
+    if ReadSessionLocal is None:
+        yield db
+        return
+    read_db = ReadSessionLocal()
+    try:
+        yield read_db
+    finally:
+        read_db.close()
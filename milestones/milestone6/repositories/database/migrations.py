@@ -0,0 +1,136 @@
+"""
+Versioned schema migrations for the chat-history database.
+
+Base.metadata.create_all only creates missing tables; it never changes existing
+ones. Each schema change is therefore a numbered Migration, and the version a
+database is at is stored in dbo.schema_version. migrate() applies the pending
+migrations in order, each in its own transaction together with its version row.
+
+Migrations must be idempotent, because databases created before versioning
+existed start at version 0 even though their tables are already there.
+
+To change the schema: update the model, then append a Migration with the next
+version number that brings existing databases to the same state.
+
+Usage:
+    python -m repositories.database.migrations          # apply pending migrations
+    python -m repositories.database.migrations --status # show the current version
+"""
+
+import argparse
+import logging
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, List, Optional
+from sqlalchemy import Column, DateTime, Integer, MetaData, String, Table, inspect, select
+from sqlalchemy.engine import Connection, Engine
+from models.base import Base
+from models.message import MessageModel
+from models.session import SessionModel
+from models.summary import SummaryModel
+
+logger = logging.getLogger(__name__)
+
+schema_version = Table(
+    "schema_version",
+    MetaData(schema="dbo"),
+    Column("version", Integer, primary_key=True),
+    Column("description", String(255), nullable=False),
+    Column("applied_date", DateTime, nullable=False)
+)
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema change; upgrade runs inside the migration's transaction."""
+    version: int
+    description: str
+    upgrade: Callable[[Connection], None]
+
+
+def _create_tables(connection: Connection) -> None:
+    Base.metadata.create_all(bind=connection)
+
+
+def _create_history_indexes(connection: Connection) -> None:
+    for model in (MessageModel, SummaryModel):
+        for index in model.__table__.indexes:
+            index.create(bind=connection, checkfirst=True)
+
+
+def _make_session_user_optional(connection: Connection) -> None:
+    column = SessionModel.__table__.c.user_id
+    if connection.dialect.name == "mssql":
+        column_type = column.type.compile(dialect=connection.dialect)
+        connection.exec_driver_sql(f"ALTER TABLE dbo.sessions ALTER COLUMN user_id {column_type} NULL")
+    elif connection.dialect.name == "postgresql":
+        connection.exec_driver_sql("ALTER TABLE dbo.sessions ALTER COLUMN user_id DROP NOT NULL")
+    else:
+        # SQLite cannot alter columns; its databases are scratch copies created by version 1
+        logger.info(f"Skipping user_id nullability change on {connection.dialect.name}")
+
+
+MIGRATIONS: List[Migration] = [
+    Migration(1, "Create chat-history tables", _create_tables),
+    Migration(2, "Index messages and summaries on (session_id, created_date)", _create_history_indexes),
+    Migration(3, "Allow sessions without a user", _make_session_user_optional),
+]
+
+
+def current_version(connection: Connection) -> int:
+    """Schema version of the database (0 if it has never been migrated)."""
+    if not inspect(connection).has_table("schema_version", schema="dbo"):
+        return 0
+    versions = connection.execute(select(schema_version.c.version)).scalars().all()
+    return max(versions, default=0)
+
+
+def migrate(engine: Engine, target: Optional[int] = None) -> int:
+    """
+    Applies pending migrations up to target (default: the latest).
+
+    Args:
+        engine: Engine of the database to migrate
+        target: Version to stop at
+
+    Returns:
+        The schema version after migrating
+    """
+    with engine.begin() as connection:
+        schema_version.create(bind=connection, checkfirst=True)
+        version = current_version(connection)
+
+    for migration in MIGRATIONS:
+        if migration.version <= version or (target is not None and migration.version > target):
+            continue
+        logger.info(f"Applying migration {migration.version}: {migration.description}")
+        with engine.begin() as connection:
+            migration.upgrade(connection)
+            connection.execute(schema_version.insert().values(
+                version=migration.version,
+                description=migration.description,
+                applied_date=datetime.utcnow()
+            ))
+        version = migration.version
+    return version
+
+
+def main() -> None:
+    from repositories.database.db_connection import engine
+
+    parser = argparse.ArgumentParser(description="Apply chat-history schema migrations")
+    parser.add_argument("--status", action="store_true", help="Only print the current and latest version")
+    parser.add_argument("--target", type=int, help="Stop at this version")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    latest = MIGRATIONS[-1].version
+    if args.status:
+        with engine.connect() as connection:
+            print(f"Schema version {current_version(connection)} (latest {latest})")
+        return
+    print(f"Schema version {migrate(engine, args.target)} (latest {latest})")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,16 +1,25 @@
 """Repository for Message-related database operations."""
 
+from datetime import datetime, timedelta
 from sqlalchemy.orm import Session as DBSession_Type
+from models.base import generate_uuid
 from models.message import MessageModel
+from models.session import SessionModel
 from schemas.history_schema import MessageSchema
-from typing import List
+from typing import List, Optional, Tuple
+
+# Minimum gap between a turn's user and assistant timestamps, so ordering by
+# created_date is stable (SQL Server DATETIME has a ~3.33 ms resolution)
+TURN_ORDER_STEP = timedelta(milliseconds=10)
 
 
 class MessageRepository:
     """Handles all database operations for chat messages."""
     
-    def __init__(self, db: DBSession_Type):
+    def __init__(self, db: DBSession_Type, read_db: Optional[DBSession_Type] = None):
         self.db = db
+        # History reads go to the read replica when one is configured
+        self.read_db = read_db if read_db is not None else db
 
     def add_message(self, session_id: str, role: str, content: str) -> str:
         """
@@ -40,6 +49,61 @@ class MessageRepository:
             # Rollback in case of error
             self.db.rollback()
             raise e
+
+    def add_turn(
+        self,
+        session_id: str,
+        user_content: str,
+        assistant_content: str,
+        new_session: bool = False,
+        asked_at: Optional[datetime] = None
+    ) -> Tuple[str, str]:
+        """
+        Adds a chat turn (user message and assistant reply) in a single transaction.
+        
+        IDs and timestamps are set here rather than by the database, so all rows
+        are written in one flush and nothing has to be refreshed afterwards.
+        
+        Args:
+            session_id: The session to add the turn to
+            user_content: The user's message
+            assistant_content: The assistant's reply
+            new_session: Also insert the session row (a session started by this turn)
+            asked_at: When the user message was received (defaults to now)
+            
+        Returns:
+            The created (user message ID, assistant message ID)
+        """
+        now = datetime.utcnow()
+        asked_at = asked_at or now
+        user_message_id, assistant_message_id = generate_uuid(), generate_uuid()
+        rows = []
+        if new_session:
+            rows.append(SessionModel(session_id=session_id, created_date=asked_at))
+        rows.append(MessageModel(
+            message_id=user_message_id,
+            session_id=session_id,
+            role="user",
+            content=user_content,
+            created_date=asked_at
+        ))
+        rows.append(MessageModel(
+            message_id=assistant_message_id,
+            session_id=session_id,
+            role="assistant",
+            content=assistant_content,
+            created_date=max(now, asked_at + TURN_ORDER_STEP)
+        ))
+        try:
+            self.db.add_all(rows)
+            self.db.commit()
+            # The IDs are read from locals: the committed objects are expired
+            return user_message_id, assistant_message_id
+
+        except Exception as e:
+            # Rollback in case of error
+            self.db.rollback()
+            raise e
         
     def get_messages_by_session(self, session_id: str) -> List[MessageModel]:
         """
@@ -53,13 +117,13 @@ class MessageRepository:
         """
         try:
             return (
-                self.db.query(MessageModel)
+                self.read_db.query(MessageModel)
                 .filter(MessageModel.session_id == session_id)
                 .order_by(MessageModel.created_date.asc())  # oldest first
                 .all()
             )
         except Exception as e:
-            self.db.rollback()
+            self.read_db.rollback()
             raise e
 
 
@@ -76,14 +140,14 @@ class MessageRepository:
         """
         try:
             return (
-                self.db.query(MessageModel)
+                self.read_db.query(MessageModel)
                 .filter(MessageModel.session_id == session_id)
                 .order_by(MessageModel.created_date.desc())
                 .limit(limit)
                 .all()
             )
         except Exception as e:
-            self.db.rollback()
+            self.read_db.rollback()
             raise e
 
 
@@ -1,10 +1,12 @@
 """ Chat Router for RAG-based context-aware chat endpoint."""
 
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+import json
+from typing import Any, AsyncIterator, Dict
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from services.rag_service import RAGService
+from services.container import get_rag_service
 from schemas.chat_schema import ChatRequest, ChatResponse
-from repositories.database.db_connection import get_db
 
 router = APIRouter(
     prefix="/api/v1/chat",
@@ -12,7 +14,11 @@ router = APIRouter(
 )
 
 @router.post("", response_model=ChatResponse)
-async def chat(request: ChatRequest, db: Session = Depends(get_db)):
+async def chat(
+    request: ChatRequest,
+    http_response: Response,
+    rag_service: RAGService = Depends(get_rag_service)
+):
     """
     Context-aware RAG chat endpoint with history.
     
@@ -21,15 +27,54 @@ async def chat(request: ChatRequest, db: Session = Depends(get_db)):
     - Performs vector search for relevant documents
     - Generates AI response using LLM
     - Saves conversation to database
+    - Server-Timing header with the time spent in each stage
     """
-    rag_service = RAGService(db)
-    
     try:
-        response = rag_service.process_chat(request)
+        response = await rag_service.aprocess_chat(request)
+    except HTTPException:
+        raise
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+    http_response.headers["Server-Timing"] = rag_service.timer.server_timing()
     return response
 
+
+def _format_sse(event: Dict[str, Any]) -> str:
+    """Serialize an event dictionary as a server-sent event."""
+    return f"event: {event['event']}\ndata: {json.dumps(event['data'])}\n\n"
+
+
+@router.post("/stream")
+async def chat_stream(request: ChatRequest, rag_service: RAGService = Depends(get_rag_service)):
+    """
+    Streaming variant of the chat endpoint (Server-Sent Events).
+    
+    - Session, history and vector search run first, so their errors still return an HTTP error
+    - `token` events carry answer fragments as the LLM generates them
+    - A final `done` event carries the full response (sources, validation, time to first token)
+    - An `error` event replaces `done` if generation fails mid-stream
+    - 429 with Retry-After if the LLM queue is already full
+    - Server-Timing header with the stages that ran before streaming started
+    """
+    try:
+        chat = await rag_service.aprepare_chat(request)
+    except ValueError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    rag_service.check_llm_capacity(chat)
+
+    async def event_stream() -> AsyncIterator[str]:
+        async for event in rag_service.astream_chat(request, chat):
+            yield _format_sse(event)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no",
+            "Server-Timing": rag_service.timer.server_timing()
+        }
+    )
@@ -1,9 +1,10 @@
 """ History Router for retrieving session chat history. """
 
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 from schemas.history_schema import SessionHistoryResponse
-from repositories.database.db_connection import get_db
+from repositories.database.db_connection import get_read_db
 from services.history_service import HistoryService
 
 router = APIRouter(
@@ -12,13 +13,14 @@ router = APIRouter(
 )
 
 @router.get("/{session_id}", response_model=SessionHistoryResponse)
-async def get_session_history(session_id: str, db: Session = Depends(get_db)):
+async def get_session_history(session_id: str, db: Session = Depends(get_read_db)):
     """
     Retrieve the chat history for a specific session.
+    Reads go to the read replica if one is configured; the queries run in the threadpool.
     """
     service = HistoryService(db)
     try:
-        response = service.fetch_session_history(session_id)
+        response = await run_in_threadpool(service.fetch_session_history, session_id)
     except ValueError as e:
         raise HTTPException(status_code=404, detail=str(e))
     return response
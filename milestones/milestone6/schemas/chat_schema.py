@@ -2,7 +2,7 @@
 
 from pydantic import BaseModel, Field, ConfigDict
 from datetime import datetime
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Literal
 
 
 class ChatRequest(BaseModel):
@@ -12,6 +12,14 @@ class ChatRequest(BaseModel):
     session_id: Optional[str] = Field(None, description="Session ID for chat history")
     collection_name: str = Field("documents", description="Vector store collection name")
     top_k: int = Field(3, ge=1, le=10, description="Number of documents to retrieve")
+    retrieval_mode: Literal["dense", "keyword", "hybrid"] = Field(
+        "dense",
+        description="Vector search, BM25 keyword search, or both merged with reciprocal rank fusion"
+    )
+    rerank: Optional[bool] = Field(
+        None,
+        description="Rerank a wider candidate set with a cross-encoder (default: server setting)"
+    )
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -19,7 +27,8 @@ class ChatRequest(BaseModel):
                 "query": "What services does EBLA provide?",
                 "session_id": "30ba30b4-2195-43fb-9431-b4ed45db5008",
                 "collection_name": "documents",
-                "top_k": 3
+                "top_k": 3,
+                "retrieval_mode": "hybrid"
             }
         }
     )
@@ -49,6 +58,11 @@ class ValidationMetrics(BaseModel):
     context_sources: int = Field(..., description="Number of context sources retrieved")
     history_preview: List[str] = Field(default_factory=list, description="Preview of recent history messages (max 3)")
     prompt_preview: str = Field(default="", description="Preview of the prompt sent to LLM (first 500 chars)")  
+    prompt_tokens: int = Field(default=0, description="Prompt size in tokens, counted with the LLM's tokenizer")
+    answer_cache_hit: bool = Field(default=False, description="Whether the answer was served from the semantic answer cache")
+    answer_cache_similarity: Optional[float] = Field(None, description="Cosine similarity to the cached question on a cache hit")
+    reranked: bool = Field(default=False, description="Whether the sources were reordered by the cross-encoder")
+    coalesced: bool = Field(default=False, description="Whether retrieval and answer were shared with an identical in-flight request")
     
     model_config = ConfigDict(
         json_schema_extra={
@@ -60,7 +74,12 @@ class ValidationMetrics(BaseModel):
                     "User: What services does EBLA provide?",
                     "Assistant: EBLA provides..."
                 ],
-                "prompt_preview": "You are an intelligent assistant for EBLA Computer Consultancy..."
+                "prompt_preview": "You are an intelligent assistant for EBLA Computer Consultancy...",
+                "prompt_tokens": 412,
+                "answer_cache_hit": False,
+                "answer_cache_similarity": None,
+                "reranked": False,
+                "coalesced": False
             }
         }
     )
@@ -98,7 +117,12 @@ class ChatResponse(BaseModel):
                         "User: What services does EBLA provide?",
                         "Assistant: EBLA provides..."
                     ],
-                    "prompt_preview": "You are an intelligent assistant for EBLA Computer Consultancy..."
+                    "prompt_preview": "You are an intelligent assistant for EBLA Computer Consultancy...",
+                    "prompt_tokens": 412,
+                    "answer_cache_hit": False,
+                    "answer_cache_similarity": None,
+                    "reranked": False,
+                    "coalesced": False
                 },
                 "created_at": "2025-11-23T10:30:00"
             }
@@ -0,0 +1,158 @@
+"""Semantic answer cache: reuse LLM answers for near-duplicate questions."""
+
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from itertools import count
+from threading import Lock
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+import numpy as np
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class CachedAnswer:
+    """An answer (with its sources) stored for a query embedding."""
+
+    answer: str
+    context_docs: List[Dict[str, Any]]
+    embedding: np.ndarray
+    collection_version: int
+    expires_at: Optional[float]
+
+
+class SemanticAnswerCache:
+    """
+    Bounded LRU cache of answers looked up by cosine similarity of query embeddings.
+
+    Entries are scoped (e.g. by collection name and top_k) and tagged with the
+    collection version they were generated against; entries from an older
+    version never match and are dropped on the next lookup in that scope.
+    """
+
+    def __init__(
+        self,
+        max_size: int = 512,
+        similarity_threshold: float = 0.95,
+        ttl_seconds: Optional[float] = None
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of cached answers across all scopes
+            similarity_threshold: Minimum cosine similarity for a hit
+            ttl_seconds: Optional time-to-live per entry
+        """
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.max_size = max_size
+        self.similarity_threshold = similarity_threshold
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[Hashable, int], CachedAnswer]" = OrderedDict()
+        self._ids = count()
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    @staticmethod
+    def _normalize(embedding: List[float]) -> np.ndarray:
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    def lookup(
+        self,
+        scope: Hashable,
+        collection_version: int,
+        embedding: List[float]
+    ) -> Optional[Tuple[CachedAnswer, float]]:
+        """
+        Find the most similar cached answer in a scope.
+
+        Args:
+            scope: Cache scope (e.g. (collection_name, top_k))
+            collection_version: Current version of the collection
+            embedding: Query embedding
+
+        Returns:
+            (CachedAnswer, similarity) on a hit, None otherwise
+        """
+        query = self._normalize(embedding)
+        now = time.monotonic()
+        best: Optional[Tuple[Tuple[Hashable, int], CachedAnswer, float]] = None
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                if key[0] != scope:
+                    continue
+                if entry.collection_version != collection_version or (
+                    entry.expires_at is not None and entry.expires_at <= now
+                ):
+                    # Collection was re-indexed (or entry expired): drop it
+                    del self._entries[key]
+                    self.invalidations += 1
+                    continue
+                similarity = float(np.dot(query, entry.embedding))
+                if similarity >= self.similarity_threshold and (best is None or similarity > best[2]):
+                    best = (key, entry, similarity)
+
+            if best is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(best[0])
+            self.hits += 1
+            return best[1], best[2]
+
+    def store(
+        self,
+        scope: Hashable,
+        collection_version: int,
+        embedding: List[float],
+        answer: str,
+        context_docs: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Cache an answer for a query embedding.
+
+        Args:
+            scope: Cache scope (e.g. (collection_name, top_k))
+            collection_version: Version of the collection the answer was generated against
+            embedding: Query embedding
+            answer: Generated answer
+            context_docs: Sources used for the answer
+        """
+        expires_at = time.monotonic() + self.ttl_seconds if self.ttl_seconds is not None else None
+        entry = CachedAnswer(answer, context_docs, self._normalize(embedding), collection_version, expires_at)
+        with self._lock:
+            self._entries[(scope, next(self._ids))] = entry
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, Any]:
+        """Snapshot of cache counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0
+            }
+
+
+# Process-wide instance (None when disabled in settings)
+answer_cache: Optional[SemanticAnswerCache] = (
+    SemanticAnswerCache(
+        max_size=settings.answer_cache_size,
+        similarity_threshold=settings.answer_cache_similarity_threshold,
+        ttl_seconds=settings.answer_cache_ttl_seconds
+    )
+    if settings.answer_cache_size > 0 else None
+)
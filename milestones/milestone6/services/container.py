@@ -0,0 +1,96 @@
+"""Process-wide component container for shared, expensive-to-build services."""
+
+from fastapi import Depends, Request
+from sqlalchemy.orm import Session
+from repositories.database.db_connection import get_db, get_read_db
+from services.vector_store import VectorStoreManager
+from services.llm_service import LLMModel
+from services.reranker import CrossEncoderReranker
+from services.llm_admission import LLMAdmissionController
+from services.rag_service import RAGService
+from utils.executors import shutdown_executors
+from utils.prompt_builder import count_tokens
+from config import settings
+from typing import Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceContainer:
+    """
+    Holds the components that must be built once per process and shared by every request.
+
+    Attributes:
+        vector_store: VectorStoreManager owning the embedding model and the Chroma client
+        llm_model: LLMModel owning the Ollama client
+        reranker: CrossEncoderReranker (its model is loaded on first use)
+        llm_admission: LLMAdmissionController limiting concurrent generations in the process
+    """
+
+    def __init__(
+        self,
+        vector_store: Optional[VectorStoreManager] = None,
+        llm_model: Optional[LLMModel] = None,
+        reranker: Optional[CrossEncoderReranker] = None
+    ) -> None:
+        """
+        Build the shared components (or accept pre-built ones, e.g. for tests).
+
+        Args:
+            vector_store: Optional pre-built VectorStoreManager
+            llm_model: Optional pre-built LLMModel
+            reranker: Optional pre-built CrossEncoderReranker
+        """
+        logger.info("Building service container...")
+        self.vector_store: VectorStoreManager = vector_store if vector_store is not None else VectorStoreManager()
+        self.llm_model: LLMModel = llm_model if llm_model is not None else LLMModel()
+        self.reranker: CrossEncoderReranker = reranker if reranker is not None else CrossEncoderReranker()
+        self.llm_admission = LLMAdmissionController()
+        if settings.rerank_enabled:
+            # Load the cross-encoder now rather than on the first chat
+            self.reranker.model
+        # Load the prompt tokenizer now rather than on the first chat
+        count_tokens("warm-up")
+        logger.info("Service container ready")
+
+    async def aclose(self) -> None:
+        """Release shared resources on application shutdown."""
+        await self.llm_model.aclose()
+        shutdown_executors()
+        logger.info("Service container closed")
+
+
+def get_container(request: Request) -> ServiceContainer:
+    """
+    Dependency function returning the container built in the app lifespan.
+
+    Args:
+        request: Incoming FastAPI request
+
+    Returns:
+        The process-wide ServiceContainer
+    """
+    return request.app.state.container
+
+
+def get_rag_service(
+    db: Session = Depends(get_db),
+    read_db: Session = Depends(get_read_db),
+    container: ServiceContainer = Depends(get_container)
+) -> RAGService:
+    """
+    Dependency function providing a RAGService for the current request.
+    Only the SQLAlchemy sessions are per-request; everything else comes from the container.
+
+    Returns:
+        RAGService bound to the request's database sessions (writes and history reads)
+    """
+    return RAGService(
+        db,
+        vector_store=container.vector_store,
+        llm_model=container.llm_model,
+        reranker=container.reranker,
+        llm_admission=container.llm_admission,
+        read_db=read_db
+    )
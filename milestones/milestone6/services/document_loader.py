@@ -1,13 +1,50 @@
 """Document loader module using LangChain."""
 
 from langchain_community.document_loaders import DirectoryLoader, TextLoader, PyPDFLoader
-from typing import List
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass, field
+from itertools import islice
+from typing import Dict, Iterator, List, Optional
 from langchain_core.documents import Document
 import os
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+
+@dataclass
+class FileLoadResult:
+    """Outcome of parsing a single file."""
+    
+    path: str
+    documents: List[Document] = field(default_factory=list)
+    parse_seconds: float = 0.0
+    error: Optional[str] = None
+
+
+def load_file(path: str) -> FileLoadResult:
+    """
+    Parse one text or PDF file, capturing errors instead of raising.
+    
+    Module-level so it can run in a worker process.
+    
+    Args:
+        path: Path of the file to load
+        
+    Returns:
+        FileLoadResult with the file's documents (one per PDF page) and parse time
+    """
+    start = time.perf_counter()
+    try:
+        loader = PyPDFLoader(path) if path.lower().endswith(".pdf") else TextLoader(path)
+        documents = loader.load()
+        return FileLoadResult(path, documents, time.perf_counter() - start)
+    except Exception as e:
+        return FileLoadResult(path, [], time.perf_counter() - start, f"{type(e).__name__}: {e}")
+
+
 class DocumentLoader:
     """Load documents from a directory using LangChain."""
     
@@ -24,6 +61,100 @@ class DocumentLoader:
             raise ValueError(f"Directory not found: '{documents_path}' (absolute path: {self.documents_path})")
         logger.info(f"DocumentLoader initialized with path: {self.documents_path}")
     
+    def list_files(self) -> List[str]:
+        """
+        List all text and PDF files under the documents directory.
+        
+        Returns:
+            Sorted list of absolute file paths
+        """
+        files = []
+        for root, _, names in os.walk(self.documents_path):
+            for name in names:
+                if name.lower().endswith((".txt", ".pdf")):
+                    files.append(os.path.join(root, name))
+        return sorted(files)
+    
+    def iter_file_results(
+        self,
+        max_workers: Optional[int] = None,
+        files: Optional[List[str]] = None
+    ) -> Iterator[FileLoadResult]:
+        """
+        Parse files in a process pool, yielding each result as soon as it finishes.
+        
+        A file that fails to parse yields a result with `error` set; it does not stop the others.
+        If a worker process dies (e.g. a crashing native parser), the files it took down with
+        it are reported as failed and the remaining files are parsed in a new pool.
+        
+        Args:
+            max_workers: Number of worker processes (default: one per CPU core)
+            files: Files to parse (default: all files from list_files())
+            
+        Yields:
+            FileLoadResult per file, in completion order
+        """
+        if files is None:
+            files = self.list_files()
+        if not files:
+            return
+        workers = max_workers or os.cpu_count() or 1
+        workers = min(workers, len(files))
+        # Submit lazily so at most two files per worker are parsed ahead of the consumer
+        max_pending = workers * 2
+        remaining = iter(files)
+        
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            pending: Dict[Future, str] = {}
+            while True:
+                for path in islice(remaining, max_pending - len(pending)):
+                    try:
+                        future = executor.submit(load_file, path)
+                    except BrokenProcessPool:
+                        # Its in-flight files fail with BrokenProcessPool below; go on in a new pool
+                        logger.warning("Parser worker process died, starting a new pool")
+                        executor.shutdown(wait=False)
+                        executor = ProcessPoolExecutor(max_workers=workers)
+                        future = executor.submit(load_file, path)
+                    pending[future] = path
+                if not pending:
+                    break
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        # The worker itself died (e.g. a crashing native parser)
+                        result = FileLoadResult(path, error=f"{type(e).__name__}: {e}")
+                    if result.error:
+                        logger.warning(f"Failed to load {result.path}: {result.error}")
+                    else:
+                        logger.info(
+                            f"Parsed {os.path.basename(result.path)} in {result.parse_seconds:.3f}s "
+                            f"({len(result.documents)} documents)"
+                        )
+                    yield result
+        finally:
+            executor.shutdown()
+    
+    def stream_documents(self, max_workers: Optional[int] = None) -> Iterator[Document]:
+        """
+        Parse files in parallel and yield their documents as each file finishes.
+        
+        Files that fail to parse are logged and skipped. Use iter_file_results()
+        to get per-file parse times and errors.
+        
+        Args:
+            max_workers: Number of worker processes
+            
+        Yields:
+            LangChain Document objects
+        """
+        for result in self.iter_file_results(max_workers):
+            yield from result.documents
+    
     def load_documents(self) -> List[Document]:
         """
         Load all text and PDF documents from the specified directory.
@@ -0,0 +1,165 @@
+"""Embedding backends: sentence-transformers (PyTorch) or ONNX Runtime."""
+
+import os
+from typing import Any, List, Optional
+import numpy as np
+from langchain_core.embeddings import Embeddings
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Files fetched from the Hugging Face Hub when no exported model directory is configured
+_ONNX_HUB_FILES = ["onnx/model.onnx", "tokenizer.json"]
+_QUANTIZED_FILE_NAME = "model_qint8.onnx"
+
+
+def build_embeddings(model_name: Optional[str] = None, backend: Optional[str] = None) -> Embeddings:
+    """
+    Build the embedding model for the configured backend.
+
+    Args:
+        model_name: Hugging Face model name (defaults to settings)
+        backend: "torch" or "onnx" (defaults to settings)
+
+    Returns:
+        LangChain Embeddings instance
+    """
+    model_name = model_name or settings.embedding_model_name
+    backend = backend or settings.embedding_backend
+    if backend == "onnx":
+        return OnnxEmbeddings(model_name)
+    if backend == "torch":
+        from langchain_huggingface import HuggingFaceEmbeddings
+        return HuggingFaceEmbeddings(model_name=model_name)
+    raise ValueError(f"Unknown embedding backend: '{backend}'")
+
+
+class OnnxEmbeddings(Embeddings):
+    """
+    Sentence embeddings from an exported ONNX transformer, without PyTorch.
+
+    Runs the model with ONNX Runtime and applies the sentence-transformers
+    post-processing (attention-masked mean pooling, then L2 normalization).
+    The int8 variant is produced with dynamic quantization on first use and
+    stored next to the fp32 model.
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        model_dir: Optional[str] = None,
+        quantize: Optional[bool] = None,
+        intra_op_threads: Optional[int] = None,
+        batch_size: Optional[int] = None,
+        max_length: Optional[int] = None,
+        session: Any = None,
+        tokenizer: Any = None
+    ):
+        """
+        Initialize the backend.
+
+        Args:
+            model_name: Hub model whose onnx/model.onnx is used when no model_dir is set (defaults to settings)
+            model_dir: Directory with model.onnx (or onnx/model.onnx) and tokenizer.json (defaults to settings)
+            quantize: Use the int8 dynamically quantized model (defaults to settings)
+            intra_op_threads: ONNX Runtime intra-op threads, 0 for its default (defaults to settings)
+            batch_size: Texts per inference call (defaults to settings)
+            max_length: Token limit per text (defaults to settings)
+            session: Optional pre-built inference session (e.g. for tests)
+            tokenizer: Optional pre-built tokenizers.Tokenizer (e.g. for tests)
+        """
+        self.model_name = model_name or settings.embedding_model_name
+        self.model_dir = model_dir or settings.onnx_model_dir
+        self.quantize = settings.onnx_quantize if quantize is None else quantize
+        self.intra_op_threads = settings.onnx_intra_op_threads if intra_op_threads is None else intra_op_threads
+        self.batch_size = batch_size or settings.embedding_batch_size
+        self.max_length = max_length or settings.embedding_max_length
+        self._session = session
+        self._tokenizer = tokenizer
+        if self._session is None or self._tokenizer is None:
+            self._load()
+        self._input_names = {model_input.name for model_input in self._session.get_inputs()}
+
+    def _model_files(self) -> List[str]:
+        """Locate (or download) the fp32 ONNX model and tokenizer.json."""
+        model_dir = self.model_dir
+        if model_dir is None:
+            from huggingface_hub import snapshot_download
+            model_dir = snapshot_download(self.model_name, allow_patterns=_ONNX_HUB_FILES)
+
+        for candidate in ("model.onnx", os.path.join("onnx", "model.onnx")):
+            model_path = os.path.join(model_dir, candidate)
+            if os.path.exists(model_path):
+                return [model_path, os.path.join(model_dir, "tokenizer.json")]
+        raise FileNotFoundError(f"No model.onnx found in {model_dir}")
+
+    def _load(self) -> None:
+        """Create the tokenizer and ONNX Runtime session."""
+        import onnxruntime as ort
+        from tokenizers import Tokenizer
+
+        model_path, tokenizer_path = self._model_files()
+        if self.quantize:
+            model_path = self._quantized(model_path)
+
+        tokenizer = Tokenizer.from_file(tokenizer_path)
+        tokenizer.enable_truncation(max_length=self.max_length)
+        tokenizer.enable_padding()
+
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = self.intra_op_threads
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        logger.info(f"Loading ONNX embedding model: {model_path} (intra-op threads: {self.intra_op_threads or 'auto'})")
+        self._session = ort.InferenceSession(model_path, sess_options=options, providers=["CPUExecutionProvider"])
+        self._tokenizer = tokenizer
+
+    @staticmethod
+    def _quantized(model_path: str) -> str:
+        """Return the int8 model next to model_path, quantizing it on first use."""
+        quantized_path = os.path.join(os.path.dirname(model_path), _QUANTIZED_FILE_NAME)
+        if not os.path.exists(quantized_path):
+            from onnxruntime.quantization import QuantType, quantize_dynamic
+            logger.info(f"Quantizing {model_path} to int8: {quantized_path}")
+            tmp_path = f"{quantized_path}.tmp"
+            quantize_dynamic(model_path, tmp_path, weight_type=QuantType.QInt8)
+            os.replace(tmp_path, quantized_path)
+        return quantized_path
+
+    def _embed_batch(self, texts: List[str]) -> List[List[float]]:
+        """Tokenize, run the model and pool one batch."""
+        encodings = self._tokenizer.encode_batch(texts)
+        attention_mask = np.array([encoding.attention_mask for encoding in encodings], dtype=np.int64)
+        inputs = {
+            "input_ids": np.array([encoding.ids for encoding in encodings], dtype=np.int64),
+            "attention_mask": attention_mask,
+            "token_type_ids": np.array([encoding.type_ids for encoding in encodings], dtype=np.int64),
+        }
+        outputs = self._session.run(None, {name: value for name, value in inputs.items() if name in self._input_names})
+
+        hidden = outputs[0]
+        if hidden.ndim == 3:
+            # Token embeddings: mean over real (non-padding) tokens
+            mask = attention_mask[:, :, None].astype(hidden.dtype)
+            hidden = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        norms = np.linalg.norm(hidden, axis=1, keepdims=True)
+        return (hidden / np.clip(norms, 1e-12, None)).tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """
+        Embed texts in batches of similar length (less padding per batch).
+
+        Returns:
+            One embedding per text, in input order
+        """
+        order = sorted(range(len(texts)), key=lambda i: len(texts[i]), reverse=True)
+        embeddings: List[Optional[List[float]]] = [None] * len(texts)
+        for offset in range(0, len(order), self.batch_size):
+            batch = order[offset:offset + self.batch_size]
+            for index, embedding in zip(batch, self._embed_batch([texts[i] for i in batch])):
+                embeddings[index] = embedding
+        return embeddings
+
+    def embed_query(self, text: str) -> List[float]:
+        """Embed a single query."""
+        return self._embed_batch([text])[0]
@@ -0,0 +1,132 @@
+"""Deterministic chunk IDs, per-source chunk diffs and the file manifest for incremental indexing."""
+
+import hashlib
+import json
+import os
+from typing import Any, Dict, List, Optional, Set
+from langchain_core.documents import Document
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def chunk_id(source: str, text: str, occurrence: int) -> str:
+    """
+    Deterministic chunk ID from its source and content.
+
+    Args:
+        source: Source (file path) the chunk came from
+        text: Chunk text
+        occurrence: How many identical chunks preceded this one in the same source
+
+    Returns:
+        Hex ID that stays the same as long as the chunk text is unchanged
+    """
+    key = f"{source}\x00{occurrence}\x00{text}".encode("utf-8")
+    return hashlib.sha256(key).hexdigest()[:32]
+
+
+class SourceDiff:
+    """
+    Compares the chunks of one source, as they are produced, with the chunks stored for it.
+
+    Each chunk gets its content-based ID and its position within the source
+    (metadata "chunk_id" and "chunk_index") and is classified as:
+    - NEW: not stored yet, so it has to be embedded
+    - MOVED: stored with the same text at another position, so only its metadata changes
+    - UNCHANGED: stored as is, nothing to write
+    Stored chunks that are not produced again are stale and have to be deleted.
+    """
+
+    NEW = "new"
+    MOVED = "moved"
+    UNCHANGED = "unchanged"
+
+    def __init__(self, source: str, stored: Dict[str, Optional[int]]):
+        """
+        Initialize the diff.
+
+        Args:
+            source: The source being (re-)indexed
+            stored: chunk_index of every chunk currently stored for the source, by chunk ID
+        """
+        self.source = source
+        self.stored = stored
+        self._produced: Set[str] = set()
+        # Identical chunks in one source are told apart by their occurrence (keyed by text digest)
+        self._occurrences: Dict[bytes, int] = {}
+
+    def add(self, chunk: Document) -> str:
+        """
+        Assign the next chunk of the source its ID and position.
+
+        Returns:
+            NEW, MOVED or UNCHANGED
+        """
+        digest = hashlib.sha256(chunk.page_content.encode("utf-8")).digest()
+        occurrence = self._occurrences.get(digest, 0)
+        self._occurrences[digest] = occurrence + 1
+
+        position = len(self._produced)
+        new_id = chunk_id(self.source, chunk.page_content, occurrence)
+        self._produced.add(new_id)
+        chunk.metadata["chunk_index"] = position
+        chunk.metadata["chunk_id"] = new_id
+
+        if new_id not in self.stored:
+            return self.NEW
+        return self.UNCHANGED if self.stored[new_id] == position else self.MOVED
+
+    def stale_ids(self) -> List[str]:
+        """Stored chunk IDs of the source that were not produced again."""
+        return [stored_id for stored_id in self.stored if stored_id not in self._produced]
+
+
+class IndexManifest:
+    """
+    Content hash of every file indexed into a collection from a directory, and the
+    parameters its chunks were built with.
+
+    Only per-file data is kept (chunk IDs are looked up in Chroma per source), so the
+    manifest stays small however many chunks the collection holds. It is stored as
+    JSON next to the Chroma data: {persist_directory}/manifests/{collection_name}.json
+    """
+
+    VERSION = 1
+
+    def __init__(self, persist_directory: str, collection_name: str):
+        """
+        Initialize the manifest and load it from disk if present.
+
+        Args:
+            persist_directory: Directory for ChromaDB persistence
+            collection_name: Name of the ChromaDB collection
+        """
+        self.path = os.path.join(persist_directory, "manifests", f"{collection_name}.json")
+        self.params: Dict[str, Any] = {}
+        self.files: Dict[str, str] = {}
+        if os.path.exists(self.path):
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") == self.VERSION:
+                self.params = data.get("params", {})
+                self.files = data.get("files", {})
+            else:
+                logger.warning(f"Ignoring manifest with unsupported version: {self.path}")
+
+    def save(self) -> None:
+        """Write the manifest atomically (temp file + rename)."""
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": self.VERSION, "params": self.params, "files": self.files}, f)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def hash_file(path: str, block_size: int = 1 << 20) -> str:
+        """SHA-256 of a file's content, read in blocks."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+        return digest.hexdigest()
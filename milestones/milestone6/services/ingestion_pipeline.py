@@ -0,0 +1,399 @@
+"""
+Bounded-memory streaming ingestion: load -> chunk -> embed -> upsert.
+
+Index a documents directory without starting the API:
+    python -m services.ingestion_pipeline data/ --collection documents
+"""
+
+import argparse
+import os
+import queue
+import threading
+import time
+from dataclasses import dataclass
+from typing import Iterable, Iterator, List, Optional, Set
+from langchain_core.documents import Document
+from config import settings
+from services.document_loader import DocumentLoader
+from services.incremental_index import IndexManifest, SourceDiff
+from services.vector_store import VectorStoreManager
+from utils.text_processor import TextProcessor
+import logging
+
+logger = logging.getLogger(__name__)
+
+# End-of-stream marker passed between stages
+_DONE = object()
+
+
+@dataclass
+class IngestionStats:
+    """Counters for one pipeline run (the file counters are set by index_directory only)."""
+
+    documents: int = 0
+    chunks: int = 0
+    chunks_embedded: int = 0
+    chunks_moved: int = 0
+    chunks_deleted: int = 0
+    batches: int = 0
+    files_indexed: int = 0
+    files_unchanged: int = 0
+    files_removed: int = 0
+    files_failed: int = 0
+    seconds: float = 0.0
+
+    @property
+    def changed(self) -> bool:
+        """Whether the run wrote or deleted anything."""
+        return bool(self.chunks_embedded or self.chunks_moved or self.chunks_deleted)
+
+    @property
+    def chunks_per_second(self) -> float:
+        return self.chunks / self.seconds if self.seconds > 0 else 0.0
+
+
+class _StageFailure:
+    """Exception raised in a stage, forwarded downstream to the writer."""
+
+    def __init__(self, error: BaseException):
+        self.error = error
+
+
+class _MetadataUpdate:
+    """Stored chunks whose position changed: only their metadata is rewritten (not embedded)."""
+
+    def __init__(self, chunks: List[Document]):
+        self.chunks = chunks
+
+
+class _Delete:
+    """Stored chunks a source no longer produces."""
+
+    def __init__(self, ids: List[str]):
+        self.ids = ids
+
+
+class IngestionPipeline:
+    """
+    Streams a corpus into a Chroma collection in fixed-size chunk batches.
+
+    Three stages run concurrently and are connected by bounded queues:
+    chunking (pulls documents from the loader), embedding, and writing (upsert).
+    A full queue blocks the stage feeding it, so at most
+    (2 * queue_size + 3) * batch_size chunks are in memory at once,
+    however large the corpus is.
+
+    Chunks get content-based IDs, and each source is diffed against the chunks
+    stored for it (see SourceDiff): only new chunks are embedded, moved chunks
+    get their metadata rewritten and chunks a source no longer produces are
+    deleted. The documents of a source must arrive together, as DocumentLoader
+    yields them. The BM25 keyword index is not built while streaming (it holds
+    the whole collection): run() drops it when the collection changed, and
+    index_directory() then rebuilds it from Chroma, so no search pays for it.
+    """
+
+    def __init__(
+        self,
+        vector_store: VectorStoreManager,
+        text_processor: Optional[TextProcessor] = None,
+        batch_size: Optional[int] = None,
+        queue_size: Optional[int] = None
+    ):
+        """
+        Initialize the pipeline.
+
+        Args:
+            vector_store: VectorStoreManager providing the embedding model and Chroma client
+            text_processor: Chunker (defaults to settings chunk_size / chunk_overlap)
+            batch_size: Chunks per embed/upsert batch (defaults to settings)
+            queue_size: Batches buffered between stages (defaults to settings)
+        """
+        self.vector_store = vector_store
+        self.text_processor = text_processor or TextProcessor(settings.chunk_size, settings.chunk_overlap)
+        self.batch_size = batch_size or settings.ingestion_batch_size
+        self.queue_size = queue_size or settings.ingestion_queue_size
+
+    def index_directory(
+        self,
+        documents_path: str,
+        collection_name: str = "documents",
+        max_workers: Optional[int] = None
+    ) -> IngestionStats:
+        """
+        Incrementally index every text/PDF file under a directory, parsing files in parallel.
+        
+        A manifest of file content hashes is kept per collection:
+        - unchanged files are skipped without loading or embedding them
+        - new or changed files run through the pipeline (only changed chunks are embedded)
+        - chunks of deleted files are removed
+        Files that fail to parse keep their chunks and are retried on the next run.
+        Changing the chunking parameters re-chunks every file; changing the embedding
+        model rebuilds the collection. When anything changed, the keyword index is
+        rebuilt before returning.
+
+        Args:
+            documents_path: Path to the documents directory
+            collection_name: Target ChromaDB collection
+            max_workers: Loader worker processes (default: one per CPU core)
+
+        Returns:
+            IngestionStats for the run
+        """
+        loader = DocumentLoader(documents_path)
+        manifest = IndexManifest(self.vector_store.persist_directory, collection_name)
+        params = {
+            "chunk_size": self.text_processor.chunk_size,
+            "chunk_overlap": self.text_processor.chunk_overlap,
+            "embedding_model": self.vector_store.embedding_model
+        }
+        if manifest.params != params:
+            if manifest.params.get("embedding_model", params["embedding_model"]) != params["embedding_model"]:
+                # Stored vectors come from another model and cannot be mixed with new ones
+                logger.info(f"Embedding model changed, rebuilding collection '{collection_name}'")
+                self.vector_store.delete_collection(collection_name)
+            manifest.params, manifest.files = params, {}
+
+        files = loader.list_files()
+        hashes = {path: IndexManifest.hash_file(path) for path in files}
+        changed = [path for path in files if manifest.files.get(path) != hashes[path]]
+        removed = [path for path in manifest.files if path not in hashes]
+        indexed: List[str] = []
+        failed: List[str] = []
+
+        def documents() -> Iterator[Document]:
+            for result in loader.iter_file_results(max_workers, files=changed):
+                if result.error:
+                    failed.append(result.path)
+                    continue
+                indexed.append(result.path)
+                # An empty marker still opens the source, so a file that is now empty loses its chunks
+                yield from result.documents or [Document(page_content="", metadata={"source": result.path})]
+            for path in removed:
+                # Deleted files produce no chunks, so all their stored chunks are stale
+                yield Document(page_content="", metadata={"source": path})
+
+        stats = self.run(documents(), collection_name)
+        if stats.changed and settings.keyword_index_enabled:
+            self.vector_store.rebuild_keyword_index(collection_name)
+
+        for path in indexed:
+            manifest.files[path] = hashes[path]
+        for path in removed:
+            del manifest.files[path]
+        manifest.save()
+        stats.files_indexed = len(indexed)
+        stats.files_unchanged = len(files) - len(changed)
+        stats.files_removed = len(removed)
+        stats.files_failed = len(failed)
+        logger.info(
+            f"Indexed '{documents_path}' into '{collection_name}': {len(indexed)} new or changed, "
+            f"{stats.files_unchanged} unchanged, {len(removed)} deleted, {len(failed)} failed files"
+        )
+        return stats
+
+    def run(self, documents: Iterable[Document], collection_name: str = "documents") -> IngestionStats:
+        """
+        Chunk, embed and upsert a stream of documents.
+
+        Args:
+            documents: Documents to index (consumed lazily)
+            collection_name: Target ChromaDB collection
+
+        Returns:
+            IngestionStats for the run
+
+        Raises:
+            Exception: The first error raised by any stage (the other stages are stopped)
+        """
+        stats = IngestionStats()
+        chunk_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        embedded_queue: queue.Queue = queue.Queue(maxsize=self.queue_size)
+        stop = threading.Event()
+        start = time.perf_counter()
+
+        stages = [
+            threading.Thread(
+                target=self._chunk_stage, args=(documents, collection_name, chunk_queue, stop, stats), daemon=True
+            ),
+            threading.Thread(target=self._embed_stage, args=(chunk_queue, embedded_queue, stop), daemon=True)
+        ]
+        for stage in stages:
+            stage.start()
+
+        try:
+            self._write_stage(embedded_queue, collection_name, stats)
+        finally:
+            # Unblock upstream stages if the writer stopped early
+            stop.set()
+            for stage in stages:
+                stage.join()
+            if stats.changed:
+                self.vector_store.drop_keyword_index(collection_name)
+                self.vector_store.invalidate_collection(collection_name)
+
+        stats.seconds = time.perf_counter() - start
+        logger.info(
+            f"Ingested {stats.documents} documents into '{collection_name}': {stats.chunks} chunks, "
+            f"{stats.chunks_embedded} embedded in {stats.batches} batches, {stats.chunks_moved} moved, "
+            f"{stats.chunks_deleted} deleted, {stats.seconds:.2f}s ({stats.chunks_per_second:.1f} chunks/s)"
+        )
+        return stats
+
+    @staticmethod
+    def _put(q: queue.Queue, item, stop: threading.Event) -> bool:
+        """Blocking put that gives up once the pipeline is stopped."""
+        while not stop.is_set():
+            try:
+                q.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    @staticmethod
+    def _get(q: queue.Queue, stop: threading.Event):
+        """Blocking get that gives up (returns _DONE) once the pipeline is stopped."""
+        while not stop.is_set():
+            try:
+                return q.get(timeout=0.1)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _chunk_stage(
+        self,
+        documents: Iterable[Document],
+        collection_name: str,
+        out: queue.Queue,
+        stop: threading.Event,
+        stats: IngestionStats
+    ) -> None:
+        iterator = iter(documents)
+        try:
+            batch: List[Document] = []
+            moved: List[Document] = []
+            diff: Optional[SourceDiff] = None
+            finished: Set[str] = set()
+
+            def flush(item) -> bool:
+                return self._put(out, item, stop)
+
+            for document in iterator:
+                stats.documents += 1
+                source = document.metadata.get("source", "")
+                if diff is None or diff.source != source:
+                    if diff is not None:
+                        finished.add(diff.source)
+                        if not self._finish_source(diff, moved, flush):
+                            return
+                        moved = []
+                    if source in finished:
+                        raise ValueError(f"Documents of source '{source}' are not contiguous")
+                    diff = SourceDiff(source, self.vector_store.stored_chunk_positions(collection_name, source))
+                # Chunk one document at a time; SourceDiff numbers chunk_index per source
+                for chunk in self.text_processor.process_documents([document]):
+                    stats.chunks += 1
+                    status = diff.add(chunk)
+                    if status == SourceDiff.NEW:
+                        batch.append(chunk)
+                        if len(batch) >= self.batch_size:
+                            if not flush(batch):
+                                return
+                            batch = []
+                    elif status == SourceDiff.MOVED:
+                        moved.append(chunk)
+                        if len(moved) >= self.batch_size:
+                            if not flush(_MetadataUpdate(moved)):
+                                return
+                            moved = []
+            if diff is not None and not self._finish_source(diff, moved, flush):
+                return
+            if batch and not flush(batch):
+                return
+            flush(_DONE)
+        except BaseException as e:
+            self._put(out, _StageFailure(e), stop)
+        finally:
+            # Stop the loader (and its process pool) if we bailed out early
+            close = getattr(iterator, "close", None)
+            if close is not None:
+                close()
+
+    @staticmethod
+    def _finish_source(diff: SourceDiff, moved: List[Document], flush) -> bool:
+        """Send a finished source's pending metadata updates and stale-chunk deletions downstream."""
+        if moved and not flush(_MetadataUpdate(moved)):
+            return False
+        stale_ids = diff.stale_ids()
+        return not stale_ids or flush(_Delete(stale_ids))
+
+    def _embed_stage(self, inp: queue.Queue, out: queue.Queue, stop: threading.Event) -> None:
+        while True:
+            item = self._get(inp, stop)
+            if item is _DONE or isinstance(item, _StageFailure):
+                self._put(out, item, stop)
+                return
+            if isinstance(item, (_MetadataUpdate, _Delete)):
+                # Nothing to embed; keep the order with the chunk batches
+                if not self._put(out, item, stop):
+                    return
+                continue
+            try:
+                embeddings = self.vector_store.embeddings.embed_documents([chunk.page_content for chunk in item])
+            except BaseException as e:
+                self._put(out, _StageFailure(e), stop)
+                return
+            if not self._put(out, (item, embeddings), stop):
+                return
+
+    def _write_stage(self, inp: queue.Queue, collection_name: str, stats: IngestionStats) -> None:
+        while True:
+            item = inp.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _StageFailure):
+                raise item.error
+            if isinstance(item, _MetadataUpdate):
+                self.vector_store.update_chunk_metadata(
+                    collection_name,
+                    [chunk.metadata["chunk_id"] for chunk in item.chunks],
+                    [chunk.metadata for chunk in item.chunks]
+                )
+                stats.chunks_moved += len(item.chunks)
+                continue
+            if isinstance(item, _Delete):
+                self.vector_store.delete_chunks(collection_name, item.ids)
+                stats.chunks_deleted += len(item.ids)
+                continue
+            chunks, embeddings = item
+            self.vector_store.upsert_chunks(
+                collection_name,
+                [chunk.metadata["chunk_id"] for chunk in chunks],
+                chunks,
+                embeddings
+            )
+            stats.chunks_embedded += len(chunks)
+            stats.batches += 1
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Incrementally index a documents directory into ChromaDB")
+    parser.add_argument(
+        "documents_path", nargs="?", default=os.path.join(os.path.dirname(__file__), "..", "data"),
+        help="Directory of text/PDF files (default: data/)"
+    )
+    parser.add_argument("--collection", default=settings.default_collection_name, help="ChromaDB collection name")
+    parser.add_argument("--workers", type=int, help="Parser processes (default: one per CPU core)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    stats = IngestionPipeline(VectorStoreManager()).index_directory(args.documents_path, args.collection, args.workers)
+    print(
+        f"{stats.files_indexed} files indexed, {stats.files_unchanged} unchanged, "
+        f"{stats.files_removed} removed, {stats.files_failed} failed; "
+        f"{stats.chunks_embedded} chunks embedded, {stats.chunks_deleted} deleted in {stats.seconds:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+"""BM25 keyword index persisted next to a Chroma collection, plus reciprocal rank fusion."""
+
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from threading import Lock
+from typing import Any, Dict, Hashable, List, Optional, Sequence, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Words and codes such as "MS-365" or "v2.1" (kept whole, and also split into their parts)
+_TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:[-_./][a-z0-9]+)*")
+_SPLIT_PATTERN = re.compile(r"[-_./]")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase word/code tokens; compound codes also yield their parts so "MS 365" matches "MS-365"."""
+    tokens: List[str] = []
+    for token in _TOKEN_PATTERN.findall(text.lower()):
+        tokens.append(token)
+        parts = _SPLIT_PATTERN.split(token)
+        if len(parts) > 1:
+            tokens.extend(part for part in parts if part)
+    return tokens
+
+
+class BM25Index:
+    """
+    In-memory Okapi BM25 index over a collection's chunks, saved as JSON.
+
+    Chunks are stored by ID, so re-indexing the same chunk overwrites it.
+    The inverted index is rebuilt lazily on the first search after a change.
+    """
+
+    VERSION = 1
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        """
+        Initialize an empty index.
+
+        Args:
+            k1: Term-frequency saturation
+            b: Document-length normalization
+        """
+        self.k1 = k1
+        self.b = b
+        self._docs: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._lock = Lock()
+        self._postings: Optional[Dict[str, List[Tuple[int, int]]]] = None
+        self._ids: List[str] = []
+        self._lengths: List[int] = []
+        self._avg_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._docs)
+
+    def add(self, ids: Sequence[str], texts: Sequence[str], metadatas: Sequence[Dict[str, Any]]) -> None:
+        """Add or overwrite chunks."""
+        with self._lock:
+            for chunk_id, text, metadata in zip(ids, texts, metadatas):
+                self._docs[chunk_id] = (text, dict(metadata or {}))
+            self._postings = None
+
+    def remove(self, ids: Sequence[str]) -> None:
+        """Remove chunks by ID (unknown IDs are ignored)."""
+        with self._lock:
+            for chunk_id in ids:
+                self._docs.pop(chunk_id, None)
+            self._postings = None
+
+    def _build(self) -> None:
+        """Rebuild the inverted index (caller holds the lock)."""
+        postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+        self._ids = list(self._docs)
+        self._lengths = []
+        for position, chunk_id in enumerate(self._ids):
+            counts = Counter(tokenize(self._docs[chunk_id][0]))
+            self._lengths.append(sum(counts.values()))
+            for term, tf in counts.items():
+                postings[term].append((position, tf))
+        self._avg_length = sum(self._lengths) / len(self._lengths) if self._lengths else 0.0
+        self._postings = dict(postings)
+
+    def search(self, query: str, k: int = 3) -> List[Dict[str, Any]]:
+        """
+        Rank chunks by BM25 score for a query.
+
+        Args:
+            query: Query text
+            k: Number of results to return
+
+        Returns:
+            Up to k results ({"id", "document", "metadata", "score"}), best first;
+            chunks sharing no term with the query are never returned
+        """
+        with self._lock:
+            if self._postings is None:
+                self._build()
+            total = len(self._ids)
+            if total == 0:
+                return []
+
+            scores: Dict[int, float] = defaultdict(float)
+            for term in set(tokenize(query)):
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for position, tf in postings:
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[position] / self._avg_length)
+                    scores[position] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+            ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:k]
+            results = []
+            for position, score in ranked:
+                chunk_id = self._ids[position]
+                text, metadata = self._docs[chunk_id]
+                results.append({"id": chunk_id, "document": text, "metadata": metadata, "score": score})
+            return results
+
+    def save(self, path: str) -> None:
+        """Write the index atomically (temp file + rename)."""
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with self._lock:
+            data = {"version": self.VERSION, "k1": self.k1, "b": self.b, "docs": self._docs}
+            tmp_path = f"{path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(data, f)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: str) -> Optional["BM25Index"]:
+        """Load an index saved with save(); None if the file is missing or has another version."""
+        if not os.path.exists(path):
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != cls.VERSION:
+            logger.warning(f"Ignoring keyword index with unsupported version: {path}")
+            return None
+        index = cls(k1=data["k1"], b=data["b"])
+        index._docs = {chunk_id: (text, metadata) for chunk_id, (text, metadata) in data["docs"].items()}
+        return index
+
+
+def _fusion_key(result: Dict[str, Any]) -> Hashable:
+    """Identify the same chunk across retrievers (dense results carry no chunk ID)."""
+    return (result["metadata"].get("source"), result["document"])
+
+
+def reciprocal_rank_fusion(
+    result_lists: Sequence[List[Dict[str, Any]]],
+    k: int = 3,
+    rrf_k: int = 60
+) -> List[Dict[str, Any]]:
+    """
+    Merge ranked result lists with reciprocal rank fusion.
+
+    Each chunk scores sum(1 / (rrf_k + rank)) over the lists it appears in.
+
+    Args:
+        result_lists: Ranked results ({"document", "metadata", ...}), best first
+        k: Number of fused results to return
+        rrf_k: Rank-smoothing constant (60 in the original RRF paper)
+
+    Returns:
+        Top-k results with the RRF value in "score" (and the dense "distance", if any), best first
+    """
+    fused: Dict[Hashable, Dict[str, Any]] = {}
+    for results in result_lists:
+        for rank, result in enumerate(results, start=1):
+            key = _fusion_key(result)
+            entry = fused.setdefault(key, {
+                "document": result["document"],
+                "metadata": result["metadata"],
+                "distance": None,
+                "score": 0.0
+            })
+            entry["score"] += 1.0 / (rrf_k + rank)
+            if result.get("distance") is not None:
+                entry["distance"] = result["distance"]
+    return sorted(fused.values(), key=lambda entry: entry["score"], reverse=True)[:k]
@@ -0,0 +1,223 @@
+"""Admission control for LLM generation: a concurrency limit with a bounded, time-limited wait queue."""
+
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Callable, Deque, Iterator, Optional
+from config import settings
+from utils.metrics import REGISTRY
+import logging
+
+logger = logging.getLogger(__name__)
+
+QUEUE_DEPTH = REGISTRY.gauge("llm_queue_depth", "Requests waiting for an LLM generation slot")
+ACTIVE_GENERATIONS = REGISTRY.gauge("llm_active_generations", "LLM generations currently running")
+QUEUE_WAIT_SECONDS = REGISTRY.histogram("llm_queue_wait_seconds", "Time spent waiting for an LLM generation slot")
+REJECTED = REGISTRY.counter(
+    "llm_admission_rejected_total",
+    "Requests refused an LLM generation slot",
+    labelnames=("reason",)
+)
+
+
+class LLMOverloadedError(Exception):
+    """Raised when a request cannot get an LLM slot (queue full or waited too long)."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"LLM overloaded ({reason}), retry after {retry_after}s")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class _Waiter:
+    """A request queued for a slot; wake() is called once a finished generation hands its slot over."""
+
+    def __init__(self, wake: Callable[[], None]):
+        self.wake = wake
+        self.granted = False
+
+
+def _resolve(future: "asyncio.Future[None]") -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class LLMAdmissionController:
+    """
+    Limits concurrent LLM generations in this process.
+
+    Up to max_concurrency generations run at once; up to max_queue more wait
+    (first come, first served) for at most max_wait_seconds. Anything beyond
+    that is rejected immediately with LLMOverloadedError, whose retry_after is
+    estimated from recent generation times.
+
+    The limits hold per process: by default each process gets its share of
+    settings.llm_max_concurrency and settings.llm_max_queue, split across
+    settings.llm_processes. Async callers use slot(), synchronous ones
+    (e.g. the Streamlit app) blocking_slot(); both draw on the same slots.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        max_wait_seconds: Optional[float] = None
+    ):
+        """
+        Initialize the controller.
+
+        Args:
+            max_concurrency: Generations allowed at the same time (defaults to this process's share of settings)
+            max_queue: Requests allowed to wait for a slot (defaults to this process's share of settings)
+            max_wait_seconds: Longest a request waits before being rejected (defaults to settings)
+        """
+        processes = max(1, settings.llm_processes)
+        self.max_concurrency = max_concurrency or max(1, settings.llm_max_concurrency // processes)
+        self.max_queue = settings.llm_max_queue // processes if max_queue is None else max_queue
+        self.max_wait_seconds = settings.llm_max_queue_seconds if max_wait_seconds is None else max_wait_seconds
+        # Guards active and the queue, which event-loop and worker-thread callers share
+        self._lock = threading.Lock()
+        self._queue: Deque[_Waiter] = deque()
+        self.active = 0
+        # Exponentially weighted mean of how long a generation holds its slot
+        self._mean_hold_seconds: Optional[float] = None
+
+    @property
+    def waiting(self) -> int:
+        """Requests currently queued for a slot."""
+        return len(self._queue)
+
+    def retry_after(self) -> int:
+        """Seconds until a slot is likely to be free for a new request."""
+        if self._mean_hold_seconds is None:
+            return 1
+        return max(1, math.ceil(self._mean_hold_seconds * (self.waiting + 1) / self.max_concurrency))
+
+    def _reject(self, reason: str) -> LLMOverloadedError:
+        REJECTED.inc(reason=reason)
+        retry_after = self.retry_after()
+        logger.warning(
+            f"LLM admission rejected ({reason}): active={self.active}, waiting={self.waiting}, "
+            f"retry after {retry_after}s"
+        )
+        return LLMOverloadedError(reason, retry_after)
+
+    def check(self) -> None:
+        """
+        Fail fast if a new request would not even get a place in the queue.
+
+        Only a hint (e.g. before a streamed answer starts): the limit itself is
+        enforced when a request joins the queue.
+
+        Raises:
+            LLMOverloadedError: If all slots are busy and the queue is full
+        """
+        with self._lock:
+            full = self.active >= self.max_concurrency and len(self._queue) >= self.max_queue
+        if full:
+            raise self._reject("queue_full")
+
+    def _join(self, waiter: _Waiter) -> bool:
+        """
+        Take a free slot (True) or queue the waiter behind earlier ones (False).
+
+        Raises:
+            LLMOverloadedError: If all slots are busy and the queue is full
+        """
+        with self._lock:
+            if self.active < self.max_concurrency and not self._queue:
+                self.active += 1
+                ACTIVE_GENERATIONS.set(self.active)
+                return True
+            if len(self._queue) < self.max_queue:
+                self._queue.append(waiter)
+                QUEUE_DEPTH.set(self.waiting)
+                return False
+        raise self._reject("queue_full")
+
+    def _leave(self, waiter: _Waiter) -> None:
+        """Stop waiting (timeout or cancellation), passing on a slot handed over in the meantime."""
+        with self._lock:
+            granted = waiter.granted
+            if not granted:
+                self._queue.remove(waiter)
+                QUEUE_DEPTH.set(self.waiting)
+        if granted:
+            self._release()
+
+    def _release(self) -> None:
+        """Hand the slot to the longest-waiting request, or free it."""
+        with self._lock:
+            if self._queue:
+                waiter = self._queue.popleft()
+                waiter.granted = True
+                QUEUE_DEPTH.set(self.waiting)
+                waiter.wake()
+            else:
+                self.active -= 1
+                ACTIVE_GENERATIONS.set(self.active)
+
+    @contextmanager
+    def _hold(self) -> Iterator[None]:
+        """Release the slot taken by the caller when the block ends, tracking how long it was held."""
+        held_from = time.perf_counter()
+        try:
+            yield
+        finally:
+            held = time.perf_counter() - held_from
+            self._mean_hold_seconds = held if self._mean_hold_seconds is None else 0.8 * self._mean_hold_seconds + 0.2 * held
+            self._release()
+
+    @asynccontextmanager
+    async def slot(self) -> AsyncIterator[None]:
+        """
+        Hold a generation slot for the duration of the block.
+
+        Raises:
+            LLMOverloadedError: If the queue is full or no slot frees up within max_wait_seconds
+        """
+        loop = asyncio.get_running_loop()
+        woken = loop.create_future()
+        waiter = _Waiter(lambda: loop.call_soon_threadsafe(_resolve, woken))
+        start = time.perf_counter()
+        queued = not self._join(waiter)
+        try:
+            if queued:
+                # shield: a timeout must not cancel the future a releasing thread may still resolve
+                await asyncio.wait_for(asyncio.shield(woken), timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            self._leave(waiter)
+            raise self._reject("queue_timeout")
+        except asyncio.CancelledError:
+            self._leave(waiter)
+            raise
+        finally:
+            QUEUE_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+        with self._hold():
+            yield
+
+    @contextmanager
+    def blocking_slot(self) -> Iterator[None]:
+        """
+        Synchronous variant of slot() for callers outside the event loop; blocks the calling thread while queued.
+
+        Raises:
+            LLMOverloadedError: If the queue is full or no slot frees up within max_wait_seconds
+        """
+        woken = threading.Event()
+        waiter = _Waiter(woken.set)
+        start = time.perf_counter()
+        queued = not self._join(waiter)
+        try:
+            if queued and not woken.wait(timeout=self.max_wait_seconds):
+                self._leave(waiter)
+                raise self._reject("queue_timeout")
+        finally:
+            QUEUE_WAIT_SECONDS.observe(time.perf_counter() - start)
+
+        with self._hold():
+            yield
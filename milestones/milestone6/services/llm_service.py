@@ -1,51 +1,176 @@
 """LLM integration using Ollama."""
 
-from langchain_community.llms import Ollama
+import httpx
+from ollama import AsyncClient, Client
 from config import settings
+from threading import Lock
+from typing import Any, AsyncIterator, Dict, List, Optional
+from utils.metrics import REGISTRY
 import logging
 
 logger = logging.getLogger(__name__)
 
+GENERATED_TOKENS = REGISTRY.counter("llm_generated_tokens_total", "Tokens generated by the LLM (Ollama eval_count)")
+PROMPT_EVAL_TOKENS = REGISTRY.counter(
+    "llm_prompt_eval_tokens_total",
+    "Prompt tokens evaluated by the LLM, excluding a reused KV prefix (Ollama prompt_eval_count)"
+)
+
 
 class LLMModel:
-    """Wrapper for Ollama LLM."""
-    
-    def __init__(self):
+    """
+    Wrapper for Ollama's chat API.
+
+    Requests go over pooled keep-alive HTTP connections, and the model is kept
+    loaded between requests (settings.llm_keep_alive). The system prompt is
+    sent as its own leading message, so the start of every request is
+    identical and Ollama can reuse its cached KV prefix instead of
+    re-processing the instructions.
+    """
+
+    def __init__(self, base_url: Optional[str] = None):
         """
         Initialize the LLM model.
+
+        Args:
+            base_url: Ollama server URL (defaults to settings.llm_base_url)
         """
         self.model_name = settings.llm_model_name
-        self.base_url = settings.llm_base_url
+        self.base_url = base_url or settings.llm_base_url
         self.temperature = settings.llm_temperature
+        self.keep_alive = settings.llm_keep_alive
 
         try:
-            self.llm = Ollama(
-                model=self.model_name,
-                base_url=self.base_url,
-                temperature=self.temperature
+            limits = httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_connections,
+                keepalive_expiry=settings.llm_keepalive_expiry_seconds
             )
-            logger.info(f"LLM initialized: {self.model_name} at {self.base_url}")
+            # The connection pools live in transports owned here, so aclose() can release them
+            self._transport = httpx.HTTPTransport(limits=limits)
+            self._async_transport = httpx.AsyncHTTPTransport(limits=limits)
+            # Sync client for the sync chat path and summaries, async client for the async chat path
+            self.client = Client(host=self.base_url, transport=self._transport)
+            self.async_client = AsyncClient(host=self.base_url, transport=self._async_transport)
+            logger.info(f"LLM initialized: {self.model_name} at {self.base_url} (keep_alive={self.keep_alive})")
         except Exception as e:
             logger.error(f"Failed to initialize LLM: {str(e)}")
             raise
-    
-    def generate(self, prompt: str) -> str:
+
+        self._stats_lock = Lock()
+        self._stats: Dict[str, float] = {
+            "requests": 0,
+            "prompt_eval_tokens": 0,
+            "prompt_eval_ms": 0.0,
+            "load_ms": 0.0,
+            "generated_tokens": 0
+        }
+
+    @staticmethod
+    def _messages(prompt: str, system: Optional[str]) -> List[Dict[str, str]]:
+        """Chat messages: the (stable) system prompt first, then the volatile user prompt."""
+        messages = [{"role": "system", "content": system}] if system else []
+        messages.append({"role": "user", "content": prompt})
+        return messages
+
+    def _chat_kwargs(self, prompt: str, system: Optional[str]) -> Dict[str, Any]:
+        return {
+            "model": self.model_name,
+            "messages": self._messages(prompt, system),
+            "options": {"temperature": self.temperature},
+            "keep_alive": self.keep_alive
+        }
+
+    def _record(self, result: Any) -> None:
+        """Track prefill work and generated tokens reported by Ollama (tokens evaluated exclude a reused KV prefix)."""
+        prompt_eval_tokens = result.prompt_eval_count or 0
+        generated_tokens = result.eval_count or 0
+        prompt_eval_ms = (result.prompt_eval_duration or 0) / 1e6
+        load_ms = (result.load_duration or 0) / 1e6
+        with self._stats_lock:
+            self._stats["requests"] += 1
+            self._stats["prompt_eval_tokens"] += prompt_eval_tokens
+            self._stats["prompt_eval_ms"] += prompt_eval_ms
+            self._stats["load_ms"] += load_ms
+            self._stats["generated_tokens"] += generated_tokens
+        PROMPT_EVAL_TOKENS.inc(prompt_eval_tokens)
+        GENERATED_TOKENS.inc(generated_tokens)
+        logger.info(f"Prefill: {prompt_eval_tokens} tokens in {prompt_eval_ms:.0f} ms (model load {load_ms:.0f} ms)")
+
+    def prefill_stats(self) -> Dict[str, float]:
+        """Totals and per-request means of prompt evaluation (prefill) and model load time."""
+        with self._stats_lock:
+            stats = dict(self._stats)
+        requests = stats["requests"] or 1
+        stats["mean_prompt_eval_tokens"] = stats["prompt_eval_tokens"] / requests
+        stats["mean_prompt_eval_ms"] = stats["prompt_eval_ms"] / requests
+        stats["mean_load_ms"] = stats["load_ms"] / requests
+        return stats
+
+    def generate(self, prompt: str, system: Optional[str] = None) -> str:
         """
         Generate text based on the prompt.
-        
+
         Args:
             prompt: Input prompt for the LLM
-            
+            system: Optional system prompt, sent as a separate leading message
+
         Returns:
             Generated text response
         """
         try:
             logger.info(f"Generating response for prompt (length: {len(prompt)} chars)")
-            response = self.llm.invoke(prompt)
+            result = self.client.chat(**self._chat_kwargs(prompt, system))
+            self._record(result)
+            response = result.message.content
+            logger.info(f"Response generated (length: {len(response)} chars)")
+            return response
+        except Exception as e:
+            logger.error(f"Generation failed: {str(e)}")
+            raise
+
+    async def agenerate(self, prompt: str, system: Optional[str] = None) -> str:
+        """
+        Generate text without blocking the event loop.
+
+        Args:
+            prompt: Input prompt for the LLM
+            system: Optional system prompt, sent as a separate leading message
+
+        Returns:
+            Generated text response
+        """
+        try:
+            logger.info(f"Generating response (async) for prompt (length: {len(prompt)} chars)")
+            result = await self.async_client.chat(**self._chat_kwargs(prompt, system))
+            self._record(result)
+            response = result.message.content
             logger.info(f"Response generated (length: {len(response)} chars)")
             return response
         except Exception as e:
             logger.error(f"Generation failed: {str(e)}")
             raise
 
+    async def astream(self, prompt: str, system: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Stream generated tokens as Ollama produces them.
+
+        Args:
+            prompt: Input prompt for the LLM
+            system: Optional system prompt, sent as a separate leading message
+
+        Yields:
+            Text fragments in generation order
+        """
+        logger.info(f"Streaming response for prompt (length: {len(prompt)} chars)")
+        stream = await self.async_client.chat(**self._chat_kwargs(prompt, system), stream=True)
+        async for part in stream:
+            if part.message.content:
+                yield part.message.content
+            if part.done:
+                self._record(part)
 
+    async def aclose(self) -> None:
+        """Close both connection pools."""
+        self._transport.close()
+        await self._async_transport.aclose()
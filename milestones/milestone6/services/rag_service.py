@@ -1,20 +1,80 @@
 """Service layer for RAG workflow with Chat History integration."""
 
-from typing import List
+from contextlib import nullcontext
+from dataclasses import dataclass, field, replace
+from datetime import datetime
+from typing import List, Optional, Tuple, Dict, Any, AsyncIterator
 from sqlalchemy.orm import Session
 from fastapi import HTTPException
+from fastapi.concurrency import run_in_threadpool
 from config import settings
 from repositories.session_repository import SessionRepository
 from repositories.message_repository import MessageRepository
 from repositories.summary_repository import SummaryRepository
-from services.vector_store import VectorStoreManager
+from models.base import generate_uuid
+from models.message import MessageModel
+from services.vector_store import CACHE_LOOKUPS, VectorStoreManager
 from services.llm_service import LLMModel
+from services.answer_cache import answer_cache
+from services.reranker import CrossEncoderReranker
+from services.llm_admission import LLMAdmissionController, LLMOverloadedError
+from services.single_flight import single_flight
+from utils.cache import normalize_query
+from utils.metrics import REGISTRY, StageTimer
 from utils.prompt_builder import build_summary_prompt, build_rag_prompt
 from schemas.chat_schema import ChatRequest, ChatResponse, SourceDocument, ValidationMetrics
+import anyio
 import logging
+import time
 
 logger = logging.getLogger(__name__)
 
+STAGE_SECONDS = REGISTRY.histogram(
+    "chat_stage_duration_seconds",
+    "Time spent in each stage of the chat flow "
+    "(session, history, search, prompt, llm, persist, validation, coalesced)",
+    labelnames=("stage",)
+)
+STAGE_FAILURES = REGISTRY.counter(
+    "chat_stage_failures_total",
+    "Chat flow stages that raised an error",
+    labelnames=("stage",)
+)
+PROMPT_CHARS = REGISTRY.histogram(
+    "chat_prompt_chars",
+    "Prompt size (system + user message) in characters",
+    buckets=(500, 1000, 2000, 4000, 8000, 16000, 32000)
+)
+PROMPT_TOKENS = REGISTRY.histogram(
+    "chat_prompt_tokens",
+    "Prompt size in tokens, counted with the LLM's tokenizer",
+    buckets=(128, 256, 512, 1024, 2048, 3072, 4096, 8192)
+)
+
+
+@dataclass
+class PreparedChat:
+    """Everything gathered before the LLM call (steps 1-3 plus the prompt)."""
+
+    session_id: str
+    recent_messages: List[MessageModel]
+    history_text: str
+    query_embedding: List[float]
+    collection_version: int
+    context_docs: List[Dict[str, Any]] = field(default_factory=list)
+    # Stable system prompt (sent first so Ollama can reuse its KV prefix) and the per-request prompt
+    system_prompt: str = ""
+    prompt: str = ""
+    prompt_tokens: int = 0
+    # Set when the answer is served from the semantic answer cache
+    cached_answer: Optional[str] = None
+    cache_similarity: Optional[float] = None
+    # Whether the cross-encoder reordered the context
+    reranked: bool = False
+    # Whether steps 3-4 were shared with an identical in-flight request
+    coalesced: bool = False
+
+
 class RAGService:
     """
     Service layer for complete RAG workflow with Chat History.
@@ -28,19 +88,42 @@ class RAGService:
     - Response validation 
     """
     
-    def __init__(self, db: Session) -> None:
+    def __init__(
+        self,
+        db: Session,
+        vector_store: Optional[VectorStoreManager] = None,
+        llm_model: Optional[LLMModel] = None,
+        reranker: Optional[CrossEncoderReranker] = None,
+        llm_admission: Optional[LLMAdmissionController] = None,
+        read_db: Optional[Session] = None
+    ) -> None:
         """
         Initialize RAG service with database connection and required dependencies.
         
         Args:
             db: SQLAlchemy database session
+            vector_store: Shared VectorStoreManager (built here if not provided)
+            llm_model: Shared LLMModel (built here if not provided)
+            reranker: Shared CrossEncoderReranker (built here if not provided; loads its model lazily)
+            llm_admission: Process-wide LLM concurrency limiter (generation is not limited if not provided)
+            read_db: Session on the read replica for history reads (db if not provided)
         """
         self.db: Session = db
         self.session_repo: SessionRepository = SessionRepository(db)
-        self.message_repo: MessageRepository = MessageRepository(db)
+        self.message_repo: MessageRepository = MessageRepository(db, read_db)
         self.summary_repo: SummaryRepository = SummaryRepository(db)
-        self.vector_store: VectorStoreManager = VectorStoreManager()
-        self.llm_model: LLMModel = LLMModel()
+        # Loading the embedding model and LLM client is expensive, so the API
+        # injects process-wide instances; standalone scripts fall back to new ones.
+        self.vector_store: VectorStoreManager = vector_store if vector_store is not None else VectorStoreManager()
+        self.llm_model: LLMModel = llm_model if llm_model is not None else LLMModel()
+        self.reranker: CrossEncoderReranker = reranker if reranker is not None else CrossEncoderReranker()
+        self.llm_admission: Optional[LLMAdmissionController] = llm_admission
+        # Stage timings of the current request (reset by each chat entry point)
+        self.timer: StageTimer = StageTimer(STAGE_SECONDS, STAGE_FAILURES)
+        # Set by _resolve_session: when the question arrived and, if the turn starts a
+        # new session, its ID (the session row is written by _save_turn with the messages)
+        self.asked_at: Optional[datetime] = None
+        self.new_session_id: Optional[str] = None
 
     def summarize_session(self, session_id: str) -> str:
         """
@@ -111,8 +194,9 @@ class RAGService:
         Process:
         1. Manage Session (Create if new, verify if existing)
         2. Retrieve History (Last N messages for context)
-        3. Retrieve Context (Vector search for relevant documents)
-        4. Generate Answer (LLM with context + history)
+        3. Retrieve Context (Answer cache lookup, then dense, keyword or hybrid search for relevant
+           documents, optionally reranked by a cross-encoder)
+        4. Generate Answer (LLM with context + history, skipped on an answer-cache hit)
         5. Save to History (Store user query and assistant response)
         6. Validate Response (Generate quality metrics)
         7. Return Response (With sources and validation data)
@@ -124,126 +208,585 @@ class RAGService:
             ChatResponse with answer, sources, and validation metrics
             
         Raises:
-            HTTPException: For various failure scenarios (session, search, LLM)
+            HTTPException: For various failure scenarios (session, search, LLM; 429 if no LLM slot is available)
         """
         try:
-            session_id = request.session_id
+            # 1-3. Session, History, Context
+            chat = self.prepare_chat(request)
 
-            # 1. Session Management
-            # Create new session if not provided
-            try:
-                if not session_id:
-                    # No session provided - create new one
-                    session_id = self.session_repo.create_session()
-                    logger.info(f"Created new session: {session_id}")
-                else:
-                    # Session provided - verify it exists, create if not
-                    if not self.session_repo.get_session(session_id):
-                        session_id = self.session_repo.create_session()
-                        logger.warning(f"Session {request.session_id} not found, created new: {session_id}")
-            except Exception as e:
-                logger.error(f"Session management failed: {e}")
-                raise HTTPException(status_code=500, detail="Failed to manage chat session")
+            # 4. Generate Answer (LLM) 
+            if chat.cached_answer is not None:
+                answer = chat.cached_answer
+            else:
+                try:
+                    with self.timer.stage("llm"), self._blocking_llm_slot():
+                        answer = self.llm_model.generate(chat.prompt, system=chat.system_prompt)
+                except LLMOverloadedError as e:
+                    raise self._overloaded(e)
+                except Exception as e:
+                    logger.error(f"LLM generation failed: {e}")
+                    raise HTTPException(status_code=503, detail="AI service is currently unavailable")
+                self._store_cached_answer(request, chat, answer)
 
-            # 2. Retrieve Chat History 
-            try:
-                recent_messages = self.message_repo.get_recent_messages(
-                    session_id, 
-                    limit=settings.chat_history_limit
+            # 5. Save to History
+            with self.timer.stage("persist"):
+                saved = self._save_turn(chat.session_id, request.query, answer)
+            self._ensure_session_saved(chat.session_id, saved)
+
+            # 6-7. Validate and Return Response
+            with self.timer.stage("validation"):
+                return self._build_response(request, chat, answer)
+        
+        except HTTPException:
+            raise
+        except Exception as e:
+            # Catch any unexpected errors
+            logger.error(f"Unexpected error in process_chat: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+    def prepare_chat(self, request: ChatRequest) -> PreparedChat:
+        """
+        Steps 1-3 of the chat flow plus prompt building.
+        
+        Args:
+            request: ChatRequest containing query, session_id, collection_name, top_k
+            
+        Returns:
+            PreparedChat ready to be sent to the LLM (or already answered from cache)
+            
+        Raises:
+            HTTPException: If session management or vector search fails
+        """
+        self.timer = StageTimer(STAGE_SECONDS, STAGE_FAILURES)
+
+        # 1. Session Management
+        with self.timer.stage("session"):
+            session_id = self._resolve_session(request)
+
+        # 2. Retrieve Chat History 
+        with self.timer.stage("history"):
+            recent_messages, history_text = self._load_history(session_id)
+
+        # 3. Retrieve Context (Answer Cache, then Vector Search) 
+        try:
+            with self.timer.stage("search"):
+                chat = PreparedChat(
+                    session_id=session_id,
+                    recent_messages=recent_messages,
+                    history_text=history_text,
+                    query_embedding=self.vector_store.embed_query(request.query),
+                    collection_version=self.vector_store.collection_version(request.collection_name)
                 )
-                # (oldest to newest)
-                recent_messages = recent_messages[::-1]                
-                history_text = "\n".join([
-                    f"{('User' if msg.role == 'user' else 'Assistant')}: {msg.content}"
-                    for msg in recent_messages
-                ])
-            except Exception as e:
-                logger.error(f"Failed to retrieve chat history: {e}")
-                history_text = ""
-
-            # 3. Retrieve Context (Vector Search) 
-            try:
-                search_results = self.vector_store.search(
-                    request.query, 
-                    request.collection_name, 
-                    request.top_k
+                if not self._apply_cached_answer(request, chat):
+                    search_results = self._retrieve(request, chat.query_embedding)
+                    if self._should_rerank(request):
+                        search_results, chat.reranked = self.reranker.rerank(
+                            request.query, search_results, request.top_k
+                        )
+                    chat.context_docs = self._to_context_docs(search_results)
+        except Exception as e:
+            logger.error(f"Vector search failed: {e}")
+            raise HTTPException(status_code=500, detail="Failed to search knowledge base")
+
+        # Build prompt with system instructions, history, context, and query (within the token budget)
+        with self.timer.stage("prompt"):
+            self._build_prompt(request, chat)
+        return chat
+
+    async def aprepare_chat(self, request: ChatRequest) -> PreparedChat:
+        """
+        Async variant of prepare_chat.
+        
+        Database work runs in the default threadpool, embedding and Chroma search
+        run on their dedicated pools, so the event loop is never blocked.
+        
+        Args:
+            request: ChatRequest containing query, session_id, collection_name, top_k
+            
+        Returns:
+            PreparedChat ready to be sent to the LLM (or already answered from cache)
+            
+        Raises:
+            HTTPException: If session management or vector search fails
+        """
+        self.timer = StageTimer(STAGE_SECONDS, STAGE_FAILURES)
+
+        # 1. Session Management
+        with self.timer.stage("session"):
+            session_id = await run_in_threadpool(self._resolve_session, request)
+
+        # 2. Retrieve Chat History 
+        with self.timer.stage("history"):
+            recent_messages, history_text = await run_in_threadpool(self._load_history, session_id)
+
+        # 3. Context and prompt
+        return await self._aprepare_context(request, session_id, recent_messages, history_text)
+
+    async def _aprepare_context(
+        self,
+        request: ChatRequest,
+        session_id: str,
+        recent_messages: List[MessageModel],
+        history_text: str
+    ) -> PreparedChat:
+        """
+        Step 3 of aprepare_chat (answer cache, retrieval, reranking) plus prompt building.
+        
+        Raises:
+            HTTPException: If vector search fails
+        """
+        # 3. Retrieve Context (Answer Cache, then Vector Search) 
+        try:
+            with self.timer.stage("search"):
+                chat = PreparedChat(
+                    session_id=session_id,
+                    recent_messages=recent_messages,
+                    history_text=history_text,
+                    query_embedding=await self.vector_store.aembed_query(request.query),
+                    collection_version=await self.vector_store.acollection_version(request.collection_name)
                 )
-                
-                # Format results for internal use
-                context_docs = [
-                    {
-                        "content": res['document'], 
-                        "metadata": res['metadata'], 
-                        "score": res['distance']
-                    } 
-                    for res in search_results
-                ]
-            except Exception as e:
-                logger.error(f"Vector search failed: {e}")
-                raise HTTPException(status_code=500, detail="Failed to search knowledge base")
+                if not self._apply_cached_answer(request, chat):
+                    search_results = await self._aretrieve(request, chat.query_embedding)
+                    if self._should_rerank(request):
+                        search_results, chat.reranked = await self.reranker.arerank(
+                            request.query, search_results, request.top_k
+                        )
+                    chat.context_docs = self._to_context_docs(search_results)
+        except Exception as e:
+            logger.error(f"Vector search failed: {e}")
+            raise HTTPException(status_code=500, detail="Failed to search knowledge base")
 
-            # 4. Generate Answer (LLM) 
-            # Build prompt with system instructions, history, context, and query
-            try:
-                prompt = build_rag_prompt(request.query, context_docs, history_text)
-                answer = self.llm_model.generate(prompt)
-            except Exception as e:
-                logger.error(f"LLM generation failed: {e}")
-                raise HTTPException(status_code=503, detail="AI service is currently unavailable")
+        # Build prompt with system instructions, history, context, and query (within the token budget)
+        with self.timer.stage("prompt"):
+            await run_in_threadpool(self._build_prompt, request, chat)
+        return chat
+
+    async def aprocess_chat(self, request: ChatRequest) -> ChatResponse:
+        """
+        Async variant of process_chat for the FastAPI endpoint.
+        
+        Same steps as process_chat, but nothing blocks the event loop
+        and the LLM is called through the async Ollama client. Generation
+        waits for a slot from the LLM admission controller; if none is
+        available, a 429 with Retry-After is raised.
+        
+        Turns without history are coalesced: while an identical question
+        (same normalized query, collection, top_k, retrieval mode and reranking)
+        is in flight, steps 3-4 are shared with it instead of repeated. Session
+        and history bookkeeping (steps 1, 2 and 5) stay per request.
+        
+        Args:
+            request: ChatRequest containing query, session_id, collection_name, top_k
+            
+        Returns:
+            ChatResponse with answer, sources, and validation metrics
+            
+        Raises:
+            HTTPException: For various failure scenarios (session, search, LLM)
+        """
+        self.timer = StageTimer(STAGE_SECONDS, STAGE_FAILURES)
+        try:
+            # 1. Session Management
+            with self.timer.stage("session"):
+                session_id = await run_in_threadpool(self._resolve_session, request)
+
+            # 2. Retrieve Chat History 
+            with self.timer.stage("history"):
+                recent_messages, history_text = await run_in_threadpool(self._load_history, session_id)
+
+            # 3-4. Context and Answer (shared with identical in-flight first questions)
+            if recent_messages or not settings.coalesce_requests:
+                chat = await self._aprepare_context(request, session_id, recent_messages, history_text)
+                answer = await self._agenerate_answer(request, chat)
+            else:
+                chat, answer = await self._acoalesced_answer(request, session_id)
 
             # 5. Save to History
+            with self.timer.stage("persist"):
+                saved = await run_in_threadpool(self._save_turn, chat.session_id, request.query, answer)
+            self._ensure_session_saved(chat.session_id, saved)
+
+            # 6-7. Validate and Return Response
+            with self.timer.stage("validation"):
+                return self._build_response(request, chat, answer)
+
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error in aprocess_chat: {e}", exc_info=True)
+            raise HTTPException(status_code=500, detail="An unexpected error occurred")
+
+    async def _agenerate_answer(self, request: ChatRequest, chat: PreparedChat) -> str:
+        """
+        Step 4: The cached answer, or a new one from the LLM (cached for history-free turns).
+        
+        Raises:
+            HTTPException: 429 if no LLM slot is available, 503 if generation fails
+        """
+        if chat.cached_answer is not None:
+            return chat.cached_answer
+        try:
+            with self.timer.stage("llm"):
+                async with self._llm_slot():
+                    answer = await self.llm_model.agenerate(chat.prompt, system=chat.system_prompt)
+        except LLMOverloadedError as e:
+            raise self._overloaded(e)
+        except Exception as e:
+            logger.error(f"LLM generation failed: {e}")
+            raise HTTPException(status_code=503, detail="AI service is currently unavailable")
+        self._store_cached_answer(request, chat, answer)
+        return answer
+
+    async def _acoalesced_answer(self, request: ChatRequest, session_id: str) -> Tuple[PreparedChat, str]:
+        """
+        Steps 3-4 for a history-free turn, run once for all identical concurrent requests.
+        
+        Returns:
+            This request's PreparedChat (shared context, own session) and the answer
+        """
+        async def prepare_and_generate() -> Tuple[PreparedChat, str]:
+            shared_chat = await self._aprepare_context(request, session_id, [], "")
+            return shared_chat, await self._agenerate_answer(request, shared_chat)
+
+        key = (normalize_query(request.query),) + self._answer_cache_scope(request)
+        started = time.perf_counter()
+        (shared_chat, answer), coalesced = await single_flight.run(key, prepare_and_generate)
+        if coalesced:
+            # The search, prompt and llm stages were timed by the request that ran them
+            self.timer.record("coalesced", time.perf_counter() - started)
+        return replace(shared_chat, session_id=session_id, coalesced=coalesced), answer
+
+    async def astream_chat(self, request: ChatRequest, chat: PreparedChat) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream the answer for a prepared chat as events.
+        
+        Events (in order):
+        - {"event": "token", "data": {"content": ...}} for each generated fragment
+        - {"event": "done", "data": ChatResponse fields + time_to_first_token_ms}
+        - {"event": "error", "data": {"detail": ...}} instead of "done" if the LLM fails
+          (with "retry_after" if no LLM slot became free in time), or if the turn starts
+          a new session that cannot be saved
+        
+        The turn is persisted before "done" is sent, or once the stream fails or is cut
+        off by the client, with whatever part of the answer was generated.
+        
+        Args:
+            request: The original ChatRequest
+            chat: Result of aprepare_chat for this request
+            
+        Yields:
+            Event dictionaries with "event" and "data" keys
+        """
+        started = time.perf_counter()
+        ttft_ms: Optional[float] = None
+        fragments: List[str] = []
+        persisted = False
+        try:
+            # 4. Generate Answer (LLM), token by token
+            if chat.cached_answer is not None:
+                ttft_ms = (time.perf_counter() - started) * 1000
+                fragments.append(chat.cached_answer)
+                yield {"event": "token", "data": {"content": chat.cached_answer}}
+            else:
+                try:
+                    with self.timer.stage("llm"):
+                        async with self._llm_slot():
+                            async for fragment in self.llm_model.astream(chat.prompt, system=chat.system_prompt):
+                                if ttft_ms is None:
+                                    ttft_ms = (time.perf_counter() - started) * 1000
+                                    logger.info(f"Time to first token: {ttft_ms:.0f} ms (session {chat.session_id})")
+                                fragments.append(fragment)
+                                yield {"event": "token", "data": {"content": fragment}}
+                except LLMOverloadedError as e:
+                    yield {"event": "error", "data": {"detail": "AI service is busy", "retry_after": e.retry_after}}
+                    return
+                except Exception as e:
+                    logger.error(f"LLM streaming failed: {e}")
+                    yield {"event": "error", "data": {"detail": "AI service is currently unavailable"}}
+                    return
+                self._store_cached_answer(request, chat, "".join(fragments))
+
+            # 5. Save to History (before "done" hands the session ID to the client)
+            persisted = True
+            with self.timer.stage("persist"):
+                saved = await run_in_threadpool(self._save_turn, chat.session_id, request.query, "".join(fragments))
             try:
-                user_msg_id = self.message_repo.add_message(session_id, "user", request.query)
-                ai_msg_id = self.message_repo.add_message(session_id, "assistant", answer)
-                logger.info(f"Saved messages to session {session_id}")
-            except Exception as e:
-                logger.error(f"Failed to save chat history: {e}")
-
-            # 6. Validate Response     
-            # Extract last 3 messages 
-            history_preview: List[str] = []
-            if recent_messages:
-                for msg in recent_messages[-3:]:
-                    role: str = "User" if msg.role == "user" else "Assistant"
-                    content: str = msg.content[:100] + "..." if len(msg.content) > 100 else msg.content
-                    history_preview.append(f"{role}: {content}")
-
-            # Extract first 1000 chars of prompt for debugging
-            prompt_preview: str = prompt[:1000] + "..." if len(prompt) > 1000 else prompt
-
-            # Create validation metrics object
-            validation_result: ValidationMetrics = ValidationMetrics(
-                used_context=len(context_docs) > 0,  
-                used_history=len(history_text) > 0,  
-                context_sources=len(context_docs),   
-                history_preview=history_preview,     
-                prompt_preview=prompt_preview        
-            )
-            logger.info(f"Response validation: {validation_result.model_dump()}")
-            
-            # 7. Return Response 
-            # Format sources for response schema
-            response_sources: List[SourceDocument] = [
-                SourceDocument(
-                    content=doc['content'], 
-                    metadata=doc['metadata'], 
-                    score=doc.get('score')
-                )
-                for doc in context_docs
-            ]
+                self._ensure_session_saved(chat.session_id, saved)
+            except HTTPException as e:
+                yield {"event": "error", "data": {"detail": e.detail}}
+                return
 
-            return ChatResponse(
-                status="success",
-                session_id=session_id,
-                query=request.query,
-                answer=answer,
-                sources=response_sources,
-                validation=validation_result
+            # 6-7. Validate and Return final metadata
+            with self.timer.stage("validation"):
+                response = self._build_response(request, chat, "".join(fragments))
+            data = response.model_dump(mode="json")
+            data["time_to_first_token_ms"] = ttft_ms
+            yield {"event": "done", "data": data}
+        finally:
+            # 5. Save to History if the stream failed or the client disconnected (shielded from cancellation)
+            if fragments and not persisted:
+                with anyio.CancelScope(shield=True), self.timer.stage("persist"):
+                    await run_in_threadpool(self._save_turn, chat.session_id, request.query, "".join(fragments))
+            total_ms = (time.perf_counter() - started) * 1000
+            logger.info(f"Stream finished in {total_ms:.0f} ms ({len(fragments)} fragments)")
+
+    def check_llm_capacity(self, chat: PreparedChat) -> None:
+        """
+        Fail fast before a streamed answer starts if the LLM queue is already full.
+        
+        Raises:
+            HTTPException: 429 with Retry-After
+        """
+        if chat.cached_answer is None and self.llm_admission is not None:
+            try:
+                self.llm_admission.check()
+            except LLMOverloadedError as e:
+                raise self._overloaded(e)
+
+    def _llm_slot(self):
+        """Generation slot from the admission controller (no-op without one)."""
+        return self.llm_admission.slot() if self.llm_admission is not None else nullcontext()
+
+    def _blocking_llm_slot(self):
+        """Generation slot for the synchronous path (no-op without an admission controller)."""
+        return self.llm_admission.blocking_slot() if self.llm_admission is not None else nullcontext()
+
+    @staticmethod
+    def _overloaded(error: LLMOverloadedError) -> HTTPException:
+        """429 response for a request refused an LLM slot."""
+        return HTTPException(
+            status_code=429,
+            detail="AI service is busy, please retry later",
+            headers={"Retry-After": str(error.retry_after)}
+        )
+
+    def _resolve_session(self, request: ChatRequest) -> str:
+        """
+        Step 1: Return the request's session ID, or a new one if it is missing or unknown.
+        
+        A new session ID is generated client-side; the session row is inserted by
+        _save_turn in the same transaction as the turn's messages.
+        
+        Raises:
+            HTTPException: If the session cannot be verified
+        """
+        self.asked_at = datetime.utcnow()
+        self.new_session_id = None
+        session_id = request.session_id
+        try:
+            if session_id and self.session_repo.get_session(session_id):
+                return session_id
+            self.new_session_id = generate_uuid()
+            if session_id:
+                logger.warning(f"Session {session_id} not found, starting new: {self.new_session_id}")
+            else:
+                logger.info(f"Starting new session: {self.new_session_id}")
+            return self.new_session_id
+        except Exception as e:
+            logger.error(f"Session management failed: {e}")
+            raise HTTPException(status_code=500, detail="Failed to manage chat session")
+
+    def _load_history(self, session_id: str) -> Tuple[List[MessageModel], str]:
+        """
+        Step 2: Load the last N messages (oldest to newest) and format them for the prompt.
+        History is optional, so failures are logged and an empty history is returned.
+        """
+        if session_id == self.new_session_id:
+            # Nothing has been written for a session started by this turn
+            return [], ""
+        try:
+            recent_messages = self.message_repo.get_recent_messages(
+                session_id, 
+                limit=settings.chat_history_limit
             )
+            # (oldest to newest)
+            recent_messages = recent_messages[::-1]                
+            history_text = "\n".join([
+                f"{('User' if msg.role == 'user' else 'Assistant')}: {msg.content}"
+                for msg in recent_messages
+            ])
+            return recent_messages, history_text
+        except Exception as e:
+            logger.error(f"Failed to retrieve chat history: {e}")
+            return [], ""
+
+    @staticmethod
+    def _answer_cache_scope(request: ChatRequest) -> Tuple[str, int, str, bool]:
+        """Answers are only reused for the same collection, top_k, retrieval mode and reranking."""
+        return (request.collection_name, request.top_k, request.retrieval_mode, RAGService._should_rerank(request))
+
+    def _apply_cached_answer(self, request: ChatRequest, chat: PreparedChat) -> bool:
+        """
+        Step 3a: Look up a cached answer for a near-duplicate question.
+        Only history-free turns are cached, since follow-ups depend on the conversation.
         
-        except HTTPException:
-            raise
+        Returns:
+            True if the chat was filled from the cache (answer and sources)
+        """
+        if answer_cache is None or chat.history_text:
+            return False
+        hit = answer_cache.lookup(
+            self._answer_cache_scope(request), chat.collection_version, chat.query_embedding
+        )
+        CACHE_LOOKUPS.inc(cache="answer", result="miss" if hit is None else "hit")
+        if hit is None:
+            return False
+        cached, similarity = hit
+        chat.context_docs = cached.context_docs
+        chat.cached_answer = cached.answer
+        chat.cache_similarity = similarity
+        logger.info(f"Answer cache hit (similarity {similarity:.3f}) for collection '{request.collection_name}'")
+        return True
+
+    def _store_cached_answer(self, request: ChatRequest, chat: PreparedChat, answer: str) -> None:
+        """Step 4a: Cache a freshly generated answer for a history-free turn."""
+        if answer_cache is None or chat.history_text or not answer:
+            return
+        answer_cache.store(
+            self._answer_cache_scope(request),
+            chat.collection_version,
+            chat.query_embedding,
+            answer,
+            chat.context_docs
+        )
+
+    @staticmethod
+    def _should_rerank(request: ChatRequest) -> bool:
+        """Rerank if the request asks for it, or by default when enabled in settings."""
+        return request.rerank if request.rerank is not None else settings.rerank_enabled
+
+    def _candidate_count(self, request: ChatRequest) -> int:
+        """How many chunks to retrieve: top_k, or a wider candidate set when reranking."""
+        if self._should_rerank(request):
+            return max(request.top_k, settings.rerank_candidates)
+        return request.top_k
+
+    def _retrieve(self, request: ChatRequest, query_embedding: List[float]) -> List[Dict[str, Any]]:
+        """Step 3b: Search the collection with the request's retrieval mode."""
+        k = self._candidate_count(request)
+        if request.retrieval_mode == "hybrid":
+            return self.vector_store.hybrid_search(request.query, query_embedding, request.collection_name, k)
+        if request.retrieval_mode == "keyword":
+            return self.vector_store.keyword_search(request.query, request.collection_name, k)
+        return self.vector_store.search_by_vector(query_embedding, request.collection_name, k)
+
+    async def _aretrieve(self, request: ChatRequest, query_embedding: List[float]) -> List[Dict[str, Any]]:
+        """Async _retrieve; in hybrid mode both retrievers run concurrently."""
+        k = self._candidate_count(request)
+        if request.retrieval_mode == "hybrid":
+            return await self.vector_store.ahybrid_search(request.query, query_embedding, request.collection_name, k)
+        if request.retrieval_mode == "keyword":
+            return await self.vector_store.akeyword_search(request.query, request.collection_name, k)
+        return await self.vector_store.asearch_by_vector(query_embedding, request.collection_name, k)
+
+    @staticmethod
+    def _to_context_docs(search_results: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Step 3d: Format search results for internal use (distance for dense, BM25/RRF/rerank score otherwise)."""
+        return [
+            {
+                "content": res['document'], 
+                "metadata": res['metadata'], 
+                "score": res['score'] if 'score' in res else res['distance']
+            } 
+            for res in search_results
+        ]
+
+    @staticmethod
+    def _build_prompt(request: ChatRequest, chat: PreparedChat) -> None:
+        """Step 3e: Pack history and context into the prompt token budget."""
+        prompt = build_rag_prompt(
+            request.query,
+            chat.context_docs,
+            [(msg.role, msg.content) for msg in chat.recent_messages]
+        )
+        chat.system_prompt = prompt.system
+        chat.prompt = prompt.user
+        chat.prompt_tokens = prompt.token_count
+        PROMPT_CHARS.observe(len(prompt.text))
+        PROMPT_TOKENS.observe(prompt.token_count)
+        # Only the sources that made it into the prompt are reported
+        chat.context_docs = prompt.context_docs
+
+    def _save_turn(self, session_id: str, query: str, answer: str) -> bool:
+        """
+        Step 5: Persist the user query and assistant answer (failures are logged, not raised).
+        A session started by this turn is inserted in the same transaction.
+        
+        Returns:
+            Whether the turn was saved
+        """
+        try:
+            self.message_repo.add_turn(
+                session_id,
+                query,
+                answer,
+                new_session=session_id == self.new_session_id,
+                asked_at=self.asked_at
+            )
+            logger.info(f"Saved messages to session {session_id}")
+            return True
         except Exception as e:
-            # Catch any unexpected errors
-            logger.error(f"Unexpected error in process_chat: {e}", exc_info=True)
-            raise HTTPException(status_code=500, detail="An unexpected error occurred")
\ No newline at end of file
+            logger.error(f"Failed to save chat history: {e}")
+            return False
+
+    def _ensure_session_saved(self, session_id: str, saved: bool) -> None:
+        """
+        Fail the turn if it started a new session that could not be saved.
+        The client would otherwise get a session ID with no session behind it;
+        for an existing session only this turn's history is lost.
+        
+        Raises:
+            HTTPException: 500 if the new session was not saved
+        """
+        if not saved and session_id == self.new_session_id:
+            raise HTTPException(status_code=500, detail="Failed to save chat session")
+
+    def _build_response(self, request: ChatRequest, chat: PreparedChat, answer: str) -> ChatResponse:
+        """Steps 6-7: Build validation metrics and the final ChatResponse."""
+        # 6. Validate Response     
+        # Extract last 3 messages 
+        history_preview: List[str] = []
+        if chat.recent_messages:
+            for msg in chat.recent_messages[-3:]:
+                role: str = "User" if msg.role == "user" else "Assistant"
+                content: str = msg.content[:100] + "..." if len(msg.content) > 100 else msg.content
+                history_preview.append(f"{role}: {content}")
+
+        # Extract first 1000 chars of prompt for debugging
+        prompt = f"{chat.system_prompt}\n\n{chat.prompt}"
+        prompt_preview: str = prompt[:1000] + "..." if len(prompt) > 1000 else prompt
+
+        # Create validation metrics object
+        validation_result: ValidationMetrics = ValidationMetrics(
+            used_context=len(chat.context_docs) > 0,  
+            used_history=len(chat.history_text) > 0,  
+            context_sources=len(chat.context_docs),   
+            history_preview=history_preview,     
+            prompt_preview=prompt_preview,
+            prompt_tokens=chat.prompt_tokens,
+            answer_cache_hit=chat.cached_answer is not None,
+            answer_cache_similarity=chat.cache_similarity,
+            reranked=chat.reranked,
+            coalesced=chat.coalesced
+        )
+        logger.info(f"Response validation: {validation_result.model_dump()}")
+        
+        # 7. Return Response 
+        # Format sources for response schema
+        response_sources: List[SourceDocument] = [
+            SourceDocument(
+                content=doc['content'], 
+                metadata=doc['metadata'], 
+                score=doc.get('score')
+            )
+            for doc in chat.context_docs
+        ]
+
+        return ChatResponse(
+            status="success",
+            session_id=chat.session_id,
+            query=request.query,
+            answer=answer,
+            sources=response_sources,
+            validation=validation_result
+        )
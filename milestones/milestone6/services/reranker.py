@@ -0,0 +1,137 @@
+"""Cross-encoder reranking of retrieved chunks under a latency budget."""
+
+import asyncio
+import time
+from threading import BoundedSemaphore, Event, Lock
+from typing import Any, Dict, List, Optional, Tuple
+from config import settings
+from utils.executors import get_executor
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Free rerank pool workers; a slot is held until scoring really stops, not until the request gives up
+_free_workers = BoundedSemaphore(settings.rerank_pool_size)
+
+
+class CrossEncoderReranker:
+    """
+    Re-scores (query, chunk) pairs with a local cross-encoder and keeps the best few.
+
+    Scoring runs in batches and the time budget is checked after each one; once it
+    is used up, the candidates are returned in their original (retrieval) order instead.
+    The model is loaded on first use.
+
+    Async reranks run on the rerank pool, at most rerank_pool_size at a time;
+    when every worker is busy the request keeps retrieval order instead of queueing.
+    """
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        batch_size: Optional[int] = None,
+        budget_ms: Optional[float] = None,
+        model: Any = None
+    ):
+        """
+        Initialize the reranker.
+
+        Args:
+            model_name: sentence-transformers CrossEncoder model (defaults to settings)
+            batch_size: Pairs scored per forward pass (defaults to settings)
+            budget_ms: Time budget for scoring (defaults to settings)
+            model: Optional pre-built model exposing predict(pairs, batch_size=...)
+        """
+        self.model_name = model_name or settings.rerank_model_name
+        self.batch_size = batch_size or settings.rerank_batch_size
+        self.budget_ms = budget_ms if budget_ms is not None else settings.rerank_budget_ms
+        self._model = model
+        self._model_lock = Lock()
+
+    @property
+    def model(self) -> Any:
+        """The cross-encoder, loaded on first access."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+                    logger.info(f"Loading cross-encoder: {self.model_name}")
+                    self._model = CrossEncoder(self.model_name)
+        return self._model
+
+    def rerank(
+        self,
+        query: str,
+        candidates: List[Dict[str, Any]],
+        top_k: int,
+        cancel: Optional[Event] = None
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Order candidates by cross-encoder score and keep the top_k.
+
+        Args:
+            query: User query
+            candidates: Search results ({"document", "metadata", ...}), in retrieval order
+            top_k: Number of results to keep
+            cancel: Optional event; once set, scoring stops before the next batch
+
+        Returns:
+            (results, reranked): results carry the cross-encoder score in "score";
+            reranked is False when the budget ran out and retrieval order was kept
+        """
+        if len(candidates) <= 1:
+            return candidates[:top_k], False
+
+        model = self.model
+        start = time.perf_counter()
+        deadline = start + self.budget_ms / 1000
+        pairs = [(query, candidate["document"]) for candidate in candidates]
+        scores: List[float] = []
+        for offset in range(0, len(pairs), self.batch_size):
+            if cancel is not None and cancel.is_set():
+                return candidates[:top_k], False
+            batch_scores = model.predict(pairs[offset:offset + self.batch_size], batch_size=self.batch_size)
+            scores.extend(float(score) for score in batch_scores)
+            # Checked after every batch, including the last (often the only) one
+            if time.perf_counter() > deadline:
+                logger.warning(
+                    f"Rerank budget of {self.budget_ms:.0f} ms exceeded after {len(scores)}/{len(pairs)} "
+                    f"candidates, keeping retrieval order"
+                )
+                return candidates[:top_k], False
+
+        ranked = sorted(zip(scores, range(len(candidates))), key=lambda item: item[0], reverse=True)[:top_k]
+        results = [{**candidates[index], "score": score} for score, index in ranked]
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        logger.info(f"Reranked {len(candidates)} candidates to {len(results)} in {elapsed_ms:.0f} ms")
+        return results, True
+
+    async def arerank(
+        self,
+        query: str,
+        candidates: List[Dict[str, Any]],
+        top_k: int
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Async rerank on the rerank pool.
+
+        Waits at most the budget: on timeout the request continues with retrieval
+        order and the worker is cancelled at its next batch boundary. If every
+        worker is still busy, reranking is skipped rather than queued.
+        """
+        if len(candidates) <= 1:
+            return candidates[:top_k], False
+        if not _free_workers.acquire(blocking=False):
+            logger.warning("Rerank workers busy, keeping retrieval order")
+            return candidates[:top_k], False
+
+        cancel = Event()
+        future = get_executor("rerank").submit(self.rerank, query, candidates, top_k, cancel)
+        # Released when scoring ends (or the job is cancelled before starting), not on timeout
+        future.add_done_callback(lambda _: _free_workers.release())
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=self.budget_ms / 1000)
+        except asyncio.TimeoutError:
+            cancel.set()
+            logger.warning(f"Rerank budget of {self.budget_ms:.0f} ms exceeded, keeping retrieval order")
+            return candidates[:top_k], False
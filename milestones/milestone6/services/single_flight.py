@@ -0,0 +1,63 @@
+"""Single-flight execution: concurrent calls with the same key share one run."""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+from utils.metrics import REGISTRY
+import logging
+
+logger = logging.getLogger(__name__)
+
+COALESCED = REGISTRY.counter("chat_coalesced_requests_total", "Chat requests served by an identical in-flight request")
+
+
+class SingleFlight:
+    """
+    Deduplicates concurrent async work by key.
+
+    The first caller for a key starts the work as a task; callers arriving while
+    it runs await the same task instead of starting their own. The task is
+    shielded, so a caller that disconnects does not cancel it for the others.
+    Results are not kept once the task finishes (that is the answer cache's job).
+    """
+
+    def __init__(self):
+        self._inflight: Dict[Hashable, "asyncio.Task[Any]"] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: Hashable, work: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run work() once per key at a time.
+
+        Args:
+            key: Identifies interchangeable calls
+            work: Coroutine function producing the shared result
+
+        Returns:
+            (result, shared): shared is True if the result came from another caller's run
+
+        Raises:
+            Whatever work() raised, for every caller sharing the run
+        """
+        task = self._inflight.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(work())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        else:
+            COALESCED.inc()
+            logger.info(f"Coalesced with in-flight request ({len(self._inflight)} in flight)")
+        return await asyncio.shield(task), shared
+
+    def _finish(self, key: Hashable, task: "asyncio.Task[Any]") -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark the exception as retrieved even if every caller has gone away
+            task.exception()
+
+
+# Process-wide instance used by RAGService
+single_flight = SingleFlight()
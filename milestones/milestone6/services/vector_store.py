@@ -1,12 +1,63 @@
 """ChromaDB vector store manager."""
 
+import asyncio
 import os
 import sys
+import chromadb
 from langchain_community.vectorstores import Chroma
-from langchain_huggingface import HuggingFaceEmbeddings
 from langchain_core.documents import Document
 from config import settings
-from typing import List, Dict
+from utils.cache import LRUCache, normalize_query
+from utils.executors import get_executor, run_in_executor
+from utils.metrics import REGISTRY
+from services.embeddings import build_embeddings
+from services.incremental_index import SourceDiff
+from services.keyword_index import BM25Index, reciprocal_rank_fusion
+from typing import List, Dict, Any, Tuple, Optional
+import logging
+from threading import Lock
+
+logger = logging.getLogger(__name__)
+
+# Open collection handles shared by every manager in the process,
+# keyed by (persist_directory, collection_name, embedding_model)
+_collection_cache = LRUCache(max_size=settings.collection_cache_size)
+
+# BM25 keyword indexes, keyed like the collection handles
+_keyword_index_cache = LRUCache(max_size=settings.collection_cache_size)
+
+# One lock per keyword index, so concurrent searches build a missing index once
+# and a rebuild or drop never races a build in progress
+_keyword_index_locks: Dict[Tuple[str, str, str], Lock] = {}
+_keyword_index_locks_lock = Lock()
+
+# Collection metadata key holding the collection version, bumped on every
+# invalidation (re-index); stored in Chroma so every process sees it
+VERSION_METADATA_KEY = "index_version"
+_versions_lock = Lock()
+
+# Collection versions read from Chroma, keyed like the collection handles. Bumps in this
+# process update the entry; bumps by other processes are seen once it expires
+_collection_version_cache = LRUCache(
+    max_size=settings.collection_cache_size,
+    ttl_seconds=settings.collection_version_ttl_seconds
+)
+
+# Query embeddings keyed by (embedding_model, normalized query text)
+_query_embedding_cache: Optional[LRUCache] = (
+    LRUCache(
+        max_size=settings.query_embedding_cache_size,
+        ttl_seconds=settings.query_embedding_cache_ttl_seconds
+    )
+    if settings.query_embedding_cache_size > 0 else None
+)
+
+CACHE_LOOKUPS = REGISTRY.counter(
+    "chat_cache_lookups_total",
+    "Cache lookups on the chat path by cache (query_embedding, answer) and result (hit, miss)",
+    labelnames=("cache", "result")
+)
+
 
 class VectorStoreManager:
     """Simplified ChromaDB vector store manager with auto-persistence."""
@@ -17,7 +68,8 @@ class VectorStoreManager:
         
         Args:
             persist_directory: Directory for ChromaDB persistence (defaults to settings)
-            embedding_model: HuggingFace embedding model name (defaults to settings)
+            embedding_model: HuggingFace embedding model name (defaults to settings);
+                the backend running it is settings.embedding_backend
         """
         if persist_directory is None:
             persist_directory = settings.vector_store_persist_dir
@@ -25,32 +77,317 @@ class VectorStoreManager:
             embedding_model = settings.embedding_model_name
             
         self.persist_directory = persist_directory
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=embedding_model
-        )
+        self.embedding_model = embedding_model
+        self.embeddings = build_embeddings(embedding_model)
         os.makedirs(persist_directory, exist_ok=True)
+        # One persistent client per manager instead of one per load()/create()
+        self.client = chromadb.PersistentClient(path=persist_directory)
     
+    def _cache_key(self, collection_name: str) -> Tuple[str, str, str]:
+        """Build the collection-handle cache key for this manager."""
+        return (os.path.abspath(self.persist_directory), collection_name, self.embedding_model)
+
+    def invalidate_collection(self, collection_name: str) -> bool:
+        """
+        Drop the cached handle for a collection so the next search reopens it,
+        and bump its version so version-scoped caches (e.g. answers) are invalidated.
+        Call this after any re-index or deletion of the collection.
+        
+        Returns:
+            True if a cached handle was dropped
+        """
+        key = self._cache_key(collection_name)
+        self._bump_collection_version(collection_name)
+        dropped = _collection_cache.invalidate(key)
+        with self._keyword_index_lock(collection_name):
+            _keyword_index_cache.invalidate(key)
+        if dropped:
+            logger.info(f"Invalidated cached handle for collection '{collection_name}'")
+        return dropped
+
+    def _bump_collection_version(self, collection_name: str) -> None:
+        """Increment the version stored in the collection's Chroma metadata."""
+        with _versions_lock:
+            try:
+                collection = self.client.get_collection(collection_name)
+            except Exception:
+                # Collection does not exist (yet): it is at version 0
+                return
+            # Chroma rejects distance-function ("hnsw:") keys in modify()
+            metadata = {
+                key: value for key, value in (collection.metadata or {}).items() if not key.startswith("hnsw:")
+            }
+            metadata[VERSION_METADATA_KEY] = int(metadata.get(VERSION_METADATA_KEY, 0)) + 1
+            collection.modify(metadata=metadata)
+            _collection_version_cache.put(self._cache_key(collection_name), metadata[VERSION_METADATA_KEY])
+
+    def collection_version(self, collection_name: str) -> int:
+        """
+        Current version of a collection (increases on every re-index).
+        Read from the collection's Chroma metadata, so re-indexes by other processes are seen
+        (within settings.collection_version_ttl_seconds, the time a read is cached per process).
+        """
+        key = self._cache_key(collection_name)
+        version = _collection_version_cache.get(key)
+        if version is not None:
+            return version
+        # Read under the bump lock so a read racing a bump cannot cache the old version
+        with _versions_lock:
+            version = _collection_version_cache.get(key)
+            if version is None:
+                try:
+                    metadata = self.client.get_collection(collection_name).metadata or {}
+                except Exception:
+                    # Collection does not exist (yet): it is at version 0
+                    metadata = {}
+                version = int(metadata.get(VERSION_METADATA_KEY, 0))
+                _collection_version_cache.put(key, version)
+        return version
+
+    @staticmethod
+    def collection_cache_stats() -> Dict[str, Any]:
+        """Hit/miss counters of the process-wide collection-handle cache."""
+        return _collection_cache.stats()
+
+    @staticmethod
+    def query_embedding_cache_stats() -> Dict[str, Any]:
+        """Hit-rate counters of the process-wide query-embedding cache (empty if disabled)."""
+        return _query_embedding_cache.stats() if _query_embedding_cache is not None else {}
+
     def create(self, documents: List[Document], collection_name: str = "documents") -> Chroma:
-        """Create and populate vector store."""
-        return Chroma.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
-            collection_name=collection_name,
-            persist_directory=self.persist_directory
+        """
+        Index chunks into a collection (created if missing), and its keyword index, incrementally.
+        
+        Chunks get deterministic, content-based IDs, and the chunks of every source in
+        documents are diffed against those already stored for that source: only new
+        chunks are embedded, unchanged chunks that moved get their chunk_index updated,
+        and chunks the source no longer produces are deleted. Sources not in documents
+        are left as they are, so calls for different sources add up; chunks of deleted
+        files are removed by IngestionPipeline.index_directory, which sees the whole directory.
+        
+        Args:
+            documents: Chunks to index; chunk_id and chunk_index (per source) are set in their metadata
+            collection_name: Target ChromaDB collection
+            
+        Returns:
+            The collection's (cached) Chroma handle
+        """
+        by_source: Dict[str, List[Document]] = {}
+        for document in documents:
+            by_source.setdefault(document.metadata.get("source", ""), []).append(document)
+        
+        new_chunks: List[Document] = []
+        moved_chunks: List[Document] = []
+        stale_ids: List[str] = []
+        for source, chunks in by_source.items():
+            diff = SourceDiff(source, self.stored_chunk_positions(collection_name, source))
+            for chunk in chunks:
+                status = diff.add(chunk)
+                if status == SourceDiff.NEW:
+                    new_chunks.append(chunk)
+                elif status == SourceDiff.MOVED:
+                    moved_chunks.append(chunk)
+            stale_ids.extend(diff.stale_ids())
+        
+        batch_size = min(settings.ingestion_batch_size, self.client.get_max_batch_size())
+        for start in range(0, len(new_chunks), batch_size):
+            batch = new_chunks[start:start + batch_size]
+            self.upsert_chunks(
+                collection_name,
+                [chunk.metadata["chunk_id"] for chunk in batch],
+                batch,
+                self.embeddings.embed_documents([chunk.page_content for chunk in batch])
+            )
+        self.update_chunk_metadata(
+            collection_name,
+            [chunk.metadata["chunk_id"] for chunk in moved_chunks],
+            [chunk.metadata for chunk in moved_chunks]
+        )
+        self.delete_chunks(collection_name, stale_ids)
+        logger.info(
+            f"Indexed {len(documents)} chunks into '{collection_name}': {len(new_chunks)} embedded, "
+            f"{len(moved_chunks)} moved, {len(stale_ids)} deleted"
         )
+        
+        if new_chunks or moved_chunks or stale_ids:
+            # Bump the version once the chunks are written, so a new collection starts at 1
+            self.invalidate_collection(collection_name)
+            if settings.keyword_index_enabled:
+                keyword_index = self.get_keyword_index(collection_name)
+                keyword_index.remove(stale_ids)
+                changed = new_chunks + moved_chunks
+                keyword_index.add(
+                    [chunk.metadata["chunk_id"] for chunk in changed],
+                    [chunk.page_content for chunk in changed],
+                    [chunk.metadata for chunk in changed]
+                )
+                keyword_index.save(self.keyword_index_path(collection_name))
+        return self.get_collection(collection_name)
+    
+    def stored_chunk_positions(self, collection_name: str, source: str) -> Dict[str, Optional[int]]:
+        """chunk_index of every chunk stored for a source, by chunk ID (empty if the collection does not exist)."""
+        try:
+            collection = self.client.get_collection(collection_name)
+        except Exception:
+            return {}
+        stored = collection.get(where={"source": source}, include=["metadatas"])
+        return {
+            stored_id: (metadata or {}).get("chunk_index")
+            for stored_id, metadata in zip(stored["ids"], stored["metadatas"])
+        }
+    
+    def update_chunk_metadata(self, collection_name: str, ids: List[str], metadatas: List[Dict[str, Any]]) -> None:
+        """Replace the metadata of stored chunks, keeping their text and embeddings."""
+        if ids:
+            self.client.get_collection(collection_name).update(ids=ids, metadatas=metadatas)
+    
+    def delete_collection(self, collection_name: str) -> None:
+        """Delete a collection (if it exists), its cached handle and its keyword index."""
+        try:
+            self.client.delete_collection(collection_name)
+        except Exception:
+            # Collection does not exist: nothing to delete
+            pass
+        _collection_cache.invalidate(self._cache_key(collection_name))
+        _collection_version_cache.invalidate(self._cache_key(collection_name))
+        self.drop_keyword_index(collection_name)
+    
+    def delete_chunks(self, collection_name: str, ids: List[str]) -> None:
+        """Delete chunks by ID (Chroma only; the keyword index is updated by the caller)."""
+        if ids:
+            self.client.get_collection(collection_name).delete(ids=ids)
     
     def load(self, collection_name: str = "documents") -> Chroma:
         """Load existing vector store."""
         return Chroma(
             collection_name=collection_name,
             embedding_function=self.embeddings,
-            persist_directory=self.persist_directory
+            client=self.client
         )
     
-    def search(self, query: str, collection_name: str = "documents", k: int = 3) -> List[Dict]:
-        """Search in a Chroma collection and return formatted results."""
-        vector_store = self.load(collection_name=collection_name)
-        results = vector_store.similarity_search_with_score(query, k=k)
+    def get_collection(self, collection_name: str = "documents") -> Chroma:
+        """Return a cached collection handle, opening the store only on a cache miss."""
+        key = self._cache_key(collection_name)
+        vector_store = _collection_cache.get(key)
+        if vector_store is None:
+            vector_store = self.load(collection_name=collection_name)
+            _collection_cache.put(key, vector_store)
+        return vector_store
+    
+    def upsert_chunks(
+        self,
+        collection_name: str,
+        ids: List[str],
+        chunks: List[Document],
+        embeddings: List[List[float]]
+    ) -> None:
+        """
+        Write already-embedded chunks to a collection, overwriting existing IDs.
+        Only Chroma is written; call drop_keyword_index() after the batch run.
+        """
+        if not ids:
+            return
+        collection = self.client.get_or_create_collection(collection_name, embedding_function=None)
+        collection.upsert(
+            ids=ids,
+            embeddings=embeddings,
+            documents=[chunk.page_content for chunk in chunks],
+            metadatas=[chunk.metadata for chunk in chunks]
+        )
+    
+    def keyword_index_path(self, collection_name: str) -> str:
+        """Where a collection's BM25 index is stored (next to the Chroma data)."""
+        return os.path.join(self.persist_directory, "keyword_index", f"{collection_name}.json")
+    
+    def _keyword_index_lock(self, collection_name: str) -> Lock:
+        """The lock guarding a collection's keyword index (created on first use)."""
+        key = self._cache_key(collection_name)
+        with _keyword_index_locks_lock:
+            return _keyword_index_locks.setdefault(key, Lock())
+    
+    def get_keyword_index(self, collection_name: str = "documents") -> BM25Index:
+        """
+        Return the collection's BM25 index (cached per process).
+        
+        Collections indexed before keyword indexes existed (or whose index was
+        dropped) are backfilled from the chunks stored in Chroma on first use;
+        concurrent callers wait for that one build instead of each running it.
+        """
+        key = self._cache_key(collection_name)
+        keyword_index = _keyword_index_cache.get(key)
+        if keyword_index is not None:
+            return keyword_index
+        with self._keyword_index_lock(collection_name):
+            keyword_index = _keyword_index_cache.get(key)
+            if keyword_index is None:
+                keyword_index = BM25Index.load(self.keyword_index_path(collection_name))
+                if keyword_index is None:
+                    keyword_index = self.build_keyword_index(collection_name)
+                _keyword_index_cache.put(key, keyword_index)
+        return keyword_index
+    
+    def rebuild_keyword_index(self, collection_name: str = "documents") -> BM25Index:
+        """Rebuild a collection's BM25 index from Chroma now (after a batch re-index), replacing the cached one."""
+        with self._keyword_index_lock(collection_name):
+            self._remove_keyword_index_file(collection_name)
+            keyword_index = self.build_keyword_index(collection_name)
+            _keyword_index_cache.put(self._cache_key(collection_name), keyword_index)
+        return keyword_index
+    
+    def build_keyword_index(self, collection_name: str = "documents", page_size: int = 1000) -> BM25Index:
+        """Build (and save) a BM25 index from the chunks already stored in a Chroma collection."""
+        keyword_index = BM25Index()
+        try:
+            collection = self.client.get_collection(collection_name)
+        except Exception:
+            # Collection does not exist yet: start with an empty index
+            return keyword_index
+        
+        offset = 0
+        while True:
+            page = collection.get(include=["documents", "metadatas"], limit=page_size, offset=offset)
+            if not page["ids"]:
+                break
+            keyword_index.add(page["ids"], page["documents"], page["metadatas"])
+            offset += len(page["ids"])
+        if len(keyword_index):
+            keyword_index.save(self.keyword_index_path(collection_name))
+            logger.info(f"Built keyword index for collection '{collection_name}' ({len(keyword_index)} chunks)")
+        return keyword_index
+    
+    def drop_keyword_index(self, collection_name: str = "documents") -> None:
+        """Delete a collection's saved BM25 index so the next keyword search rebuilds it from Chroma."""
+        with self._keyword_index_lock(collection_name):
+            _keyword_index_cache.invalidate(self._cache_key(collection_name))
+            self._remove_keyword_index_file(collection_name)
+    
+    def _remove_keyword_index_file(self, collection_name: str) -> None:
+        try:
+            os.remove(self.keyword_index_path(collection_name))
+        except FileNotFoundError:
+            pass
+    
+    def embed_query(self, query: str) -> List[float]:
+        """
+        Embed a query string with the configured embedding model.
+        Repeated queries are served from the query-embedding cache without running the model.
+        The normalized text is only the cache key; the model always sees the query as asked.
+        """
+        if _query_embedding_cache is None:
+            return self.embeddings.embed_query(query)
+
+        key = (self.embedding_model, normalize_query(query))
+        embedding = _query_embedding_cache.get(key)
+        CACHE_LOOKUPS.inc(cache="query_embedding", result="miss" if embedding is None else "hit")
+        if embedding is None:
+            embedding = self.embeddings.embed_query(query)
+            _query_embedding_cache.put(key, embedding)
+        return embedding
+
+    def search_by_vector(self, embedding: List[float], collection_name: str = "documents", k: int = 3) -> List[Dict]:
+        """Search in a Chroma collection with a precomputed query embedding."""
+        vector_store = self.get_collection(collection_name=collection_name)
+        results = vector_store.similarity_search_by_vector_with_relevance_scores(embedding, k=k)
         
         # Convert Tuple[Document, float] to Dict format
         return [
@@ -61,4 +398,71 @@ class VectorStoreManager:
             }
             for doc, score in results
         ]
+    
+    def search(self, query: str, collection_name: str = "documents", k: int = 3) -> List[Dict]:
+        """Search in a Chroma collection and return formatted results."""
+        return self.search_by_vector(self.embed_query(query), collection_name, k)
+
+    def keyword_search(self, query: str, collection_name: str = "documents", k: int = 3) -> List[Dict]:
+        """BM25 search over the collection's keyword index."""
+        return self.get_keyword_index(collection_name).search(query, k)
+
+    def hybrid_search(
+        self,
+        query: str,
+        embedding: List[float],
+        collection_name: str = "documents",
+        k: int = 3
+    ) -> List[Dict]:
+        """
+        Dense + BM25 search merged with reciprocal rank fusion.
+        
+        Both retrievers fetch settings.hybrid_candidates results; the BM25 search
+        runs on the search pool while the vector search runs on this thread.
+        """
+        candidates = max(k, settings.hybrid_candidates)
+        keyword_future = get_executor("search").submit(self.keyword_search, query, collection_name, candidates)
+        dense_results = self.search_by_vector(embedding, collection_name, candidates)
+        return reciprocal_rank_fusion([dense_results, keyword_future.result()], k, settings.rrf_k)
+
+    async def aembed_query(self, query: str) -> List[float]:
+        """Async embed_query, run on the embedding pool."""
+        return await run_in_executor("embedding", self.embed_query, query)
+
+    async def acollection_version(self, collection_name: str) -> int:
+        """Async collection_version(): a cached version is returned directly, a Chroma read runs on the search pool."""
+        version = _collection_version_cache.get(self._cache_key(collection_name))
+        if version is not None:
+            return version
+        return await run_in_executor("search", self.collection_version, collection_name)
+    
+    async def asearch_by_vector(self, embedding: List[float], collection_name: str = "documents", k: int = 3) -> List[Dict]:
+        """Async search_by_vector, run on the search pool."""
+        return await run_in_executor("search", self.search_by_vector, embedding, collection_name, k)
+
+    async def akeyword_search(self, query: str, collection_name: str = "documents", k: int = 3) -> List[Dict]:
+        """Async keyword_search, run on the search pool."""
+        return await run_in_executor("search", self.keyword_search, query, collection_name, k)
 
+    async def ahybrid_search(
+        self,
+        query: str,
+        embedding: List[float],
+        collection_name: str = "documents",
+        k: int = 3
+    ) -> List[Dict]:
+        """Async hybrid_search: vector and BM25 retrieval run concurrently on the search pool."""
+        candidates = max(k, settings.hybrid_candidates)
+        dense_results, keyword_results = await asyncio.gather(
+            self.asearch_by_vector(embedding, collection_name, candidates),
+            self.akeyword_search(query, collection_name, candidates)
+        )
+        return reciprocal_rank_fusion([dense_results, keyword_results], k, settings.rrf_k)
+
+    async def asearch(self, query: str, collection_name: str = "documents", k: int = 3) -> List[Dict]:
+        """
+        Async search: encoding runs on the embedding pool and the Chroma query
+        on the search pool, so the event loop is never blocked.
+        """
+        embedding = await self.aembed_query(query)
+        return await self.asearch_by_vector(embedding, collection_name, k)
@@ -7,11 +7,19 @@ import streamlit as st
 from config import settings
 from repositories.database.db_connection import SessionLocal
 from services.rag_service import RAGService
+from services.container import ServiceContainer
 from schemas.chat_schema import ChatRequest
 
 st.set_page_config(page_title="EBLA RAG Chat", layout="wide")
 st.title("💬 EBLA RAG Assistant")
 
+
+@st.cache_resource
+def get_container() -> ServiceContainer:
+    """Build the embedding model and LLM client once per Streamlit process."""
+    return ServiceContainer()
+
+
 # Initialize session state
 if "session_id" not in st.session_state:
     st.session_state.session_id = None
@@ -46,7 +54,13 @@ with col1:
                 top_k=settings.default_top_k,
             )
             
-            rag_service = RAGService(db)
+            container = get_container()
+            rag_service = RAGService(
+                db,
+                vector_store=container.vector_store,
+                llm_model=container.llm_model,
+                llm_admission=container.llm_admission
+            )
             response = rag_service.process_chat(chat_request)
             
             st.session_state.session_id = response.session_id
@@ -0,0 +1,11 @@
+"""
+pytest setup: makes the shared test stubs importable as the top-level module
+"stubs", as they are when a test file runs as a script from this directory.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+import stubs  # noqa: E402,F401  (path and test environment before any application module)
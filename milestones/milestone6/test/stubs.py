@@ -0,0 +1,120 @@
+"""
+Shared setup and stubs for the tests.
+
+Test modules import from this module before any application module, so the
+path and environment are set up the same way under pytest (see conftest.py)
+and when a test runs as a script (python test/test_x.py).
+The stubs need no embedding model, Ollama, Chroma or SQL Server.
+"""
+
+import os
+import sys
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+os.environ.setdefault("HF_HUB_OFFLINE", "1")  # no tokenizer download: prompt tokens are approximated
+
+STUB_RESULT = {"document": "EBLA provides cloud services.", "metadata": {"source": "stub"}, "distance": 0.1}
+
+
+class StubVectorStore:
+    """Returns fixed search results; counts searches and records the last k asked for."""
+
+    def __init__(self, results=None, embedding=(1.0, 0.0)):
+        self.results = [STUB_RESULT] if results is None else results
+        self.embedding = list(embedding)
+        self.searches = 0
+        self.requested_k = None
+
+    def embed_query(self, query):
+        return self.embedding
+
+    async def aembed_query(self, query):
+        return self.embed_query(query)
+
+    def search_by_vector(self, embedding, collection_name="documents", k=3):
+        self.searches += 1
+        self.requested_k = k
+        return self.results[:k]
+
+    async def asearch_by_vector(self, embedding, collection_name="documents", k=3):
+        return self.search_by_vector(embedding, collection_name, k)
+
+    def collection_version(self, collection_name):
+        return 0
+
+    async def acollection_version(self, collection_name):
+        return self.collection_version(collection_name)
+
+
+class StubLLM:
+    """Answers every prompt with a fixed text; counts calls and records the last prompt."""
+
+    def __init__(self, answer="stub answer"):
+        self.answer = answer
+        self.calls = 0
+        self.prompt = None
+
+    def generate(self, prompt, system=None):
+        self.calls += 1
+        self.prompt = prompt
+        return self.answer
+
+    async def agenerate(self, prompt, system=None):
+        return self.generate(prompt, system)
+
+
+class StubSessionRepo:
+    def create_session(self, user_id=None):
+        return "stub-session"
+
+    def get_session(self, session_id):
+        return object()
+
+
+class StubMessage:
+    def __init__(self, role, content):
+        self.role = role
+        self.content = content
+
+
+class StubMessageRepo:
+    """Returns a fixed history (none by default); records the saved turns, or fails to save them."""
+
+    def __init__(self, history=(), fail_saves=False):
+        self.history = list(history)
+        self.fail_saves = fail_saves
+        self.saved = []
+
+    def get_recent_messages(self, session_id, limit=5):
+        return list(self.history)
+
+    def add_turn(self, session_id, user_content, assistant_content, new_session=False, asked_at=None):
+        if self.fail_saves:
+            raise RuntimeError("database unavailable")
+        self.saved.extend([("user", user_content), ("assistant", assistant_content)])
+        return "user-msg", "assistant-msg"
+
+
+def build_stub_service(vector_store=None, llm=None, message_repo=None, **kwargs):
+    """
+    RAGService over the stubs.
+
+    Args:
+        vector_store: Defaults to a StubVectorStore
+        llm: Defaults to a StubLLM
+        message_repo: Defaults to a StubMessageRepo
+        **kwargs: Passed to RAGService (e.g. reranker, llm_admission)
+    """
+    from services.rag_service import RAGService
+
+    service = RAGService(
+        None,
+        vector_store=vector_store if vector_store is not None else StubVectorStore(),
+        llm_model=llm if llm is not None else StubLLM(),
+        **kwargs
+    )
+    service.session_repo = StubSessionRepo()
+    service.message_repo = message_repo if message_repo is not None else StubMessageRepo()
+    return service
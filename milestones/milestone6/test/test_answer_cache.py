@@ -0,0 +1,138 @@
+"""Test for the semantic answer cache and its use in RAGService."""
+
+import asyncio
+import tempfile
+import time
+
+from stubs import StubLLM, StubVectorStore, build_stub_service
+import chromadb
+from langchain_core.documents import Document
+from services.answer_cache import SemanticAnswerCache
+from services import vector_store as vector_store_module
+from services.vector_store import VERSION_METADATA_KEY, VectorStoreManager
+from schemas.chat_schema import ChatRequest
+
+SOURCES = [{"content": "EBLA provides cloud services.", "metadata": {"source": "stub"}, "score": 0.1}]
+
+
+def test_similarity_threshold_and_scope():
+    cache = SemanticAnswerCache(max_size=8, similarity_threshold=0.9)
+    cache.store(("documents", 3), 0, [1.0, 0.0], "cached answer", SOURCES)
+
+    # Near-duplicate in the same scope hits
+    hit = cache.lookup(("documents", 3), 0, [0.99, 0.05])
+    assert hit is not None and hit[0].answer == "cached answer"
+
+    # Different question, different scope: misses
+    assert cache.lookup(("documents", 3), 0, [0.0, 1.0]) is None
+    assert cache.lookup(("other", 3), 0, [1.0, 0.0]) is None
+
+
+def test_reindex_invalidates_entries():
+    cache = SemanticAnswerCache(max_size=8, similarity_threshold=0.9)
+    cache.store(("documents", 3), 0, [1.0, 0.0], "cached answer", SOURCES)
+
+    # Collection version bumped by a re-index
+    assert cache.lookup(("documents", 3), 1, [1.0, 0.0]) is None
+    assert cache.stats()["invalidations"] == 1
+    assert cache.stats()["size"] == 0
+
+
+class StubEmbeddings:
+    def embed_documents(self, texts):
+        return [[1.0, 0.0] for _ in texts]
+
+
+class TempVectorStore(VectorStoreManager):
+    def __init__(self, persist_directory):
+        self.persist_directory = persist_directory
+        self.embedding_model = "stub-model"
+        self.embeddings = StubEmbeddings()
+        self.client = chromadb.PersistentClient(path=persist_directory)
+
+
+def test_collection_version_is_stored_with_the_collection():
+    with tempfile.TemporaryDirectory() as directory:
+        serving, indexing = TempVectorStore(directory), TempVectorStore(directory)
+        assert serving.collection_version("version-test") == 0
+
+        indexing.create([Document(page_content="EBLA provides cloud services.")], collection_name="version-test")
+        version = serving.collection_version("version-test")
+        assert version == 1
+
+        cache = SemanticAnswerCache(max_size=8, similarity_threshold=0.9)
+        cache.store(("version-test", 3), version, [1.0, 0.0], "cached answer", SOURCES)
+
+        # A re-index through another manager (e.g. another worker process) bumps the stored version
+        indexing.invalidate_collection("version-test")
+        assert serving.collection_version("version-test") == 2
+        assert cache.lookup(("version-test", 3), serving.collection_version("version-test"), [1.0, 0.0]) is None
+
+
+class CountingClient:
+    """Chroma client proxy counting get_collection() calls."""
+
+    def __init__(self, client):
+        self.client = client
+        self.reads = 0
+
+    def get_collection(self, name):
+        self.reads += 1
+        return self.client.get_collection(name)
+
+    def __getattr__(self, name):
+        return getattr(self.client, name)
+
+
+def test_collection_version_is_cached_per_process():
+    cache = vector_store_module._collection_version_cache
+    original_ttl = cache.ttl_seconds
+    cache.ttl_seconds = 0.3
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            indexing, serving = TempVectorStore(directory), TempVectorStore(directory)
+            serving.client = CountingClient(serving.client)
+            indexing.create([Document(page_content="EBLA provides cloud services.")], collection_name="ttl-test")
+
+            # Chats read the version from the cache, not from Chroma
+            assert [serving.collection_version("ttl-test") for _ in range(20)] == [1] * 20
+            assert asyncio.run(serving.acollection_version("ttl-test")) == 1
+            assert serving.client.reads <= 1
+
+            # A bump in this process is seen at once
+            indexing.invalidate_collection("ttl-test")
+            assert serving.collection_version("ttl-test") == 2
+
+            # A bump by another process (written straight to Chroma) is seen once the cached read expires
+            indexing.client.get_collection("ttl-test").modify(metadata={VERSION_METADATA_KEY: 7})
+            assert serving.collection_version("ttl-test") == 2
+            time.sleep(0.35)
+            assert asyncio.run(serving.acollection_version("ttl-test")) == 7
+    finally:
+        cache.ttl_seconds = original_ttl
+
+
+def test_rag_service_skips_llm_on_cache_hit():
+    vector_store, llm = StubVectorStore(), StubLLM("EBLA provides cloud services.")
+    service = build_stub_service(vector_store=vector_store, llm=llm)
+
+    request = ChatRequest(query="What services does EBLA provide?", collection_name="answer-cache-test")
+    first = service.process_chat(request)
+    second = service.process_chat(request)
+
+    print(f"LLM calls: {llm.calls}, searches: {vector_store.searches}")
+    assert llm.calls == 1
+    assert vector_store.searches == 1
+    assert not first.validation.answer_cache_hit
+    assert second.validation.answer_cache_hit
+    assert second.answer == first.answer
+    assert len(second.sources) == 1
+
+
+if __name__ == "__main__":
+    test_similarity_threshold_and_scope()
+    test_reindex_invalidates_entries()
+    test_collection_version_is_stored_with_the_collection()
+    test_collection_version_is_cached_per_process()
+    test_rag_service_skips_llm_on_cache_hit()
+    print("Answer cache tests passed")
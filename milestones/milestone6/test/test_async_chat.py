@@ -0,0 +1,93 @@
+"""
+Concurrency test for RAGService.aprocess_chat.
+
+Runs N simultaneous chats against blocking (time.sleep) embedding/search stubs
+and an async LLM stub, and checks that they overlap instead of serializing and
+that the event loop stays responsive (e.g. for /health) while they run.
+No Ollama, Chroma or SQL Server is needed.
+"""
+
+import asyncio
+import time
+
+from stubs import build_stub_service
+from services.rag_service import RAGService
+from services.vector_store import VectorStoreManager
+from schemas.chat_schema import ChatRequest
+
+CONCURRENT_CHATS = 4
+EMBED_SECONDS = 0.05
+SEARCH_SECONDS = 0.05
+LLM_SECONDS = 0.3
+
+
+class BlockingVectorStore(VectorStoreManager):
+    """VectorStoreManager whose encoder and Chroma query block like the real ones."""
+
+    def __init__(self):
+        # Skip loading the embedding model and Chroma client
+        self.persist_directory = "./stub_chroma"
+        self.embedding_model = "stub-model"
+
+    def embed_query(self, query):
+        time.sleep(EMBED_SECONDS)
+        # One-hot per question so the answer cache never matches across them
+        embedding = [0.0] * CONCURRENT_CHATS
+        embedding[int(query.split()[-1])] = 1.0
+        return embedding
+
+    def search_by_vector(self, embedding, collection_name="documents", k=3):
+        time.sleep(SEARCH_SECONDS)
+        return [{"document": "EBLA provides cloud services.", "metadata": {"source": "stub"}, "distance": 0.1}]
+
+
+class AsyncStubLLM:
+    """Async LLM stub that yields to the event loop while 'generating'."""
+
+    async def agenerate(self, prompt, system=None):
+        await asyncio.sleep(LLM_SECONDS)
+        return "stub answer"
+
+
+def _build_service() -> RAGService:
+    return build_stub_service(vector_store=BlockingVectorStore(), llm=AsyncStubLLM())
+
+
+async def _run_concurrent_chats():
+    service = _build_service()
+    requests = [ChatRequest(query=f"Question {i}") for i in range(CONCURRENT_CHATS)]
+
+    # Heartbeat measuring how late the loop wakes up while chats are running
+    max_lag = 0.0
+    stop = asyncio.Event()
+
+    async def heartbeat():
+        nonlocal max_lag
+        while not stop.is_set():
+            start = time.perf_counter()
+            await asyncio.sleep(0.01)
+            max_lag = max(max_lag, time.perf_counter() - start - 0.01)
+
+    beat = asyncio.create_task(heartbeat())
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(service.aprocess_chat(r) for r in requests))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await beat
+    return responses, elapsed, max_lag
+
+
+def test_concurrent_chats_overlap():
+    responses, elapsed, max_lag = asyncio.run(_run_concurrent_chats())
+    serial = CONCURRENT_CHATS * (EMBED_SECONDS + SEARCH_SECONDS + LLM_SECONDS)
+
+    print(f"{CONCURRENT_CHATS} chats: {elapsed:.2f}s concurrent vs {serial:.2f}s serialized")
+    print(f"Max event-loop lag: {max_lag * 1000:.1f} ms")
+
+    assert all(r.answer == "stub answer" for r in responses)
+    assert elapsed < serial / 2, "Chats serialized instead of overlapping"
+    assert max_lag < 0.05, "Event loop was blocked by chat processing"
+
+
+if __name__ == "__main__":
+    test_concurrent_chats_overlap()
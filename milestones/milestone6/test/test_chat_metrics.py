@@ -0,0 +1,96 @@
+"""
+Tests for per-stage chat latency metrics, the Server-Timing header and /metrics.
+
+Uses stub vector store, LLM and repositories, so no Ollama, Chroma or SQL Server is needed.
+"""
+
+import asyncio
+
+from stubs import StubLLM, StubVectorStore, build_stub_service
+import httpx
+import pytest
+from app import app
+from services.container import get_rag_service
+from services.rag_service import PROMPT_CHARS, STAGE_SECONDS
+from services.vector_store import CACHE_LOOKUPS
+from utils.metrics import MetricsRegistry, StageTimer
+
+STAGES = ["session", "history", "search", "prompt", "llm", "persist", "validation"]
+
+
+def stub_rag_service():
+    return build_stub_service(
+        vector_store=StubVectorStore(embedding=(0.0, 1.0)),
+        llm=StubLLM("EBLA provides cloud services.")
+    )
+
+
+def _parse_server_timing(header):
+    timings = {}
+    for entry in header.split(","):
+        name, duration = entry.strip().split(";dur=")
+        timings[name] = float(duration)
+    return timings
+
+
+def test_stage_timer_records_durations_and_failures():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("stage_seconds", "Stage time", labelnames=("stage",))
+    failures = registry.counter("stage_failures_total", "Stage failures", labelnames=("stage",))
+    timer = StageTimer(histogram, failures)
+
+    with timer.stage("search"):
+        pass
+    with pytest.raises(RuntimeError):
+        with timer.stage("llm"):
+            raise RuntimeError("Ollama unavailable")
+    timer.record("search", 0.5)
+
+    assert list(timer.durations) == ["search", "llm"]
+    assert timer.durations["search"] >= 0.5
+    assert histogram.count(stage="search") == 2 and histogram.count(stage="llm") == 1
+    assert failures.value(stage="llm") == 1 and failures.value(stage="search") == 0
+    assert _parse_server_timing(timer.server_timing()).keys() == {"search", "llm"}
+
+
+def test_chat_reports_stages_in_server_timing_and_metrics():
+    async def two_turns():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            body = {"query": "What does EBLA offer?", "collection_name": "chat-metrics"}
+            first = await client.post("/api/v1/chat", json=body)
+            # Same question again: answered from the answer cache, so no LLM stage
+            second = await client.post("/api/v1/chat", json=body)
+            metrics = await client.get("/metrics")
+        return first, second, metrics
+
+    llm_before = STAGE_SECONDS.count(stage="llm")
+    hits_before = CACHE_LOOKUPS.value(cache="answer", result="hit")
+    prompts_before = PROMPT_CHARS.count()
+
+    app.dependency_overrides[get_rag_service] = stub_rag_service
+    try:
+        first, second, metrics = asyncio.run(two_turns())
+    finally:
+        app.dependency_overrides.clear()
+
+    assert first.status_code == second.status_code == 200
+    first_timings = _parse_server_timing(first.headers["Server-Timing"])
+    assert list(first_timings) == STAGES
+    assert all(duration >= 0 for duration in first_timings.values())
+    assert "llm" not in _parse_server_timing(second.headers["Server-Timing"])
+
+    assert STAGE_SECONDS.count(stage="llm") == llm_before + 1
+    assert CACHE_LOOKUPS.value(cache="answer", result="hit") == hits_before + 1
+    assert PROMPT_CHARS.count() == prompts_before + 2
+    for stage in STAGES:
+        assert f'chat_stage_duration_seconds_count{{stage="{stage}"}}' in metrics.text
+    assert 'chat_cache_lookups_total{cache="answer",result="hit"}' in metrics.text
+    assert "chat_prompt_chars_sum" in metrics.text
+    assert "llm_generated_tokens_total" in metrics.text
+
+
+if __name__ == "__main__":
+    test_stage_timer_records_durations_and_failures()
+    test_chat_reports_stages_in_server_timing_and_metrics()
+    print("Chat metrics tests passed")
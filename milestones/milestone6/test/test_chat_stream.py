@@ -0,0 +1,106 @@
+"""
+Test for the SSE streaming chat endpoint (POST /api/v1/chat/stream).
+
+Uses stub vector store, LLM and repositories, so no Ollama, Chroma or SQL Server is needed.
+"""
+
+import asyncio
+import json
+
+from stubs import StubMessageRepo, build_stub_service
+from fastapi.testclient import TestClient
+from app import app
+from services.container import get_rag_service
+
+TOKENS = ["EBLA ", "provides ", "cloud ", "services."]
+
+
+class StubStreamingLLM:
+    def __init__(self, fail_after=None):
+        self.fail_after = fail_after
+
+    async def astream(self, prompt, system=None):
+        for i, token in enumerate(TOKENS):
+            if self.fail_after is not None and i == self.fail_after:
+                raise RuntimeError("Ollama went away")
+            await asyncio.sleep(0)
+            yield token
+
+
+def _client_with(llm, message_repo=None):
+    message_repo = message_repo if message_repo is not None else StubMessageRepo()
+    app.dependency_overrides[get_rag_service] = lambda: build_stub_service(llm=llm, message_repo=message_repo)
+    return TestClient(app), message_repo
+
+
+def _parse_events(body: str):
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+
+def test_stream_emits_tokens_then_done():
+    client, message_repo = _client_with(StubStreamingLLM())
+    try:
+        response = client.post(
+            "/api/v1/chat/stream",
+            json={"query": "What does EBLA provide?", "collection_name": "stream-ok"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+
+    events = _parse_events(response.text)
+    tokens = [data["content"] for name, data in events if name == "token"]
+    name, final = events[-1]
+    print(f"Received {len(tokens)} token events, final event: {name}")
+
+    assert tokens == TOKENS
+    assert name == "done"
+    assert final["answer"] == "".join(TOKENS)
+    assert final["sources"][0]["metadata"]["source"] == "stub"
+    assert final["validation"]["context_sources"] == 1
+    assert final["time_to_first_token_ms"] is not None
+    assert message_repo.saved == [("user", "What does EBLA provide?"), ("assistant", "".join(TOKENS))]
+
+
+def test_stream_persists_partial_answer_on_failure():
+    client, message_repo = _client_with(StubStreamingLLM(fail_after=2))
+    try:
+        response = client.post(
+            "/api/v1/chat/stream",
+            json={"query": "What does EBLA provide?", "collection_name": "stream-fail"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    events = _parse_events(response.text)
+    assert events[-1][0] == "error"
+    assert message_repo.saved[-1] == ("assistant", "".join(TOKENS[:2]))
+
+
+def test_stream_reports_error_when_new_session_is_not_saved():
+    client, _ = _client_with(StubStreamingLLM(), StubMessageRepo(fail_saves=True))
+    try:
+        response = client.post(
+            "/api/v1/chat/stream",
+            json={"query": "What does EBLA provide?", "collection_name": "stream-unsaved"}
+        )
+    finally:
+        app.dependency_overrides.clear()
+
+    # No "done" event, so the client never gets the ID of a session that was not written
+    events = _parse_events(response.text)
+    assert events[-1] == ("error", {"detail": "Failed to save chat session"})
+    assert all(name != "done" for name, _ in events)
+
+
+if __name__ == "__main__":
+    test_stream_emits_tokens_then_done()
+    test_stream_persists_partial_answer_on_failure()
+    test_stream_reports_error_when_new_session_is_not_saved()
+    print("Streaming tests passed")
@@ -0,0 +1,101 @@
+"""
+Tests for connection pool configuration, pool checkout metrics and read-replica routing.
+
+Uses temporary SQLite databases, so no SQL Server is needed.
+"""
+
+import os
+import tempfile
+
+import stubs  # noqa: F401  (path and test environment)
+import pytest
+from sqlalchemy import create_engine, event, exc
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from config import settings
+from repositories.database import db_connection
+from repositories.database.db_connection import (
+    POOL_CHECKED_OUT,
+    POOL_CHECKOUT_SECONDS,
+    POOL_TIMEOUTS,
+    InstrumentedQueuePool,
+    create_pooled_engine,
+    get_read_db
+)
+from repositories.database.migrations import migrate
+from repositories.message_repository import MessageRepository
+
+
+def test_pool_settings_and_checkout_metrics():
+    # In-memory SQLite has no pool to size
+    assert not isinstance(create_pooled_engine("sqlite://", "memory").pool, InstrumentedQueuePool)
+
+    original = (settings.db_pool_size, settings.db_max_overflow, settings.db_pool_timeout_seconds)
+    settings.db_pool_size, settings.db_max_overflow, settings.db_pool_timeout_seconds = 1, 0, 0.1
+    try:
+        with tempfile.TemporaryDirectory() as workdir:
+            engine = create_pooled_engine(f"sqlite:///{os.path.join(workdir, 'pool.db')}", "pool-test")
+            assert isinstance(engine.pool, InstrumentedQueuePool)
+            assert (engine.pool.size(), engine.pool.timeout()) == (1, 0.1)
+
+            checkouts = POOL_CHECKOUT_SECONDS.count(engine="pool-test")
+            held = engine.connect()
+            assert POOL_CHECKED_OUT.value(engine="pool-test") == 1
+
+            # The only connection is in use: the next checkout waits, then times out
+            with pytest.raises(exc.TimeoutError):
+                engine.connect()
+            assert POOL_TIMEOUTS.value(engine="pool-test") == 1
+            assert POOL_CHECKOUT_SECONDS.count(engine="pool-test") == checkouts + 2
+            assert POOL_CHECKOUT_SECONDS.sum(engine="pool-test") >= 0.1
+
+            held.close()
+            assert POOL_CHECKED_OUT.value(engine="pool-test") == 0
+
+            # The replacement pool after dispose() keeps counting, once per checkout
+            engine.dispose()
+            with engine.connect():
+                assert POOL_CHECKED_OUT.value(engine="pool-test") == 1
+            assert POOL_CHECKED_OUT.value(engine="pool-test") == 0
+            engine.dispose()
+    finally:
+        settings.db_pool_size, settings.db_max_overflow, settings.db_pool_timeout_seconds = original
+
+
+def _database():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def _attach_dbo(dbapi_connection, _):
+        dbapi_connection.execute("ATTACH DATABASE ':memory:' AS dbo")
+
+    migrate(engine)
+    return Session(engine)
+
+
+def test_history_reads_go_to_the_read_session():
+    primary, replica = _database(), _database()
+    MessageRepository(replica).add_turn("session-1", "On the replica?", "Yes.", new_session=True)
+
+    repo = MessageRepository(primary, replica)
+    repo.add_turn("session-1", "On the primary?", "Yes.", new_session=True)
+
+    assert [m.content for m in repo.get_messages_by_session("session-1")] == ["On the replica?", "Yes."]
+    assert [m.content for m in repo.get_recent_messages("session-1", limit=1)] == ["Yes."]
+    assert [m.content for m in MessageRepository(primary).get_messages_by_session("session-1")] == [
+        "On the primary?", "Yes."
+    ]
+
+
+def test_read_db_falls_back_to_the_primary_session():
+    # No DATABASE_READ_URL: history reads share the request's primary session
+    assert db_connection.ReadSessionLocal is None
+    primary = object()
+    assert next(get_read_db(db=primary)) is primary
+
+
+if __name__ == "__main__":
+    test_pool_settings_and_checkout_metrics()
+    test_history_reads_go_to_the_read_session()
+    test_read_db_falls_back_to_the_primary_session()
+    print("DB pool tests passed")
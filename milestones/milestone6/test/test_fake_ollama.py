@@ -0,0 +1,129 @@
+"""
+Test for the fake Ollama server: the real LLMModel and Ollama client run against it.
+
+Starts the server on a free local port, so no Ollama or model download is needed.
+"""
+
+import asyncio
+import time
+
+import stubs  # noqa: F401  (path and test environment)
+import pytest
+from ollama import Client, ResponseError
+from benchmarks.fake_ollama import FakeOllama, FakeOllamaConfig, FakeOllamaServer
+from services.llm_service import LLMModel
+
+
+def test_chat_generate_and_embed_are_deterministic():
+    config = FakeOllamaConfig(ttft_ms=10, tokens_per_second=1000, answer_tokens=8, embedding_dim=16)
+    with FakeOllamaServer(config) as server:
+        llm = LLMModel(base_url=server.url)
+        answer = llm.generate("What does EBLA offer?", system="You are helpful.")
+        assert answer == llm.generate("What does EBLA offer?", system="You are helpful.")
+        assert answer != llm.generate("Where is EBLA based?", system="You are helpful.")
+
+        async def stream():
+            fragments = [fragment async for fragment in llm.astream("What does EBLA offer?", system="You are helpful.")]
+            await llm.aclose()
+            return fragments
+
+        fragments = asyncio.run(stream())
+        assert len(fragments) == 8 and "".join(fragments) == answer
+
+        client = Client(host=server.url)
+        first = client.embed(model="fake", input=["EBLA cloud", "EBLA licensing"]).embeddings
+        assert len(first) == 2 and len(first[0]) == 16
+        assert client.embed(model="fake", input="EBLA cloud").embeddings[0] == first[0]
+        assert client.generate(model="fake", prompt="Hi").response
+
+        stats = llm.prefill_stats()
+        assert (stats["requests"], stats["generated_tokens"]) == (4, 8 * 4)
+
+
+def test_max_parallel_queues_generations():
+    config = FakeOllamaConfig(ttft_ms=100, tokens_per_second=1000, answer_tokens=2, max_parallel=2)
+    with FakeOllamaServer(config) as server:
+        llm = LLMModel(base_url=server.url)
+
+        async def burst():
+            try:
+                return await asyncio.gather(*(llm.agenerate(f"Question {i}") for i in range(4)))
+            finally:
+                await llm.aclose()
+
+        start = time.perf_counter()
+        asyncio.run(burst())
+        elapsed = time.perf_counter() - start
+
+        assert server.stats["max_active"] == 2
+        assert server.stats["generations"] == 4
+        # Two rounds of ~100 ms each
+        assert elapsed >= 0.2
+
+
+def test_prefix_reuse_reduces_prompt_eval():
+    config = FakeOllamaConfig(ttft_ms=0, tokens_per_second=1000, answer_tokens=1)
+    system = "You are an intelligent assistant for EBLA. " * 20
+    with FakeOllamaServer(config) as server:
+        llm = LLMModel(base_url=server.url)
+        llm.generate("First question?", system=system)
+        cold = llm.prefill_stats()["prompt_eval_tokens"]
+        llm.generate("Second question?", system=system)
+        warm = llm.prefill_stats()["prompt_eval_tokens"] - cold
+        assert warm < cold / 10
+
+
+def test_error_injection():
+    with FakeOllamaServer(FakeOllamaConfig(ttft_ms=0, error_rate=1.0, error_status=503)) as server:
+        with pytest.raises(ResponseError) as rejected:
+            LLMModel(base_url=server.url).generate("Hi")
+        assert rejected.value.status_code == 503
+
+    config = FakeOllamaConfig(ttft_ms=0, tokens_per_second=1000, midstream_error_rate=1.0)
+    with FakeOllamaServer(config) as server:
+        llm = LLMModel(base_url=server.url)
+
+        async def stream():
+            fragments = []
+            try:
+                async for fragment in llm.astream("Hi"):
+                    fragments.append(fragment)
+            finally:
+                await llm.aclose()
+            return fragments
+
+        with pytest.raises(ResponseError):
+            asyncio.run(stream())
+        assert server.stats["errors"] == 1
+
+
+def test_unconsumed_stream_releases_its_slot():
+    fake = FakeOllama(FakeOllamaConfig(ttft_ms=0, tokens_per_second=1000, max_parallel=1))
+
+    async def disconnect_before_streaming():
+        response = await fake.chat({"messages": [{"role": "user", "content": "Hi"}], "stream": True})
+        assert fake.stats["active"] == 1
+
+        async def receive():
+            return {"type": "http.disconnect"}
+
+        async def send(message):
+            # The client is gone before the headers are sent, so the body is never iterated
+            await asyncio.sleep(1)
+
+        await response({"type": "http", "asgi": {"spec_version": "2.0"}}, receive, send)
+        assert fake.stats["active"] == 0
+        # The only slot is free for the next generation
+        await asyncio.wait_for(fake.generate({"prompt": "Hi", "stream": False}), timeout=1)
+
+    asyncio.run(disconnect_before_streaming())
+    assert fake.stats["generations"] == 1 and fake.stats["active"] == 0
+
+
+if __name__ == "__main__":
+    test_chat_generate_and_embed_are_deterministic()
+    test_max_parallel_queues_generations()
+    test_prefix_reuse_reduces_prompt_eval()
+    test_error_injection()
+    test_unconsumed_stream_releases_its_slot()
+    print("Fake Ollama tests passed")
@@ -0,0 +1,166 @@
+"""
+Tests for BM25 keyword search and hybrid (dense + BM25) retrieval with reciprocal rank fusion.
+
+Uses a real temporary Chroma store with a stub embedder that only knows
+about "cloud", so exact terms such as agreement codes are invisible to it.
+No embedding model or Ollama is needed.
+"""
+
+import asyncio
+import os
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import stubs  # noqa: F401  (path and test environment)
+import chromadb
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+from services.keyword_index import BM25Index, reciprocal_rank_fusion, tokenize
+from services.vector_store import VectorStoreManager
+
+DOCUMENTS = [
+    Document(page_content="Ebla offers cloud migration services for enterprises.", metadata={"source": "services.txt"}),
+    Document(page_content="Licensing is handled under agreement EBLA-LIC-2049.", metadata={"source": "licensing.txt"}),
+    Document(page_content="Workflow automation reduces manual workloads.", metadata={"source": "workflow.txt"}),
+    Document(page_content="Cybersecurity solutions protect client infrastructure.", metadata={"source": "security.txt"}),
+]
+
+
+class CloudOnlyEmbeddings(Embeddings):
+    """Texts mentioning "cloud" point one way, everything else another."""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        return [1.0, 0.0, 0.0] if "cloud" in text.lower() else [0.0, 1.0, 0.0]
+
+
+class TempVectorStore(VectorStoreManager):
+    def __init__(self, persist_directory):
+        self.persist_directory = persist_directory
+        self.embedding_model = "cloud-only-stub"
+        self.embeddings = CloudOnlyEmbeddings()
+        self.client = chromadb.PersistentClient(path=persist_directory)
+
+
+def test_tokenize_keeps_codes_and_parts():
+    tokens = tokenize("Agreement EBLA-LIC-2049, v2.1")
+    assert "ebla-lic-2049" in tokens and "2049" in tokens and "v2.1" in tokens
+
+
+def test_bm25_ranks_exact_term_first_and_round_trips():
+    index = BM25Index()
+    index.add(
+        [str(i) for i in range(len(DOCUMENTS))],
+        [doc.page_content for doc in DOCUMENTS],
+        [doc.metadata for doc in DOCUMENTS]
+    )
+    results = index.search("What is agreement EBLA-LIC-2049?", k=2)
+    assert results[0]["metadata"]["source"] == "licensing.txt"
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "index.json")
+        index.save(path)
+        loaded = BM25Index.load(path)
+    assert loaded.search("cybersecurity", k=1)[0]["metadata"]["source"] == "security.txt"
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    a = {"document": "a", "metadata": {"source": "x"}, "distance": 0.1}
+    b = {"document": "b", "metadata": {"source": "x"}, "distance": 0.2}
+    c = {"document": "c", "metadata": {"source": "x"}, "score": 7.0}
+    fused = reciprocal_rank_fusion([[a, b], [b, c]], k=3)
+    assert [r["document"] for r in fused] == ["b", "a", "c"]
+    assert fused[0]["distance"] == 0.2
+
+
+def test_hybrid_search_finds_exact_terms_dense_misses():
+    with tempfile.TemporaryDirectory() as directory:
+        store = TempVectorStore(directory)
+        store.create(DOCUMENTS, collection_name="hybrid-test")
+        query = "Which agreement is LIC-2049?"
+        # Stand-in for a semantic model that maps the question near the wrong chunk
+        embedding = store.embed_query("cloud agreement")
+
+        dense = store.search_by_vector(embedding, "hybrid-test", k=1)
+        hybrid = store.hybrid_search(query, embedding, "hybrid-test", k=1)
+        async_hybrid = asyncio.run(store.ahybrid_search(query, embedding, "hybrid-test", k=1))
+
+        # A fresh process (empty cache) loads the persisted keyword index
+        store.invalidate_collection("hybrid-test")
+        assert os.path.exists(store.keyword_index_path("hybrid-test"))
+        reloaded = store.keyword_search(query, "hybrid-test", k=1)
+
+    assert dense[0]["metadata"]["source"] == "services.txt"
+    assert hybrid[0]["metadata"]["source"] == "licensing.txt"
+    assert hybrid[0]["distance"] is not None  # also retrieved by the vector search
+    assert async_hybrid[0]["metadata"]["source"] == "licensing.txt"
+    assert reloaded[0]["metadata"]["source"] == "licensing.txt"
+
+
+def test_second_create_appends_to_the_keyword_index():
+    with tempfile.TemporaryDirectory() as directory:
+        store = TempVectorStore(directory)
+        store.create(DOCUMENTS[:2], collection_name="append-test")
+        store.create(DOCUMENTS[2:], collection_name="append-test")
+
+        assert store.client.get_collection("append-test").count() == len(DOCUMENTS)
+        assert store.keyword_search("EBLA-LIC-2049", "append-test", k=1)[0]["metadata"]["source"] == "licensing.txt"
+        assert store.keyword_search("cybersecurity", "append-test", k=1)[0]["metadata"]["source"] == "security.txt"
+
+        # The saved index holds both batches as well
+        store.invalidate_collection("append-test")
+        assert len(store.get_keyword_index("append-test")) == len(DOCUMENTS)
+
+
+class CountingBuildStore(TempVectorStore):
+    """Counts keyword-index builds, each slow enough for concurrent searches to overlap it."""
+
+    def __init__(self, persist_directory):
+        super().__init__(persist_directory)
+        self.builds = 0
+
+    def build_keyword_index(self, collection_name="documents", page_size=1000):
+        self.builds += 1
+        time.sleep(0.2)
+        return super().build_keyword_index(collection_name, page_size)
+
+
+def test_concurrent_searches_build_a_dropped_keyword_index_once():
+    with tempfile.TemporaryDirectory() as directory:
+        store = CountingBuildStore(directory)
+        store.create(DOCUMENTS, collection_name="lazy-test")
+        # As after a pipeline run that changed the collection
+        store.drop_keyword_index("lazy-test")
+        store.builds = 0
+
+        start = threading.Barrier(8)
+
+        def search(_):
+            start.wait()
+            return store.keyword_search("EBLA-LIC-2049", "lazy-test", k=1)[0]["metadata"]["source"]
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            sources = list(pool.map(search, range(8)))
+
+        assert sources == ["licensing.txt"] * 8
+        assert store.builds == 1
+
+        # An eager rebuild replaces the cached index without waiting for a search
+        store.rebuild_keyword_index("lazy-test")
+        assert store.builds == 2
+        assert len(store.get_keyword_index("lazy-test")) == len(DOCUMENTS)
+        assert store.builds == 2
+
+
+if __name__ == "__main__":
+    test_tokenize_keeps_codes_and_parts()
+    test_bm25_ranks_exact_term_first_and_round_trips()
+    test_reciprocal_rank_fusion_rewards_agreement()
+    test_hybrid_search_finds_exact_terms_dense_misses()
+    test_second_create_appends_to_the_keyword_index()
+    test_concurrent_searches_build_a_dropped_keyword_index_once()
+    print("Hybrid retrieval tests passed")
@@ -0,0 +1,106 @@
+"""
+Tests for incremental, hash-based indexing in VectorStoreManager.create.
+
+Uses a real temporary Chroma store with a stub embedder that counts the
+texts it embeds, so no embedding model is needed.
+"""
+
+import tempfile
+
+import stubs  # noqa: F401  (path and test environment)
+import chromadb
+from langchain_core.documents import Document
+from services.vector_store import VectorStoreManager
+
+COLLECTION = "incremental-test"
+
+
+class CountingEmbeddings:
+    """Embedding stub that counts the texts it embeds."""
+
+    def __init__(self):
+        self.texts_embedded = 0
+
+    def embed_documents(self, texts):
+        self.texts_embedded += len(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text):
+        return [float(len(text)), 1.0]
+
+
+class TempVectorStore(VectorStoreManager):
+    def __init__(self, persist_directory):
+        self.persist_directory = persist_directory
+        self.embedding_model = "counting-stub"
+        self.embeddings = CountingEmbeddings()
+        self.client = chromadb.PersistentClient(path=persist_directory)
+
+
+def _chunks(source, paragraphs):
+    return [Document(page_content=text, metadata={"source": source}) for text in paragraphs]
+
+
+def _stored(store, source):
+    """Stored chunks of one source as {chunk_id: (chunk_index, text)}."""
+    stored = store.client.get_collection(COLLECTION).get(where={"source": source}, include=["metadatas", "documents"])
+    return {
+        chunk_id: (metadata["chunk_index"], text)
+        for chunk_id, metadata, text in zip(stored["ids"], stored["metadatas"], stored["documents"])
+    }
+
+
+SERVICES = [f"EBLA services paragraph {i}." for i in range(5)]
+PARTNERS = [f"EBLA partners paragraph {i}." for i in range(3)]
+
+
+def test_unchanged_rerun_embeds_and_writes_nothing():
+    with tempfile.TemporaryDirectory() as directory:
+        store = TempVectorStore(directory)
+        store.create(_chunks("services.txt", SERVICES) + _chunks("partners.txt", PARTNERS), COLLECTION)
+        embedded = store.embeddings.texts_embedded
+        version = store.collection_version(COLLECTION)
+
+        store.create(_chunks("services.txt", SERVICES) + _chunks("partners.txt", PARTNERS), COLLECTION)
+
+        assert embedded == len(SERVICES) + len(PARTNERS)
+        assert store.embeddings.texts_embedded == embedded
+        assert store.client.get_collection(COLLECTION).count() == embedded
+        # Nothing changed, so version-scoped caches (answers) stay valid
+        assert store.collection_version(COLLECTION) == version
+
+
+def test_changed_source_replaces_only_its_chunks():
+    with tempfile.TemporaryDirectory() as directory:
+        store = TempVectorStore(directory)
+        store.create(_chunks("services.txt", SERVICES) + _chunks("partners.txt", PARTNERS), COLLECTION)
+        partners_before = _stored(store, "partners.txt")
+        embedded = store.embeddings.texts_embedded
+
+        # A new first paragraph shifts the kept ones down; the last paragraph is dropped
+        edited = ["EBLA services introduction."] + SERVICES[:-1]
+        store.create(_chunks("services.txt", edited), COLLECTION)
+        services = _stored(store, "services.txt")
+
+        assert store.embeddings.texts_embedded - embedded == 1
+        assert sorted(services.values()) == list(enumerate(edited))
+        # Other sources keep their chunks
+        assert _stored(store, "partners.txt") == partners_before
+        # The keyword index follows: the dropped paragraph is gone, the new one is found
+        assert store.keyword_search(SERVICES[-1], COLLECTION, k=1)[0]["document"] != SERVICES[-1]
+        assert store.keyword_search("introduction", COLLECTION, k=1)[0]["document"] == edited[0]
+
+
+def test_identical_chunks_in_a_source_get_distinct_ids():
+    with tempfile.TemporaryDirectory() as directory:
+        store = TempVectorStore(directory)
+        store.create(_chunks("faq.txt", ["Contact EBLA.", "Pricing.", "Contact EBLA."]), COLLECTION)
+
+        assert [index for index, _ in sorted(_stored(store, "faq.txt").values())] == [0, 1, 2]
+
+
+if __name__ == "__main__":
+    test_unchanged_rerun_embeds_and_writes_nothing()
+    test_changed_source_replaces_only_its_chunks()
+    test_identical_chunks_in_a_source_get_distinct_ids()
+    print("Incremental indexing tests passed")
@@ -0,0 +1,208 @@
+"""
+Tests for the streaming ingestion pipeline.
+
+- Indexes a large synthetic corpus (generated lazily) through the pipeline with a
+  stub embedder and Chroma client (the keyword-index code is real), and checks
+  that peak traced memory stays under a cap and does not grow with corpus size.
+- Indexes a small directory into a real (temporary) Chroma collection and checks
+  that re-runs skip unchanged files and replace or remove the chunks of changed
+  and deleted ones.
+No embedding model or Ollama is needed.
+"""
+
+import os
+import tempfile
+import tracemalloc
+
+import stubs  # noqa: F401  (path and test environment)
+import chromadb
+from langchain_core.documents import Document
+from config import settings
+from services.ingestion_pipeline import IngestionPipeline
+from services.vector_store import VectorStoreManager
+from utils.text_processor import TextProcessor
+
+DOCUMENT_CHARS = 20_000
+SMALL_CORPUS_DOCS = 100     # ~2 MB of text
+LARGE_CORPUS_DOCS = 1_000   # ~20 MB of text
+MEMORY_CAP_BYTES = 4 * 1024 * 1024
+EMBEDDING_DIM = 8
+
+
+class StubEmbeddings:
+    def embed_documents(self, texts):
+        return [[float(len(text) % 7)] * EMBEDDING_DIM for text in texts]
+
+
+class CountingCollection:
+    """Chroma collection stub that discards writes (counts them only) and stores nothing."""
+
+    def __init__(self):
+        self.upserted = 0
+        self.metadata = None
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        assert len(ids) == len(embeddings) == len(documents) == len(metadatas)
+        self.upserted += len(ids)
+
+    def get(self, where=None, include=None):
+        return {"ids": [], "metadatas": []}
+
+    def modify(self, metadata):
+        self.metadata = metadata
+
+
+class CountingClient:
+    """Chroma client stub handing out one CountingCollection."""
+
+    def __init__(self):
+        self.collection = CountingCollection()
+
+    def get_or_create_collection(self, name, embedding_function=None):
+        return self.collection
+
+    def get_collection(self, name):
+        return self.collection
+
+
+class CountingVectorStore(VectorStoreManager):
+    """VectorStoreManager with a stub embedder and Chroma client; everything else is the real code."""
+
+    def __init__(self, persist_directory):
+        # Skip loading the embedding model and Chroma client
+        self.persist_directory = persist_directory
+        self.embedding_model = "stub-model"
+        self.embeddings = StubEmbeddings()
+        self.client = CountingClient()
+
+
+class ChromaStubVectorStore(VectorStoreManager):
+    """VectorStoreManager with a stub embedder and a real Chroma client."""
+
+    def __init__(self, persist_directory):
+        self.persist_directory = persist_directory
+        self.embedding_model = "stub-model"
+        self.embeddings = StubEmbeddings()
+        self.client = chromadb.PersistentClient(path=persist_directory)
+
+
+def _synthetic_corpus(count):
+    """Yield documents one at a time so the corpus itself is never held in memory."""
+    sentence = "EBLA provides cloud, infrastructure and training services to its customers. "
+    for i in range(count):
+        text = f"Document {i}. " + sentence * (DOCUMENT_CHARS // len(sentence))
+        yield Document(page_content=text, metadata={"source": f"synthetic/{i}.txt"})
+
+
+def _peak_memory(doc_count):
+    # Run with the keyword index on, so its ingestion path is measured too
+    original = settings.keyword_index_enabled
+    settings.keyword_index_enabled = True
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            vector_store = CountingVectorStore(directory)
+            pipeline = IngestionPipeline(vector_store, TextProcessor(500, 50), batch_size=128, queue_size=2)
+
+            tracemalloc.start()
+            try:
+                stats = pipeline.run(_synthetic_corpus(doc_count), collection_name="synthetic")
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+    finally:
+        settings.keyword_index_enabled = original
+
+    assert stats.documents == doc_count
+    assert stats.chunks == vector_store.client.collection.upserted > 0
+    return stats, peak
+
+
+def test_peak_memory_independent_of_corpus_size():
+    small_stats, small_peak = _peak_memory(SMALL_CORPUS_DOCS)
+    large_stats, large_peak = _peak_memory(LARGE_CORPUS_DOCS)
+    corpus_bytes = LARGE_CORPUS_DOCS * DOCUMENT_CHARS
+
+    print(f"Small corpus: {small_stats.chunks} chunks, peak {small_peak / 1e6:.1f} MB")
+    print(f"Large corpus: {large_stats.chunks} chunks ({corpus_bytes / 1e6:.0f} MB of text), "
+          f"peak {large_peak / 1e6:.1f} MB, {large_stats.chunks_per_second:.0f} chunks/s")
+
+    assert large_peak < MEMORY_CAP_BYTES, "Pipeline memory exceeded the cap"
+    assert large_peak < small_peak * 2, "Pipeline memory grows with corpus size"
+
+
+def _write(docs_dir, name, text):
+    with open(os.path.join(docs_dir, name), "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def _stored_texts(vector_store, docs_dir, name):
+    stored = vector_store.client.get_collection("pipeline-test").get(
+        where={"source": os.path.join(docs_dir, name)}, include=["documents", "metadatas"]
+    )
+    return [text for _, text in sorted(zip((m["chunk_index"] for m in stored["metadatas"]), stored["documents"]))]
+
+
+def test_rerun_skips_unchanged_files():
+    with tempfile.TemporaryDirectory() as directory:
+        docs_dir = os.path.join(directory, "docs")
+        os.makedirs(docs_dir)
+        for i in range(5):
+            _write(docs_dir, f"doc_{i}.txt", "EBLA provides cloud services. " * 60)
+
+        vector_store = ChromaStubVectorStore(os.path.join(directory, "chroma"))
+        pipeline = IngestionPipeline(vector_store, TextProcessor(500, 50), batch_size=4)
+        first = pipeline.index_directory(docs_dir, collection_name="pipeline-test", max_workers=2)
+        version = vector_store.collection_version("pipeline-test")
+        second = pipeline.index_directory(docs_dir, collection_name="pipeline-test", max_workers=2)
+        count = vector_store.client.get_collection("pipeline-test").count()
+        # index_directory rebuilt the keyword index, so no search has to
+        assert os.path.exists(vector_store.keyword_index_path("pipeline-test"))
+        keyword_results = vector_store.keyword_search("cloud services", collection_name="pipeline-test", k=count + 1)
+
+    assert first.chunks == first.chunks_embedded == count
+    assert (second.files_unchanged, second.files_indexed, second.chunks, second.chunks_embedded) == (5, 0, 0, 0)
+    # Nothing changed, so version-scoped caches (answers) stay valid
+    assert vector_store.collection_version("pipeline-test") == version
+    assert len(keyword_results) == count
+    assert first.batches > 1
+
+
+def test_changed_and_deleted_files_replace_their_chunks():
+    with tempfile.TemporaryDirectory() as directory:
+        docs_dir = os.path.join(directory, "docs")
+        os.makedirs(docs_dir)
+        paragraphs = [f"EBLA paragraph {i}. " * 20 for i in range(6)]
+        _write(docs_dir, "shrinking.txt", "\n\n".join(paragraphs))
+        _write(docs_dir, "edited.txt", "\n\n".join(paragraphs))
+        _write(docs_dir, "deleted.txt", "EBLA was founded long ago. " * 10)
+
+        vector_store = ChromaStubVectorStore(os.path.join(directory, "chroma"))
+        pipeline = IngestionPipeline(vector_store, TextProcessor(500, 0), batch_size=4)
+        pipeline.index_directory(docs_dir, collection_name="pipeline-test", max_workers=2)
+        assert _stored_texts(vector_store, docs_dir, "shrinking.txt") == [p.strip() for p in paragraphs]
+
+        _write(docs_dir, "shrinking.txt", "\n\n".join(paragraphs[:2]))
+        _write(docs_dir, "edited.txt", "\n\n".join(["EBLA introduction. " * 20] + paragraphs))
+        os.remove(os.path.join(docs_dir, "deleted.txt"))
+        stats = pipeline.index_directory(docs_dir, collection_name="pipeline-test", max_workers=2)
+
+        shrinking = _stored_texts(vector_store, docs_dir, "shrinking.txt")
+        edited = _stored_texts(vector_store, docs_dir, "edited.txt")
+        deleted = _stored_texts(vector_store, docs_dir, "deleted.txt")
+        keyword_results = vector_store.keyword_search("founded", collection_name="pipeline-test", k=1)
+
+    # The shrunk file's tail chunks are gone, the deleted file's chunks too
+    assert shrinking == [p.strip() for p in paragraphs[:2]]
+    assert deleted == [] and keyword_results == []
+    # Only the new paragraph was embedded; the others kept their chunks at their new positions
+    assert edited == [("EBLA introduction. " * 20).strip()] + [p.strip() for p in paragraphs]
+    assert (stats.files_indexed, stats.files_removed, stats.chunks_embedded) == (2, 1, 1)
+    assert stats.chunks_moved == len(paragraphs)
+    assert stats.chunks_deleted == len(paragraphs) - 2 + 1
+
+
+if __name__ == "__main__":
+    test_peak_memory_independent_of_corpus_size()
+    test_rerun_skips_unchanged_files()
+    test_changed_and_deleted_files_replace_their_chunks()
+    print("Ingestion pipeline tests passed")
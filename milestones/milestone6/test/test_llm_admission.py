@@ -0,0 +1,228 @@
+"""
+Tests for LLM admission control (concurrency limit, bounded queue, 429 backpressure).
+
+Uses an async LLM stub and stub repositories, so no Ollama, Chroma or SQL Server is needed.
+"""
+
+import asyncio
+import threading
+import time
+
+from stubs import StubVectorStore, build_stub_service
+import httpx
+import pytest
+from fastapi import HTTPException
+from app import app
+from config import settings
+from schemas.chat_schema import ChatRequest
+from services.container import get_rag_service
+from services.llm_admission import REJECTED, LLMAdmissionController, LLMOverloadedError
+
+
+class OneHotVectorStore(StubVectorStore):
+    def embed_query(self, query):
+        # One-hot per question so the answer cache never matches across them
+        embedding = [0.0] * 3
+        embedding[int(query.split()[-1])] = 1.0
+        return embedding
+
+
+async def _hold(controller, seconds, log, name):
+    async with controller.slot():
+        log.append(f"{name} start")
+        await asyncio.sleep(seconds)
+        log.append(f"{name} end")
+
+
+def test_queue_admits_in_order_and_rejects_when_full():
+    async def scenario():
+        controller = LLMAdmissionController(max_concurrency=1, max_queue=1, max_wait_seconds=1.0)
+        log = []
+        first = asyncio.create_task(_hold(controller, 0.1, log, "a"))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(_hold(controller, 0.01, log, "b"))
+        await asyncio.sleep(0.01)
+        assert (controller.active, controller.waiting) == (1, 1)
+
+        with pytest.raises(LLMOverloadedError) as rejected:
+            async with controller.slot():
+                pass
+        await asyncio.gather(first, second)
+        return log, rejected.value
+
+    before = REJECTED.value(reason="queue_full")
+    log, error = asyncio.run(scenario())
+
+    assert log == ["a start", "a end", "b start", "b end"]
+    assert error.reason == "queue_full" and error.retry_after >= 1
+    assert REJECTED.value(reason="queue_full") == before + 1
+
+
+def test_waiting_too_long_is_rejected():
+    async def scenario():
+        controller = LLMAdmissionController(max_concurrency=1, max_queue=4, max_wait_seconds=0.05)
+        holder = asyncio.create_task(_hold(controller, 0.2, [], "a"))
+        await asyncio.sleep(0.01)
+        try:
+            with pytest.raises(LLMOverloadedError) as rejected:
+                async with controller.slot():
+                    pass
+        finally:
+            await holder
+        assert controller.waiting == 0
+        return rejected.value
+
+    assert asyncio.run(scenario()).reason == "queue_timeout"
+
+
+def test_blocking_and_async_callers_share_the_slots():
+    async def scenario():
+        controller = LLMAdmissionController(max_concurrency=1, max_queue=2, max_wait_seconds=1.0)
+        log = []
+        entered = threading.Event()
+
+        def hold_blocking():
+            with controller.blocking_slot():
+                log.append("sync start")
+                entered.set()
+                threading.Event().wait(0.1)
+                log.append("sync end")
+
+        thread = threading.Thread(target=hold_blocking)
+        thread.start()
+        await asyncio.to_thread(entered.wait)
+        # Woken by the worker thread once it hands its slot over
+        await _hold(controller, 0.01, log, "async")
+        await asyncio.to_thread(thread.join)
+        return controller, log
+
+    controller, log = asyncio.run(scenario())
+    assert log == ["sync start", "sync end", "async start", "async end"]
+    assert (controller.active, controller.waiting) == (0, 0)
+
+
+class SlowCheckController(LLMAdmissionController):
+    """check() slow enough for every concurrent caller to pass it before any of them queues."""
+
+    def check(self):
+        super().check()
+        time.sleep(0.1)
+
+
+def test_concurrent_callers_never_overfill_the_queue():
+    controller = SlowCheckController(max_concurrency=1, max_queue=2, max_wait_seconds=5.0)
+    callers = 16
+    start = threading.Barrier(callers)
+    outcomes = []
+
+    def call():
+        start.wait()
+        try:
+            with controller.blocking_slot():
+                outcomes.append("admitted")
+        except LLMOverloadedError as e:
+            outcomes.append(e.reason)
+
+    with controller.blocking_slot():
+        threads = [threading.Thread(target=call) for _ in range(callers)]
+        for thread in threads:
+            thread.start()
+        # Everyone beyond the two queue places is turned away while the slot is held
+        deadline = time.monotonic() + 5
+        while len(outcomes) < callers - 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert controller.waiting == 2
+    for thread in threads:
+        thread.join()
+
+    assert sorted(outcomes) == ["admitted"] * 2 + ["queue_full"] * (callers - 2)
+    assert (controller.active, controller.waiting) == (0, 0)
+
+
+def test_sync_chat_waits_for_a_slot_and_returns_429():
+    controller = LLMAdmissionController(max_concurrency=1, max_queue=0, max_wait_seconds=1.0)
+    service = build_stub_service(vector_store=OneHotVectorStore(), llm_admission=controller)
+
+    with controller.blocking_slot():
+        with pytest.raises(HTTPException) as rejected:
+            service.process_chat(ChatRequest(query="Question 1", collection_name="admission-sync"))
+    assert rejected.value.status_code == 429
+    assert int(rejected.value.headers["Retry-After"]) >= 1
+
+    response = service.process_chat(ChatRequest(query="Question 2", collection_name="admission-sync"))
+    assert response.answer == "stub answer"
+    assert controller.active == 0
+
+
+def test_default_limits_are_split_across_processes():
+    original = settings.llm_processes
+    settings.llm_processes = 2
+    try:
+        controller = LLMAdmissionController()
+    finally:
+        settings.llm_processes = original
+    assert controller.max_concurrency == max(1, settings.llm_max_concurrency // 2)
+    assert controller.max_queue == settings.llm_max_queue // 2
+
+
+class BlockedLLM:
+    """Generates only once released, so the first request holds the only slot."""
+
+    def __init__(self):
+        self.release = None
+
+    async def agenerate(self, prompt, system=None):
+        await self.release.wait()
+        return "stub answer"
+
+
+def test_chat_endpoint_returns_429_with_retry_after():
+    controller = LLMAdmissionController(max_concurrency=1, max_queue=0, max_wait_seconds=1.0)
+    llm = BlockedLLM()
+
+    def stub_rag_service():
+        return build_stub_service(vector_store=OneHotVectorStore(), llm=llm, llm_admission=controller)
+
+    async def burst():
+        llm.release = asyncio.Event()
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            tasks = [
+                asyncio.create_task(
+                    client.post("/api/v1/chat", json={"query": f"Question {i}", "collection_name": "admission"})
+                )
+                for i in range(3)
+            ]
+            # The two requests that find the slot taken come back while the first is still generating
+            done, pending = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+            while len(done) < 2:
+                more, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                done |= more
+            llm.release.set()
+            responses = await asyncio.gather(*tasks)
+            metrics = await client.get("/metrics")
+        return responses, metrics
+
+    app.dependency_overrides[get_rag_service] = stub_rag_service
+    try:
+        responses, metrics = asyncio.run(burst())
+    finally:
+        app.dependency_overrides.clear()
+
+    statuses = sorted(response.status_code for response in responses)
+    assert statuses == [200, 429, 429]
+    rejected = next(response for response in responses if response.status_code == 429)
+    assert int(rejected.headers["Retry-After"]) >= 1
+    assert 'llm_admission_rejected_total{reason="queue_full"}' in metrics.text
+    assert "llm_queue_wait_seconds_bucket" in metrics.text
+
+
+if __name__ == "__main__":
+    test_queue_admits_in_order_and_rejects_when_full()
+    test_waiting_too_long_is_rejected()
+    test_blocking_and_async_callers_share_the_slots()
+    test_concurrent_callers_never_overfill_the_queue()
+    test_sync_chat_waits_for_a_slot_and_returns_429()
+    test_default_limits_are_split_across_processes()
+    test_chat_endpoint_returns_429_with_retry_after()
+    print("LLM admission tests passed")
@@ -0,0 +1,87 @@
+"""
+Tests for the Ollama chat-API client in LLMModel.
+
+Ollama is replaced by an httpx mock transport that records the request bodies,
+so no Ollama server is needed.
+"""
+
+import asyncio
+import json
+
+import stubs  # noqa: F401  (path and test environment)
+import httpx
+from ollama import AsyncClient, Client
+from config import settings
+from services.llm_service import GENERATED_TOKENS, LLMModel
+from utils.prompt_builder import SYSTEM_PROMPT, build_rag_prompt
+
+
+def _chat_response(content, done=True):
+    return {
+        "model": settings.llm_model_name,
+        "created_at": "2025-11-28T09:00:00Z",
+        "message": {"role": "assistant", "content": content},
+        "done": done,
+        "prompt_eval_count": 12 if done else None,
+        "eval_count": 5 if done else None,
+        "prompt_eval_duration": 30_000_000 if done else None,
+        "load_duration": 1_000_000 if done else None,
+    }
+
+
+def _llm_with_mock_ollama():
+    bodies = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        bodies.append(body)
+        if body.get("stream"):
+            lines = [_chat_response("Hello ", done=False), _chat_response("there.")]
+            return httpx.Response(200, content="\n".join(json.dumps(line) for line in lines))
+        return httpx.Response(200, json=_chat_response("stub answer"))
+
+    llm = LLMModel()
+    llm.client = Client(host=llm.base_url, transport=httpx.MockTransport(handler))
+    llm.async_client = AsyncClient(host=llm.base_url, transport=httpx.MockTransport(handler))
+    return llm, bodies
+
+
+def test_system_prompt_is_a_stable_leading_message():
+    llm, bodies = _llm_with_mock_ollama()
+    for query in ("What does Ebla offer?", "Where is Ebla based?"):
+        prompt = build_rag_prompt(query, [{"content": f"Context for {query}", "metadata": {}, "score": 0.1}])
+        assert asyncio.run(llm.agenerate(prompt.user, system=prompt.system)) == "stub answer"
+
+    first, second = bodies
+    # Identical leading message on every request, so Ollama can reuse the cached prefix
+    assert first["messages"][0] == second["messages"][0] == {"role": "system", "content": SYSTEM_PROMPT}
+    assert first["messages"][1]["role"] == "user"
+    assert first["messages"][1]["content"] != second["messages"][1]["content"]
+    assert first["keep_alive"] == settings.llm_keep_alive
+    assert first["options"]["temperature"] == settings.llm_temperature
+
+
+def test_prefill_stats_and_streaming():
+    llm, bodies = _llm_with_mock_ollama()
+    tokens_before = GENERATED_TOKENS.value()
+    assert llm.generate("Summarize this.") == "stub answer"
+    assert bodies[0]["messages"] == [{"role": "user", "content": "Summarize this."}]
+
+    async def collect():
+        return [fragment async for fragment in llm.astream("Hi", system=SYSTEM_PROMPT)]
+
+    assert asyncio.run(collect()) == ["Hello ", "there."]
+
+    stats = llm.prefill_stats()
+    assert stats["requests"] == 2
+    assert stats["prompt_eval_tokens"] == 24
+    assert stats["mean_prompt_eval_ms"] == 30.0
+    assert stats["mean_load_ms"] == 1.0
+    assert stats["generated_tokens"] == 10
+    assert GENERATED_TOKENS.value() == tokens_before + 10
+
+
+if __name__ == "__main__":
+    test_system_prompt_is_a_stable_leading_message()
+    test_prefill_stats_and_streaming()
+    print("LLM chat client tests passed")
@@ -0,0 +1,66 @@
+"""Test for LRUCache."""
+
+import os
+import sys
+import time
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from utils.cache import LRUCache, normalize_query
+
+
+def test_lru_eviction_and_counters():
+    cache = LRUCache(max_size=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+
+    # Touch "a" so "b" becomes least recently used
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+
+    assert "b" not in cache
+    assert cache.get("b") is None
+    assert cache.get("c") == 3
+
+    stats = cache.stats()
+    print(f"Cache stats: {stats}")
+    assert stats["hits"] == 2
+    assert stats["misses"] == 1
+    assert stats["evictions"] == 1
+    assert stats["size"] == 2
+
+
+def test_lru_invalidation():
+    cache = LRUCache(max_size=8)
+    cache.put(("./chroma_db", "documents", "model-a"), "handle-1")
+    cache.put(("./chroma_db", "other", "model-a"), "handle-2")
+
+    assert cache.invalidate(("./chroma_db", "documents", "model-a"))
+    assert not cache.invalidate(("./chroma_db", "documents", "model-a"))
+
+    removed = cache.invalidate_where(lambda key: key[1] == "other")
+    assert removed == 1
+    assert len(cache) == 0
+
+
+def test_lru_ttl_expiry():
+    cache = LRUCache(max_size=8, ttl_seconds=0.05)
+    cache.put("q", [0.1, 0.2])
+    assert cache.get("q") == [0.1, 0.2]
+
+    time.sleep(0.06)
+    assert cache.get("q") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_normalize_query():
+    assert normalize_query("  What services does   EBLA provide? ") == "what services does ebla provide?"
+
+
+if __name__ == "__main__":
+    test_lru_eviction_and_counters()
+    test_lru_invalidation()
+    test_lru_ttl_expiry()
+    test_normalize_query()
+    print("LRUCache tests passed")
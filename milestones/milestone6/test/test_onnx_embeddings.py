@@ -0,0 +1,99 @@
+"""
+Tests for the ONNX Runtime embedding backend.
+
+The pooling test uses a stub session and a word-level tokenizer, so it needs no
+model. The parity test compares against the sentence-transformers (PyTorch)
+backend and is skipped when torch or the model files are not available.
+"""
+
+import stubs  # noqa: F401  (path and test environment)
+import numpy as np
+import pytest
+from tokenizers import Tokenizer, models, pre_tokenizers
+from services.embeddings import OnnxEmbeddings, build_embeddings
+
+SENTENCES = [
+    "EBLA provides cloud migration services.",
+    "Licensing is handled under agreement EBLA-LIC-2049.",
+    "Workflow automation reduces manual workloads.",
+    "Cybersecurity solutions protect client infrastructure.",
+    "Where in the Middle East does Ebla operate?",
+]
+
+VOCAB = {"[PAD]": 0, "[UNK]": 1, "cloud": 2, "security": 3, "ebla": 4}
+
+
+class _Input:
+    def __init__(self, name):
+        self.name = name
+
+
+class OneHotSession:
+    """Returns each token's one-hot vector as its hidden state (padding gets a large spike)."""
+
+    def get_inputs(self):
+        return [_Input("input_ids"), _Input("attention_mask")]
+
+    def run(self, output_names, inputs):
+        assert set(inputs) == {"input_ids", "attention_mask"}
+        hidden = np.eye(len(VOCAB), dtype=np.float32)[inputs["input_ids"]]
+        hidden[inputs["attention_mask"] == 0] = 100.0
+        return [hidden]
+
+
+def _word_tokenizer():
+    tokenizer = Tokenizer(models.WordLevel(VOCAB, unk_token="[UNK]"))
+    tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer.enable_padding(pad_id=0, pad_token="[PAD]")
+    return tokenizer
+
+
+def _cosine(a, b):
+    a, b = np.asarray(a), np.asarray(b)
+    return float(a @ b / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def test_mean_pooling_ignores_padding_and_keeps_order():
+    embeddings = OnnxEmbeddings(session=OneHotSession(), tokenizer=_word_tokenizer(), batch_size=2)
+    texts = ["security", "ebla cloud cloud", "cloud"]
+    vectors = embeddings.embed_documents(texts)
+
+    # Mean of the one-hot tokens, normalized; padding (the 100.0 spikes) must not leak in
+    expected_ebla_cloud = np.zeros(len(VOCAB))
+    expected_ebla_cloud[[VOCAB["ebla"], VOCAB["cloud"]]] = [1, 2]
+    expected_ebla_cloud /= np.linalg.norm(expected_ebla_cloud)
+
+    assert np.allclose(vectors[0], np.eye(len(VOCAB))[VOCAB["security"]])
+    assert np.allclose(vectors[1], expected_ebla_cloud)
+    assert np.allclose(vectors[2], np.eye(len(VOCAB))[VOCAB["cloud"]])
+    assert np.allclose(embeddings.embed_query("security"), vectors[0])
+
+
+def _onnx_or_skip(**kwargs):
+    try:
+        return OnnxEmbeddings(**kwargs)
+    except Exception as e:
+        pytest.skip(f"ONNX model not available: {e}")
+
+
+@pytest.mark.parametrize("quantize, min_similarity", [(False, 0.99), (True, 0.95)])
+def test_onnx_matches_torch_backend(quantize, min_similarity):
+    pytest.importorskip("sentence_transformers")
+    if quantize:
+        pytest.importorskip("onnx")
+    onnx_embeddings = _onnx_or_skip(quantize=quantize)
+    torch_embeddings = build_embeddings(backend="torch")
+
+    onnx_vectors = onnx_embeddings.embed_documents(SENTENCES)
+    torch_vectors = torch_embeddings.embed_documents(SENTENCES)
+    similarities = [_cosine(a, b) for a, b in zip(onnx_vectors, torch_vectors)]
+    print(f"quantize={quantize}: min cosine similarity to torch {min(similarities):.4f}")
+
+    assert min(similarities) >= min_similarity
+
+
+if __name__ == "__main__":
+    test_mean_pooling_ignores_padding_and_keeps_order()
+    test_onnx_matches_torch_backend(False, 0.99)
+    test_onnx_matches_torch_backend(True, 0.95)
+    print("ONNX embedding tests passed")
@@ -0,0 +1,95 @@
+"""
+Test for the parallel, streaming DocumentLoader mode.
+
+Parses a temporary directory with good text files and a corrupt PDF in a
+process pool, and checks that the bad file is reported without aborting the run,
+also when the file kills its worker process.
+"""
+
+import os
+import sys
+import tempfile
+
+# Add parent directory to path to allow importing modules
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+from services import document_loader
+from services.document_loader import DocumentLoader
+
+TEXT_FILES = 6
+
+
+def _write_corpus(directory: str) -> None:
+    for i in range(TEXT_FILES):
+        with open(os.path.join(directory, f"doc_{i}.txt"), "w", encoding="utf-8") as f:
+            f.write(f"Document {i} about EBLA services.")
+    with open(os.path.join(directory, "broken.pdf"), "wb") as f:
+        f.write(b"this is not a pdf")
+
+
+def test_parallel_loader_reports_errors_and_times():
+    with tempfile.TemporaryDirectory() as directory:
+        _write_corpus(directory)
+        loader = DocumentLoader(directory)
+        results = list(loader.iter_file_results(max_workers=2))
+
+    failed = [r for r in results if r.error]
+    loaded = [r for r in results if not r.error]
+    for r in results:
+        print(f"{os.path.basename(r.path)}: {r.parse_seconds * 1000:.1f} ms, {len(r.documents)} docs, error={r.error}")
+
+    assert len(results) == TEXT_FILES + 1
+    assert [os.path.basename(r.path) for r in failed] == ["broken.pdf"]
+    assert len(loaded) == TEXT_FILES
+    assert all(len(r.documents) == 1 and r.parse_seconds >= 0 for r in loaded)
+
+
+def test_stream_documents_yields_all_good_documents():
+    with tempfile.TemporaryDirectory() as directory:
+        _write_corpus(directory)
+        stream = DocumentLoader(directory).stream_documents(max_workers=2)
+        assert not isinstance(stream, list)
+        documents = list(stream)
+
+    contents = sorted(doc.page_content for doc in documents)
+    assert contents == sorted(f"Document {i} about EBLA services." for i in range(TEXT_FILES))
+
+
+_original_load_file = document_loader.load_file
+
+
+def _crashing_load_file(path):
+    """load_file that kills its worker process on crash.txt, like a segfaulting native parser."""
+    if os.path.basename(path) == "crash.txt":
+        os._exit(1)
+    return _original_load_file(path)
+
+
+def test_dead_worker_does_not_abort_the_run():
+    document_loader.load_file = _crashing_load_file
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            for i in range(2 * TEXT_FILES):
+                with open(os.path.join(directory, f"doc_{i:02d}.txt"), "w", encoding="utf-8") as f:
+                    f.write(f"Document {i} about EBLA services.")
+            # Sorted first, so most files are still to be parsed when its worker dies
+            with open(os.path.join(directory, "crash.txt"), "w", encoding="utf-8") as f:
+                f.write("crash")
+            results = list(DocumentLoader(directory).iter_file_results(max_workers=2))
+    finally:
+        document_loader.load_file = _original_load_file
+
+    failed = {os.path.basename(r.path): r.error for r in results if r.error}
+    print(f"Failed after the worker died: {sorted(failed)}")
+    # Every file is reported once; files in flight with the crash fail, the rest are parsed in a new pool
+    expected = ["crash.txt"] + [f"doc_{i:02d}.txt" for i in range(2 * TEXT_FILES)]
+    assert sorted(os.path.basename(r.path) for r in results) == expected
+    assert "BrokenProcessPool" in failed["crash.txt"]
+    assert len(results) - len(failed) >= TEXT_FILES
+
+
+if __name__ == "__main__":
+    test_parallel_loader_reports_errors_and_times()
+    test_stream_documents_yields_all_good_documents()
+    test_dead_worker_does_not_abort_the_run()
+    print("Parallel document loader tests passed")
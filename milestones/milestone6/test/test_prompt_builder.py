@@ -0,0 +1,160 @@
+"""
+Tests for token-budgeted RAG prompt assembly.
+
+Uses a whitespace word counter as the tokenizer, so no tokenizer download is needed.
+"""
+
+import asyncio
+import os
+import tempfile
+
+from stubs import StubLLM, StubVectorStore, build_stub_service
+import httpx
+from tokenizers import Tokenizer, models, pre_tokenizers
+from app import app
+from config import settings
+from schemas.chat_schema import ChatRequest
+from utils import prompt_builder
+from utils.prompt_builder import (
+    TOKENIZER_APPROXIMATE,
+    build_rag_prompt,
+    count_tokens,
+    prompt_tokenizer_name,
+    trim_to_sentences
+)
+
+
+def count_words(text):
+    return len(text.split())
+
+
+def _doc(content, source):
+    return {"content": content, "metadata": {"source": source}, "score": 0.1}
+
+
+QUERY = "What does Ebla offer?"
+FIXED_WORDS = count_words(build_rag_prompt(QUERY, [], count=count_words).text)
+
+
+def test_trim_to_sentences_cuts_at_sentence_end():
+    text = "Ebla offers cloud services. It also sells licenses. Support is available around the clock."
+    assert trim_to_sentences(text, 9, count_words) == "Ebla offers cloud services. It also sells licenses."
+    assert trim_to_sentences(text, 3, count_words) == ""
+    assert trim_to_sentences(text, 100, count_words) == text
+
+
+def test_unbounded_budget_keeps_everything():
+    docs = [_doc("Cloud migration services.", "a.txt"), _doc("Licensing services.", "b.txt")]
+    history = [("user", "Hi there."), ("assistant", "Hello!")]
+    prompt = build_rag_prompt(QUERY, docs, history, token_budget=10_000, count=count_words)
+
+    assert prompt.context_docs == docs
+    assert prompt.history_messages == 2
+    assert "User: Hi there.\nAssistant: Hello!" in prompt.text
+    assert "Source 1:\nCloud migration services.\n\nSource 2:\nLicensing services." in prompt.text
+    assert prompt.token_count == count_words(prompt.text)
+
+
+def test_budget_packs_best_context_and_trims_at_sentence():
+    docs = [
+        _doc("First best chunk about cloud.", "best.txt"),  # 5 words + 2 for "Source 1:"
+        _doc("Second chunk sentence one. Second chunk sentence two is long.", "second.txt"),
+        _doc("Third chunk never fits.", "third.txt"),
+    ]
+    budget = FIXED_WORDS + 7 + 6  # best chunk, then room for one sentence of the second
+    prompt = build_rag_prompt(QUERY, docs, token_budget=budget, count=count_words)
+
+    assert [doc["metadata"]["source"] for doc in prompt.context_docs] == ["best.txt", "second.txt"]
+    assert prompt.context_docs[1]["content"] == "Second chunk sentence one."
+    assert "Third chunk" not in prompt.text
+    assert prompt.token_count <= budget
+
+
+def test_history_keeps_most_recent_messages():
+    history = [("user", f"Old question number {i}.") for i in range(10)] + [("assistant", "Latest answer.")]
+    prompt = build_rag_prompt(
+        QUERY, [_doc("Cloud services.", "a.txt")], history,
+        token_budget=10_000, history_token_budget=13, count=count_words
+    )
+
+    assert prompt.history_messages == 3
+    assert "Assistant: Latest answer." in prompt.text
+    assert "Old question number 8." in prompt.text
+    assert "Old question number 7." not in prompt.text
+
+
+def _reload_tokenizer():
+    prompt_builder._tokenizer, prompt_builder._tokenizer_name, prompt_builder._tokenizer_loaded = None, None, False
+
+
+def _health():
+    async def get():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            return (await client.get("/health")).json()
+    return asyncio.run(get())
+
+
+def test_tokenizer_follows_the_llm_model_and_reports_the_fallback():
+    original = (settings.llm_model_name, settings.prompt_tokenizer, settings.prompt_tokenizer_dir)
+    loaded = (prompt_builder._tokenizer, prompt_builder._tokenizer_name, prompt_builder._tokenizer_loaded)
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            settings.prompt_tokenizer, settings.prompt_tokenizer_dir = None, directory
+            settings.llm_model_name = "qwen2.5-coder:7b"
+            assert prompt_tokenizer_name() == "Qwen/Qwen2.5-7B-Instruct"
+
+            # A local copy of the model's tokenizer is used without going to the Hub
+            path = os.path.join(directory, "Qwen", "Qwen2.5-7B-Instruct", "tokenizer.json")
+            os.makedirs(os.path.dirname(path))
+            tokenizer = Tokenizer(models.WordLevel({"[UNK]": 0}, unk_token="[UNK]"))
+            tokenizer.pre_tokenizer = pre_tokenizers.Whitespace()
+            tokenizer.save(path)
+            _reload_tokenizer()
+            assert count_tokens("Ebla offers cloud services.") == 5
+            assert TOKENIZER_APPROXIMATE.value() == 0
+            assert _health()["prompt_tokenizer"] == {"tokenizer": path, "approximate": False}
+
+            # No tokenizer known for the model: approximated, and reported as such
+            settings.llm_model_name = "unknown-model:7b"
+            _reload_tokenizer()
+            assert count_tokens("Ebla offers cloud services.") == 7
+            assert TOKENIZER_APPROXIMATE.value() == 1
+            assert _health()["prompt_tokenizer"] == {"tokenizer": None, "approximate": True}
+    finally:
+        settings.llm_model_name, settings.prompt_tokenizer, settings.prompt_tokenizer_dir = original
+        prompt_builder._tokenizer, prompt_builder._tokenizer_name, prompt_builder._tokenizer_loaded = loaded
+
+
+SEARCH_RESULTS = [
+    {"document": "Ebla offers cloud services. " * 200, "metadata": {"source": "long.txt"}, "distance": 0.1},
+    {"document": "Ebla sells licenses.", "metadata": {"source": "short.txt"}, "distance": 0.2},
+]
+
+
+def test_chat_reports_prompt_tokens_within_budget():
+    llm = StubLLM()
+    service = build_stub_service(vector_store=StubVectorStore(results=SEARCH_RESULTS), llm=llm)
+
+    original_budget = settings.prompt_token_budget
+    settings.prompt_token_budget = 600
+    try:
+        response = asyncio.run(service.aprocess_chat(ChatRequest(query=QUERY, collection_name="prompt-budget")))
+    finally:
+        settings.prompt_token_budget = original_budget
+
+    assert 0 < response.validation.prompt_tokens <= 600
+    assert llm.prompt.rstrip().endswith("Answer:")
+    # The long chunk was cut at a sentence end and the short one did not fit
+    assert response.sources[0].content.endswith("cloud services.")
+    assert [source.metadata["source"] for source in response.sources] == ["long.txt"]
+
+
+if __name__ == "__main__":
+    test_trim_to_sentences_cuts_at_sentence_end()
+    test_unbounded_budget_keeps_everything()
+    test_budget_packs_best_context_and_trims_at_sentence()
+    test_history_keeps_most_recent_messages()
+    test_tokenizer_follows_the_llm_model_and_reports_the_fallback()
+    test_chat_reports_prompt_tokens_within_budget()
+    print("Prompt builder tests passed")
@@ -0,0 +1,60 @@
+"""Test for the query-embedding cache in VectorStoreManager.embed_query."""
+
+import stubs  # noqa: F401  (path and test environment)
+from services.vector_store import VectorStoreManager
+
+
+class CountingEmbeddings:
+    """Embedding stub that counts forward passes."""
+
+    def __init__(self):
+        self.calls = 0
+        self.texts = []
+
+    def embed_query(self, text):
+        self.calls += 1
+        self.texts.append(text)
+        return [float(len(text)), 1.0]
+
+
+def _manager(embedding_model: str) -> VectorStoreManager:
+    # Skip loading the real embedding model and Chroma client
+    manager = VectorStoreManager.__new__(VectorStoreManager)
+    manager.embedding_model = embedding_model
+    manager.embeddings = CountingEmbeddings()
+    return manager
+
+
+def test_repeated_queries_skip_the_model():
+    manager = _manager("test-model-a")
+    before = VectorStoreManager.query_embedding_cache_stats()
+
+    first = manager.embed_query("What services does EBLA provide?")
+    second = manager.embed_query("  what services does EBLA   provide? ")
+
+    after = VectorStoreManager.query_embedding_cache_stats()
+    print(f"Query-embedding cache stats: {after}")
+
+    assert first == second
+    assert manager.embeddings.calls == 1
+    # The model embeds the query as asked (case and all); normalization only builds the cache key
+    assert manager.embeddings.texts == ["What services does EBLA provide?"]
+    assert after["hits"] - before["hits"] == 1
+    assert after["misses"] - before["misses"] == 1
+
+
+def test_cache_is_scoped_by_embedding_model():
+    manager_a = _manager("test-model-b")
+    manager_b = _manager("test-model-c")
+
+    manager_a.embed_query("Who is EBLA?")
+    manager_b.embed_query("Who is EBLA?")
+
+    assert manager_a.embeddings.calls == 1
+    assert manager_b.embeddings.calls == 1
+
+
+if __name__ == "__main__":
+    test_repeated_queries_skip_the_model()
+    test_cache_is_scoped_by_embedding_model()
+    print("Query-embedding cache tests passed")
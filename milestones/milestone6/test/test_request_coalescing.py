@@ -0,0 +1,150 @@
+"""
+Test for request coalescing: identical concurrent first questions share one retrieval and one generation.
+
+Uses stub vector store, LLM and repositories, so no Ollama, Chroma or SQL Server is needed.
+"""
+
+import asyncio
+from collections import defaultdict
+
+from stubs import StubMessage, StubMessageRepo, StubVectorStore, build_stub_service
+import pytest
+from fastapi import HTTPException
+from schemas.chat_schema import ChatRequest
+from services.single_flight import COALESCED, single_flight
+
+
+class CountingVectorStore(StubVectorStore):
+    def __init__(self):
+        super().__init__()
+        self.embeds = 0
+
+    def embed_query(self, query):
+        self.embeds += 1
+        return super().embed_query(query)
+
+
+class GatedLLM:
+    """Generates only once released, so every request arrives while the first is in flight."""
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+        self.release = None
+
+    async def agenerate(self, prompt, system=None):
+        self.calls += 1
+        await self.release.wait()
+        if self.fail:
+            raise RuntimeError("Ollama unavailable")
+        return "EBLA provides cloud services."
+
+
+class SessionMessageRepo(StubMessageRepo):
+    """Also records which sessions saved a turn."""
+
+    def __init__(self, history=()):
+        super().__init__(history)
+        self.sessions = defaultdict(list)
+
+    def add_turn(self, session_id, user_content, assistant_content, new_session=False, asked_at=None):
+        self.sessions[session_id].extend(["user", "assistant"])
+        return super().add_turn(session_id, user_content, assistant_content, new_session, asked_at)
+
+
+async def _burst(requests, vector_store, llm, message_repo, joined):
+    """Send the requests concurrently and release the LLM once `joined` reports they all arrived."""
+    llm.release = asyncio.Event()
+    # One service per request, as the API builds one per HTTP request
+    tasks = [
+        asyncio.create_task(
+            build_stub_service(vector_store=vector_store, llm=llm, message_repo=message_repo).aprocess_chat(request)
+        )
+        for request in requests
+    ]
+    while not joined():
+        await asyncio.sleep(0.005)
+    llm.release.set()
+    return await asyncio.gather(*tasks, return_exceptions=True)
+
+
+def test_identical_first_questions_share_retrieval_and_generation():
+    vector_store, llm, message_repo = CountingVectorStore(), GatedLLM(), SessionMessageRepo()
+    queries = ["What does EBLA do?", "what does  EBLA do?", " WHAT DOES EBLA DO? ", "What does EBLA do?"]
+    requests = [ChatRequest(query=query, collection_name="coalescing") for query in queries]
+    before = COALESCED.value()
+
+    responses = asyncio.run(
+        _burst(requests, vector_store, llm, message_repo, lambda: COALESCED.value() == before + 3)
+    )
+
+    assert (vector_store.embeds, vector_store.searches, llm.calls) == (1, 1, 1)
+    assert all(response.answer == "EBLA provides cloud services." for response in responses)
+    assert sum(response.validation.coalesced for response in responses) == 3
+    # Each caller still got its own session and saved its own turn
+    session_ids = {response.session_id for response in responses}
+    assert len(session_ids) == 4
+    assert all(message_repo.sessions[session_id] == ["user", "assistant"] for session_id in session_ids)
+    assert [response.query for response in responses] == queries
+    assert len(single_flight) == 0
+
+
+def test_requests_with_history_are_not_coalesced():
+    history = [StubMessage("assistant", "Hello!"), StubMessage("user", "Hi")]
+    vector_store, llm, message_repo = CountingVectorStore(), GatedLLM(), SessionMessageRepo(history)
+    requests = [
+        ChatRequest(query="And pricing?", session_id="existing-session", collection_name="coalescing-history")
+        for _ in range(2)
+    ]
+
+    responses = asyncio.run(_burst(requests, vector_store, llm, message_repo, lambda: llm.calls == 2))
+
+    assert (vector_store.searches, llm.calls) == (2, 2)
+    assert not any(response.validation.coalesced for response in responses)
+
+
+def test_failure_is_shared_by_every_waiter():
+    vector_store, llm, message_repo = CountingVectorStore(), GatedLLM(fail=True), SessionMessageRepo()
+    requests = [ChatRequest(query="Who founded EBLA?", collection_name="coalescing-failure") for _ in range(3)]
+    before = COALESCED.value()
+
+    results = asyncio.run(
+        _burst(requests, vector_store, llm, message_repo, lambda: COALESCED.value() == before + 2)
+    )
+
+    assert llm.calls == 1
+    assert all(isinstance(result, HTTPException) and result.status_code == 503 for result in results)
+    assert not message_repo.saved
+    assert len(single_flight) == 0
+
+
+def test_waiters_survive_the_first_caller_going_away():
+    async def scenario():
+        release = asyncio.Event()
+        runs = []
+
+        async def work():
+            runs.append(1)
+            await release.wait()
+            return "shared"
+
+        first = asyncio.create_task(single_flight.run("key", work))
+        await asyncio.sleep(0)
+        second = asyncio.create_task(single_flight.run("key", work))
+        await asyncio.sleep(0)
+        first.cancel()
+        release.set()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second, runs
+
+    (result, shared), runs = asyncio.run(scenario())
+    assert (result, shared, len(runs)) == ("shared", True, 1)
+
+
+if __name__ == "__main__":
+    test_identical_first_questions_share_retrieval_and_generation()
+    test_requests_with_history_are_not_coalesced()
+    test_failure_is_shared_by_every_waiter()
+    test_waiters_survive_the_first_caller_going_away()
+    print("Request coalescing tests passed")
@@ -0,0 +1,130 @@
+"""
+Tests for the cross-encoder rerank stage.
+
+Uses a stub cross-encoder that scores pairs by keyword overlap, so no model
+download, Ollama, Chroma or SQL Server is needed.
+"""
+
+import asyncio
+import time
+
+from stubs import StubVectorStore, build_stub_service
+from config import settings
+from services.reranker import CrossEncoderReranker
+from schemas.chat_schema import ChatRequest
+
+# Retrieval order puts the best chunk last
+CANDIDATES = [
+    {"document": f"Filler chunk {i}.", "metadata": {"source": f"filler-{i}.txt"}, "distance": 0.1 * i}
+    for i in range(5)
+] + [{"document": "Ebla is a Microsoft partner.", "metadata": {"source": "partners.txt"}, "distance": 0.9}]
+
+
+class KeywordCrossEncoder:
+    """Scores a pair by how many query words appear in the chunk."""
+
+    def __init__(self, delay_seconds=0.0):
+        self.delay_seconds = delay_seconds
+        self.calls = 0
+
+    def predict(self, pairs, batch_size=32):
+        self.calls += 1
+        time.sleep(self.delay_seconds)
+        return [
+            float(sum(word in document.lower() for word in query.lower().split()))
+            for query, document in pairs
+        ]
+
+
+def test_rerank_orders_by_cross_encoder_score():
+    reranker = CrossEncoderReranker(model=KeywordCrossEncoder(), batch_size=4, budget_ms=1000)
+    results, reranked = reranker.rerank("microsoft partner", CANDIDATES, top_k=2)
+
+    assert reranked
+    assert len(results) == 2
+    assert results[0]["metadata"]["source"] == "partners.txt"
+    assert results[0]["score"] == 2.0
+    assert results[0]["distance"] == 0.9  # retrieval fields are kept
+
+
+def test_rerank_keeps_retrieval_order_when_over_budget():
+    model = KeywordCrossEncoder(delay_seconds=0.05)
+    reranker = CrossEncoderReranker(model=model, batch_size=2, budget_ms=20)
+    results, reranked = reranker.rerank("microsoft partner", CANDIDATES, top_k=2)
+
+    assert not reranked
+    assert model.calls == 1  # stopped at the first batch boundary past the deadline
+    assert [r["metadata"]["source"] for r in results] == ["filler-0.txt", "filler-1.txt"]
+
+
+def test_rerank_checks_budget_after_a_single_batch():
+    # Default-sized batch: all candidates are scored by one predict call
+    model = KeywordCrossEncoder(delay_seconds=0.05)
+    reranker = CrossEncoderReranker(model=model, batch_size=32, budget_ms=20)
+    results, reranked = reranker.rerank("microsoft partner", CANDIDATES, top_k=2)
+
+    assert not reranked
+    assert model.calls == 1
+    assert results == CANDIDATES[:2]
+
+
+def test_async_rerank_times_out_to_retrieval_order():
+    reranker = CrossEncoderReranker(model=KeywordCrossEncoder(delay_seconds=0.2), batch_size=32, budget_ms=20)
+    start = time.perf_counter()
+    results, reranked = asyncio.run(reranker.arerank("microsoft partner", CANDIDATES, top_k=2))
+    elapsed = time.perf_counter() - start
+
+    assert not reranked
+    assert results == CANDIDATES[:2]
+    assert elapsed < 0.15, "Request waited for the cross-encoder past its budget"
+
+
+def test_async_rerank_skips_busy_worker_and_cancels_timed_out_scoring():
+    time.sleep(0.25)  # let timed-out scoring from earlier tests finish
+    model = KeywordCrossEncoder(delay_seconds=0.1)
+    reranker = CrossEncoderReranker(model=model, batch_size=2, budget_ms=20)
+
+    async def two_requests():
+        first = await reranker.arerank("microsoft partner", CANDIDATES, top_k=2)
+        # The first request's scoring is still running: the second does not queue behind it
+        start = time.perf_counter()
+        second = await reranker.arerank("microsoft partner", CANDIDATES, top_k=2)
+        return first, second, time.perf_counter() - start
+
+    first, second, second_elapsed = asyncio.run(two_requests())
+    assert first == second == (CANDIDATES[:2], False)
+    assert second_elapsed < 0.01
+
+    # The timed-out scoring stops after its current batch (of three) and frees the worker
+    time.sleep(0.2)
+    assert model.calls == 1
+    model.delay_seconds = 0.0
+    reranker.budget_ms = 1000
+    results, reranked = asyncio.run(reranker.arerank("microsoft partner", CANDIDATES, top_k=2))
+    assert reranked and results[0]["metadata"]["source"] == "partners.txt"
+
+
+def test_chat_reranks_wider_candidate_set():
+    vector_store = StubVectorStore(results=CANDIDATES)
+    service = build_stub_service(
+        vector_store=vector_store,
+        reranker=CrossEncoderReranker(model=KeywordCrossEncoder(), budget_ms=1000)
+    )
+
+    request = ChatRequest(query="Is Ebla a Microsoft partner?", collection_name="rerank-test", top_k=1, rerank=True)
+    response = asyncio.run(service.aprocess_chat(request))
+
+    assert vector_store.requested_k == max(1, settings.rerank_candidates)
+    assert len(response.sources) == 1
+    assert response.sources[0].metadata["source"] == "partners.txt"
+    assert response.validation.reranked
+
+
+if __name__ == "__main__":
+    test_rerank_orders_by_cross_encoder_score()
+    test_rerank_keeps_retrieval_order_when_over_budget()
+    test_rerank_checks_budget_after_a_single_batch()
+    test_async_rerank_times_out_to_retrieval_order()
+    test_async_rerank_skips_busy_worker_and_cancels_timed_out_scoring()
+    test_chat_reranks_wider_candidate_set()
+    print("Reranker tests passed")
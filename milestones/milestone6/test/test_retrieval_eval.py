@@ -0,0 +1,69 @@
+"""
+Tests for the retrieval evaluation harness: golden set, relevance, recall@k / MRR and the recommendation.
+
+The golden set is checked against the real data/ corpus with BM25 search, so no
+embedding model or Chroma index is needed.
+"""
+
+import os
+
+import stubs  # noqa: F401  (path and test environment)
+from benchmarks.eval_retrieval import DATA_DIR, evaluate, first_relevant_rank, load_golden_set, recommend
+from services.document_loader import DocumentLoader
+from services.keyword_index import BM25Index
+from utils.text_processor import TextProcessor
+
+
+def _chunk(text, source):
+    return {"document": text, "metadata": {"source": os.path.join("/data", source)}}
+
+
+def test_scoring():
+    expected = {"question": "Cloud?", "source": "ebla_services.txt", "contains": "Cloud Migration"}
+    results = [
+        _chunk("cloud migration", "ebla_overview.txt"),
+        _chunk("Nothing relevant", "ebla_services.txt"),
+        _chunk("We offer cloud migration.", "ebla_services.txt"),
+    ]
+    assert first_relevant_rank(results, expected) == 3
+    assert first_relevant_rank(results[:2], expected) is None
+
+    golden = [expected, {"question": "Other?", "source": "ebla_services.txt", "contains": "Cybersecurity"}]
+    report = evaluate(lambda question, k: results[:k], golden, k=3, repeat=2)
+    assert report["recall_at_k"] == 0.5
+    assert abs(report["mrr"] - (1 / 3) / 2) < 1e-9
+    assert report["missed"] == ["Other?"]
+
+    rows = [
+        {"top_k": 5, "recall_at_k": 1.0, "mrr": 0.9, "embed_ms": 1.0, "search_p50_ms": 1.0, "index_bytes": 10},
+        {"top_k": 3, "recall_at_k": 0.95, "mrr": 0.8, "embed_ms": 9.0, "search_p50_ms": 1.0, "index_bytes": 10},
+        {"top_k": 3, "recall_at_k": 0.95, "mrr": 0.8, "embed_ms": 2.0, "search_p50_ms": 1.0, "index_bytes": 10},
+        {"top_k": 1, "recall_at_k": 0.5, "mrr": 0.5, "embed_ms": 1.0, "search_p50_ms": 1.0, "index_bytes": 10},
+    ]
+    assert recommend(rows, min_recall=0.9, min_mrr=0.0) is rows[2]
+    assert recommend(rows, min_recall=1.0, min_mrr=0.95) is None
+
+
+def test_golden_set_matches_corpus():
+    golden = load_golden_set()
+    documents = DocumentLoader(DATA_DIR).load_documents()
+    sources = {os.path.basename(doc.metadata["source"]) for doc in documents}
+    assert golden and all(item["source"] in sources for item in golden)
+
+    chunks = TextProcessor(500, 50).process_documents(documents)
+    index = BM25Index()
+    index.add(
+        [str(i) for i in range(len(chunks))],
+        [chunk.page_content for chunk in chunks],
+        [chunk.metadata for chunk in chunks]
+    )
+    # Every expected answer exists in some chunk, and exact-term search finds most of them
+    report = evaluate(index.search, golden, k=len(chunks), repeat=0)
+    assert report["recall_at_k"] == 1.0, report["missed"]
+    assert evaluate(index.search, golden, k=5, repeat=1)["recall_at_k"] >= 0.5
+
+
+if __name__ == "__main__":
+    test_scoring()
+    test_golden_set_matches_corpus()
+    print("Retrieval eval tests passed")
@@ -0,0 +1,104 @@
+"""
+Tests for the versioned schema migrations and the chat-history indexes.
+
+Runs against an in-memory SQLite database with the "dbo" schema attached,
+so no SQL Server is needed.
+"""
+
+import stubs  # noqa: F401  (path and test environment)
+from sqlalchemy import create_engine, event, inspect
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+from models.base import Base
+from repositories.database.migrations import MIGRATIONS, current_version, migrate
+from repositories.message_repository import MessageRepository
+from repositories.session_repository import SessionRepository
+from repositories.summary_repository import SummaryRepository
+
+HISTORY_INDEXES = {
+    "messages": "ix_messages_session_id_created_date",
+    "summaries": "ix_summaries_session_id_created_date",
+}
+
+
+def _engine():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def _attach_dbo(dbapi_connection, _):
+        dbapi_connection.execute("ATTACH DATABASE ':memory:' AS dbo")
+
+    return engine
+
+
+def _index_names(engine, table):
+    return {index["name"] for index in inspect(engine).get_indexes(table, schema="dbo")}
+
+
+def test_migrate_fresh_database_and_rerun():
+    engine = _engine()
+    assert migrate(engine, target=1) == 1
+    assert migrate(engine) == MIGRATIONS[-1].version
+    for table, index in HISTORY_INDEXES.items():
+        assert index in _index_names(engine, table)
+
+    # Nothing is pending on a second run
+    assert migrate(engine) == MIGRATIONS[-1].version
+    with engine.connect() as connection:
+        assert current_version(connection) == MIGRATIONS[-1].version
+
+
+def test_migrate_database_created_before_versioning():
+    engine = _engine()
+    # Tables as init_db's create_all used to leave them: no history indexes, no version table
+    with engine.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            table.create(bind=connection)
+        for index in HISTORY_INDEXES.values():
+            connection.exec_driver_sql(f"DROP INDEX dbo.{index}")
+        connection.exec_driver_sql("INSERT INTO dbo.sessions (session_id) VALUES ('kept')")
+        assert current_version(connection) == 0
+
+    migrate(engine)
+
+    for table, index in HISTORY_INDEXES.items():
+        assert index in _index_names(engine, table)
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("SELECT session_id FROM dbo.sessions").scalar() == "kept"
+
+
+def test_migrated_database_accepts_sessions_without_a_user():
+    engine = _engine()
+    migrate(engine)
+    columns = {column["name"]: column for column in inspect(engine).get_columns("sessions", schema="dbo")}
+    assert columns["user_id"]["nullable"]
+
+    with Session(engine) as db:
+        session_id = SessionRepository(db).create_session()
+        assert SessionRepository(db).get_session(session_id).user_id is None
+
+
+def test_history_lookups_use_the_indexes():
+    engine = _engine()
+    migrate(engine)
+    plans = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _explain(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith("SELECT"):
+            plans.append(" ".join(row[-1] for row in cursor.execute(f"EXPLAIN QUERY PLAN {statement}", parameters)))
+
+    with Session(engine) as db:
+        MessageRepository(db).get_recent_messages("session-1")
+        SummaryRepository(db).get_latest_summary("session-1")
+
+    assert HISTORY_INDEXES["messages"] in plans[0] and "TEMP B-TREE" not in plans[0]
+    assert HISTORY_INDEXES["summaries"] in plans[1] and "TEMP B-TREE" not in plans[1]
+
+
+if __name__ == "__main__":
+    test_migrate_fresh_database_and_rerun()
+    test_migrate_database_created_before_versioning()
+    test_migrated_database_accepts_sessions_without_a_user()
+    test_history_lookups_use_the_indexes()
+    print("Schema migration tests passed")
@@ -0,0 +1,103 @@
+"""
+Tests for one-transaction chat-turn persistence (MessageRepository.add_turn).
+
+Runs against an in-memory SQLite database with the "dbo" schema attached,
+so no SQL Server is needed; the chat-level test uses the stub repositories.
+"""
+
+from datetime import datetime
+
+import asyncio
+
+from stubs import StubMessageRepo, build_stub_service
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from models.base import Base
+from models.message import MessageModel
+from models.session import SessionModel
+from repositories.message_repository import MessageRepository
+from repositories.session_repository import SessionRepository
+from schemas.chat_schema import ChatRequest
+
+
+def _database():
+    """Session factory for a fresh in-memory database, plus the list of executed statements."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+
+    @event.listens_for(engine, "connect")
+    def _attach_dbo(dbapi_connection, _):
+        dbapi_connection.execute("ATTACH DATABASE ':memory:' AS dbo")
+
+    Base.metadata.create_all(engine)
+    statements = []
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement.split()[0].upper())
+
+    return sessionmaker(autocommit=False, autoflush=False, bind=engine), statements
+
+
+def test_add_turn_writes_session_and_messages_in_one_flush():
+    SessionLocal, statements = _database()
+    db = SessionLocal()
+    asked_at = datetime(2024, 1, 1, 12, 0, 0)
+
+    user_id, assistant_id = MessageRepository(db).add_turn(
+        "new-session", "What does EBLA do?", "Cloud services.", new_session=True, asked_at=asked_at
+    )
+
+    # One INSERT per table, no SELECT to refresh generated values
+    assert statements == ["INSERT", "INSERT"]
+    db.close()
+
+    db = SessionLocal()
+    assert SessionRepository(db).session_exists("new-session")
+    messages = MessageRepository(db).get_messages_by_session("new-session")
+    assert [(m.message_id, m.role) for m in messages] == [(user_id, "user"), (assistant_id, "assistant")]
+    assert messages[0].created_date == asked_at < messages[1].created_date
+    db.close()
+
+
+def test_add_turn_to_existing_session_and_rollback():
+    SessionLocal, statements = _database()
+    db = SessionLocal()
+    session_id = SessionRepository(db).create_session()
+    repo = MessageRepository(db)
+
+    del statements[:]
+    repo.add_turn(session_id, "Hi", "Hello!")
+    assert statements == ["INSERT"]
+
+    # A failing turn leaves nothing behind (the session row would be a duplicate)
+    with pytest.raises(Exception):
+        repo.add_turn(session_id, "Again", "Hello again!", new_session=True)
+    assert db.query(MessageModel).count() == 2
+    assert db.query(SessionModel).count() == 1
+    db.close()
+
+
+def test_chat_fails_when_its_new_session_is_not_saved():
+    service = build_stub_service(message_repo=StubMessageRepo(fail_saves=True))
+    request = ChatRequest(query="What does EBLA do?", collection_name="unsaved-session")
+
+    # Neither path hands out the ID of a session that was never written
+    with pytest.raises(HTTPException) as sync_error:
+        service.process_chat(request)
+    with pytest.raises(HTTPException) as async_error:
+        asyncio.run(service.aprocess_chat(request))
+    assert sync_error.value.status_code == async_error.value.status_code == 500
+
+    # In an existing session only this turn's history is lost
+    response = service.process_chat(request.model_copy(update={"session_id": "stub-session"}))
+    assert response.session_id == "stub-session"
+
+
+if __name__ == "__main__":
+    test_add_turn_writes_session_and_messages_in_one_flush()
+    test_add_turn_to_existing_session_and_rollback()
+    test_chat_fails_when_its_new_session_is_not_saved()
+    print("Turn persistence tests passed")
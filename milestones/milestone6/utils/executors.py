@@ -0,0 +1,68 @@
+"""Dedicated thread pools for blocking embedding, vector-search and rerank work."""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+from typing import Any, Callable, Dict
+from config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Pool name -> Settings attribute holding its size
+POOL_SIZE_SETTINGS: Dict[str, str] = {
+    "embedding": "embedding_pool_size",
+    "search": "search_pool_size",
+    "rerank": "rerank_pool_size",
+}
+
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_lock = Lock()
+
+
+def get_executor(name: str) -> ThreadPoolExecutor:
+    """
+    Return the named thread pool, creating it on first use.
+
+    Args:
+        name: Pool name (one of POOL_SIZE_SETTINGS)
+
+    Returns:
+        ThreadPoolExecutor sized from settings
+    """
+    if name not in POOL_SIZE_SETTINGS:
+        raise ValueError(f"Unknown executor: '{name}'")
+    with _lock:
+        executor = _executors.get(name)
+        if executor is None:
+            max_workers = getattr(settings, POOL_SIZE_SETTINGS[name])
+            executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-pool")
+            _executors[name] = executor
+            logger.info(f"Created '{name}' thread pool with {max_workers} workers")
+        return executor
+
+
+async def run_in_executor(name: str, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Run a blocking function on the named pool without blocking the event loop.
+
+    Args:
+        name: Pool name
+        func: Blocking callable
+        *args, **kwargs: Arguments forwarded to func
+
+    Returns:
+        Whatever func returns
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(name), partial(func, *args, **kwargs))
+
+
+def shutdown_executors() -> None:
+    """Shut down all pools (called on application shutdown)."""
+    with _lock:
+        for name, executor in _executors.items():
+            executor.shutdown(wait=False, cancel_futures=True)
+            logger.info(f"Shut down '{name}' thread pool")
+        _executors.clear()
@@ -1,15 +1,167 @@
 """Utility functions for building LLM prompts."""
 
-from typing import List, Dict, Any
+import math
+import os
+import re
+from dataclasses import dataclass
+from threading import Lock
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from config import settings
+from utils.metrics import REGISTRY
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOKENIZER_APPROXIMATE = REGISTRY.gauge(
+    "prompt_tokenizer_approximate",
+    "1 if prompt tokens are approximated as 4 characters per token because no tokenizer could be loaded"
+)
+
+# Hugging Face tokenizers of Ollama models, by model name prefix (LLM_MODEL_NAME without its tag)
+OLLAMA_TOKENIZERS: Dict[str, str] = {
+    "qwen2.5": "Qwen/Qwen2.5-7B-Instruct",
+    "qwen2": "Qwen/Qwen2-7B-Instruct",
+    "phi3": "microsoft/Phi-3-mini-4k-instruct",
+}
+
+SYSTEM_PROMPT = """You are an intelligent assistant for EBLA Computer Consultancy. 
+Your goal is to answer user questions accurately based ONLY on the provided context.
+If the answer is not in the context, say "I don't have enough information to answer that."
+
+Instructions:
+1. Use the provided Context to answer the question.
+2. Use the Chat History to understand the conversation flow (e.g., if the user says "it", know what they refer to).
+3. Be concise, professional, and helpful.
+4. Do not hallucinate or make up information.
+"""
+
+# Places where text may be cut: after sentence punctuation or at a line break
+_SENTENCE_END = re.compile(r"[.!?](?=\s|$)|\n")
+
+_tokenizer: Any = None
+_tokenizer_name: Optional[str] = None
+_tokenizer_loaded = False
+_tokenizer_lock = Lock()
+
+
+@dataclass
+class RagPrompt:
+    """A RAG prompt packed into the token budget, and what went into it."""
+
+    # Static instructions, sent as the leading system message (identical for every request)
+    system: str
+    # History, context and question
+    user: str
+    token_count: int
+    # Context documents included (best first; the last one may be trimmed)
+    context_docs: List[Dict[str, Any]]
+    # Number of chat history messages included (the most recent ones)
+    history_messages: int
+
+    @property
+    def text(self) -> str:
+        """The prompt as a single string."""
+        return f"{self.system}\n\n{self.user}"
+
+
+def prompt_tokenizer_name() -> Optional[str]:
+    """
+    Tokenizer to count prompt tokens with: settings.prompt_tokenizer, or the one
+    matching the configured Ollama model (None if the model is not in OLLAMA_TOKENIZERS).
+    """
+    if settings.prompt_tokenizer:
+        return settings.prompt_tokenizer
+    model = settings.llm_model_name.split(":")[0].lower()
+    prefixes = [prefix for prefix in OLLAMA_TOKENIZERS if model.startswith(prefix)]
+    return OLLAMA_TOKENIZERS[max(prefixes, key=len)] if prefixes else None
+
+
+def _load_tokenizer(name: str) -> Any:
+    """Load a tokenizer from a tokenizer.json path, the local tokenizer directory, or the Hub."""
+    from tokenizers import Tokenizer
+    local_path = os.path.join(settings.prompt_tokenizer_dir, name, "tokenizer.json")
+    for path in (name, local_path):
+        if os.path.isfile(path):
+            return Tokenizer.from_file(path), path
+    return Tokenizer.from_pretrained(name), name
+
+
+def _get_tokenizer() -> Any:
+    """Load the LLM's tokenizer once (None if not configured or unavailable)."""
+    global _tokenizer, _tokenizer_name, _tokenizer_loaded
+    if not _tokenizer_loaded:
+        with _tokenizer_lock:
+            if not _tokenizer_loaded:
+                name = prompt_tokenizer_name()
+                if name:
+                    try:
+                        _tokenizer, _tokenizer_name = _load_tokenizer(name)
+                        logger.info(f"Loaded prompt tokenizer: {_tokenizer_name}")
+                    except Exception as e:
+                        logger.warning(f"Prompt tokenizer '{name}' unavailable, approximating token counts: {e}")
+                else:
+                    logger.warning(
+                        f"No prompt tokenizer known for '{settings.llm_model_name}' (set PROMPT_TOKENIZER), "
+                        f"approximating token counts"
+                    )
+                TOKENIZER_APPROXIMATE.set(0 if _tokenizer is not None else 1)
+                _tokenizer_loaded = True
+    return _tokenizer
+
+
+def prompt_tokenizer_status() -> Dict[str, Any]:
+    """Which tokenizer counts prompt tokens, or whether they are approximated (for /health)."""
+    tokenizer = _get_tokenizer()
+    return {"tokenizer": _tokenizer_name, "approximate": tokenizer is None}
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens with the LLM's tokenizer (see prompt_tokenizer_name).
+
+    Falls back to ~4 characters per token if the tokenizer cannot be loaded;
+    the prompt_tokenizer_approximate gauge and /health report when that happens.
+    """
+    if not text:
+        return 0
+    tokenizer = _get_tokenizer()
+    if tokenizer is None:
+        return math.ceil(len(text) / 4)
+    return len(tokenizer.encode(text, add_special_tokens=False).ids)
+
+
+def trim_to_sentences(text: str, max_tokens: int, count: Callable[[str], int] = count_tokens) -> str:
+    """
+    Longest leading part of text that fits in max_tokens and ends at a sentence or line end.
+
+    Returns:
+        The trimmed text ("" if not even the first sentence fits)
+    """
+    if max_tokens <= 0:
+        return ""
+    if count(text) <= max_tokens:
+        return text
+    cuts = [match.end() for match in _SENTENCE_END.finditer(text)]
+    best = ""
+    low, high = 0, len(cuts) - 1
+    while low <= high:
+        middle = (low + high) // 2
+        candidate = text[:cuts[middle]].rstrip()
+        if count(candidate) <= max_tokens:
+            best = candidate
+            low = middle + 1
+        else:
+            high = middle - 1
+    return best
 
 
 def build_summary_prompt(conversation_text: str) -> str:
     """
     Builds a prompt for summarizing a conversation.
-    
+
     Args:
         conversation_text: The formatted conversation text
-        
+
     Returns:
         The complete prompt for the LLM
     """
@@ -20,34 +172,8 @@ def build_summary_prompt(conversation_text: str) -> str:
 Summary:"""
 
 
-def build_rag_prompt(query: str, context_docs: List[Dict[str, Any]], history_text: str) -> str:
-    """
-    Builds the RAG prompt with system instructions, history, context, and query.
-    
-    Args:
-        query: User's question
-        context_docs: List of context documents
-        history_text: Formatted chat history
-        
-    Returns:
-        The complete prompt for the LLM
-    """
-    context_str = "\n\n".join([f"Source {i+1}:\n{doc['content']}" for i, doc in enumerate(context_docs)])
-    
-    system_prompt = """You are an intelligent assistant for EBLA Computer Consultancy. 
-Your goal is to answer user questions accurately based ONLY on the provided context.
-If the answer is not in the context, say "I don't have enough information to answer that."
-
-Instructions:
-1. Use the provided Context to answer the question.
-2. Use the Chat History to understand the conversation flow (e.g., if the user says "it", know what they refer to).
-3. Be concise, professional, and helpful.
-4. Do not hallucinate or make up information.
-"""
-
-    return f"""{system_prompt}
-
----
+def _render_user(query: str, context_str: str, history_text: str) -> str:
+    return f"""---
 Chat History:
 {history_text}
 ---
@@ -59,4 +185,110 @@ Context Information:
 
 User Question: {query}
 
-Answer:"""
\ No newline at end of file
+Answer:"""
+
+
+def _pack_history(
+    history: Sequence[Tuple[str, str]],
+    budget: int,
+    count: Callable[[str], int]
+) -> List[str]:
+    """Most recent history lines that fit the budget, oldest first."""
+    lines: List[str] = []
+    used = 0
+    newline = count("\n")
+    for role, content in reversed(history):
+        line = f"{('User' if role == 'user' else 'Assistant')}: {content}"
+        overhead = newline if lines else 0
+        cost = overhead + count(line)
+        if used + cost <= budget:
+            lines.append(line)
+            used += cost
+            continue
+        # Keep the opening sentences of the message that crosses the budget, then stop
+        trimmed = trim_to_sentences(line, budget - used - overhead, count)
+        if trimmed:
+            lines.append(trimmed)
+        break
+    return lines[::-1]
+
+
+def _pack_context(
+    context_docs: List[Dict[str, Any]],
+    budget: int,
+    count: Callable[[str], int]
+) -> List[Dict[str, Any]]:
+    """Best-ranked context documents that fit the budget (the last one trimmed at a sentence end)."""
+    packed: List[Dict[str, Any]] = []
+    used = 0
+    separator = count("\n\n")
+    for doc in context_docs:
+        header = f"Source {len(packed) + 1}:\n"
+        overhead = count(header) + (separator if packed else 0)
+        cost = overhead + count(doc["content"])
+        if used + cost <= budget:
+            packed.append(doc)
+            used += cost
+            continue
+        trimmed = trim_to_sentences(doc["content"], budget - used - overhead, count)
+        if trimmed:
+            packed.append({**doc, "content": trimmed})
+        break
+    return packed
+
+
+def build_rag_prompt(
+    query: str,
+    context_docs: List[Dict[str, Any]],
+    history: Sequence[Tuple[str, str]] = (),
+    token_budget: Optional[int] = None,
+    history_token_budget: Optional[int] = None,
+    count: Callable[[str], int] = count_tokens
+) -> RagPrompt:
+    """
+    Builds the RAG prompt with system instructions, history, context, and query,
+    packed into a token budget.
+
+    The instructions and query are always included. The most recent history
+    messages come next (up to history_token_budget), then context documents in
+    ranking order until the budget is used. A message or document that does not
+    fit entirely is cut at a sentence end rather than mid-sentence.
+
+    Args:
+        query: User's question
+        context_docs: Context documents ({"content", "metadata", "score"}), best first
+        history: Chat history as (role, content) pairs, oldest to newest
+        token_budget: Token limit for the whole prompt (defaults to settings)
+        history_token_budget: Token limit for the history part (defaults to settings)
+        count: Token counter (defaults to the LLM's tokenizer)
+
+    Returns:
+        RagPrompt with the system and user parts and their token count
+    """
+    if token_budget is None:
+        token_budget = settings.prompt_token_budget
+    if history_token_budget is None:
+        history_token_budget = settings.prompt_history_token_budget
+
+    remaining = token_budget - count(SYSTEM_PROMPT) - count(_render_user(query, "", ""))
+    history_lines = _pack_history(history, min(history_token_budget, remaining), count)
+    history_text = "\n".join(history_lines)
+    remaining -= count(history_text)
+
+    packed_docs = _pack_context(context_docs, remaining, count)
+    context_str = "\n\n".join([f"Source {i+1}:\n{doc['content']}" for i, doc in enumerate(packed_docs)])
+
+    user = _render_user(query, context_str, history_text)
+    token_count = count(SYSTEM_PROMPT) + count(user)
+    if len(packed_docs) < len(context_docs) or len(history_lines) < len(history):
+        logger.info(
+            f"Prompt packed to {token_count}/{token_budget} tokens: "
+            f"{len(packed_docs)}/{len(context_docs)} sources, {len(history_lines)}/{len(history)} history messages"
+        )
+    return RagPrompt(
+        system=SYSTEM_PROMPT,
+        user=user,
+        token_count=token_count,
+        context_docs=packed_docs,
+        history_messages=len(history_lines)
+    )